@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+채팅 스트리밍(chat_stream_api)은 비동기 뷰라 ASGI로 띄워야 스트림마다 워커를 점유하지 않음:
+    uvicorn scentlab.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+    gunicorn scentlab.asgi:application -k uvicorn.workers.UvicornWorker -w 4
 """
 
 import os
@@ -213,10 +213,56 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME")
 
+# Cache
+# catalog: 향수 목록 그리드 조각/전체 개수/카탈로그 세대 저장소
+#   CATALOG_CACHE_BACKEND=locmem(기본) | file | Django 캐시 백엔드 경로 (예: django.core.cache.backends.redis.RedisCache)
+#   여러 gunicorn 워커가 무효화를 공유하려면 file 또는 redis 등 공용 백엔드 사용
+_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+CATALOG_CACHE_BACKEND = os.getenv("CATALOG_CACHE_BACKEND", "locmem")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "scentpick-default",
+    },
+    "catalog": {
+        "BACKEND": _CACHE_BACKENDS.get(CATALOG_CACHE_BACKEND, CATALOG_CACHE_BACKEND),
+        "LOCATION": os.getenv(
+            "CATALOG_CACHE_LOCATION",
+            str(BASE_DIR / ".cache" / "catalog") if CATALOG_CACHE_BACKEND == "file" else "scentpick-catalog",
+        ),
+        "TIMEOUT": 60 * 60,
+    },
+}
+CATALOG_CACHE_ALIAS = "catalog"
+# ajax 그리드 조각 캐시 유지 시간(초). 데이터 변경은 세대 카운터로 즉시 무효화됨
+CATALOG_FRAGMENT_TIMEOUT = int(os.getenv("CATALOG_FRAGMENT_TIMEOUT", "3600"))
+# 조건부 GET(ETag) 버전 — 템플릿/표시 로직을 바꿔 배포할 때 올리면 기존 304 응답이 무효화됨
+RESPONSE_ETAG_VERSION = os.getenv("RESPONSE_ETAG_VERSION", "1")
+
+# 컬럼형 카탈로그 스냅샷(export_catalog_snapshot) 위치 — 워커/에이전트가 mmap으로 공유
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", str(BASE_DIR / "var" / "catalog_snapshot"))
+
 # Media
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 향수 이미지 저장소: "s3"(scentpick-images 버킷) | "local"(MEDIA_ROOT/scentpick-images) | 클래스 dotted path
+PERFUME_IMAGE_STORAGE = os.getenv("PERFUME_IMAGE_STORAGE", "s3")
+PERFUME_IMAGE_BUCKET = os.getenv("PERFUME_IMAGE_BUCKET", "scentpick-images")
+# CDN 등 공개 URL 접두어 (비우면 저장소 기본 URL)
+PERFUME_IMAGE_BASE_URL = os.getenv("PERFUME_IMAGE_BASE_URL", "")
+PERFUME_IMAGE_LOCAL_ROOT = os.getenv("PERFUME_IMAGE_LOCAL_ROOT", "")
+# 썸네일 변형 사용 여부 (generate_perfume_images 실행 후 켜기)
+PERFUME_IMAGE_VARIANTS = os.getenv("PERFUME_IMAGE_VARIANTS", "0") == "1"
+PERFUME_IMAGE_WIDTHS = tuple(
+    int(w) for w in os.getenv("PERFUME_IMAGE_WIDTHS", "160,320,640").split(",") if w.strip()
+)
+# srcset 변형 포맷: "webp" | "jpg"
+PERFUME_IMAGE_FORMAT = os.getenv("PERFUME_IMAGE_FORMAT", "webp")
+
 # SQL debug logging (optional)
 LOGGING = {
     'version': 1,
@@ -237,3 +283,58 @@ SERVICE_TOKEN    = os.environ.get("SERVICE_TOKEN")
 
 # ✅ Kakao JS 키(.env에서 로드)
 KAKAO_JS_KEY = os.getenv("KAKAO_JS_KEY", "")
+
+# 향수 목록 패싯 인덱스 재빌드 주기(초). Perfume 저장/삭제 시에는 즉시 무효화됨, 0이면 주기 재빌드 안 함
+FACET_INDEX_TTL = int(os.getenv("FACET_INDEX_TTL", "600"))
+
+# 향수 목록 검색(q) 방식: "bm25"(인메모리 역색인, 관련도 정렬) | "icontains"(기존 Q-chain)
+CATALOG_SEARCH_BACKEND = os.getenv("CATALOG_SEARCH_BACKEND", "bm25")
+# 검색 인덱스 증분 갱신(updated_at 기준) 확인 주기(초)
+SEARCH_INDEX_REFRESH = int(os.getenv("SEARCH_INDEX_REFRESH", "30"))
+# 자동완성 인덱스 재빌드 주기(초). 인기도(찜/좋아요) 반영 주기이기도 함
+SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", "600"))
+# 노트 이미지 리졸버 재적재 주기(초). NoteImage 저장/삭제 시에는 즉시 재적재됨
+NOTE_IMAGE_RESOLVER_TTL = int(os.getenv("NOTE_IMAGE_RESOLVER_TTL", "3600"))
+# 상세 페이지 "비슷한 향수" 표시 개수 (build_similar_perfumes --k 이하)
+SIMILAR_PANEL_SIZE = int(os.getenv("SIMILAR_PANEL_SIZE", "6"))
+# 인기도 카운터(찜/좋아요/조회) 버퍼 반영 주기(초)와 최대 대기 키 수 — 요청 종료 시 확인
+COUNTER_FLUSH_INTERVAL = int(os.getenv("COUNTER_FLUSH_INTERVAL", "10"))
+COUNTER_FLUSH_MAX_PENDING = int(os.getenv("COUNTER_FLUSH_MAX_PENDING", "1000"))
+# 캐시에 둔 카운터 값 유지 시간(초). 만료되면 테이블 + 버퍼로 다시 채움
+# COUNTER_CACHE_TIMEOUT은 공용 캐시(redis 등), COUNTER_LOCAL_CACHE_TIMEOUT은 프로세스별 locmem (다른 워커 값이 보이기까지의 상한)
+COUNTER_CACHE_TIMEOUT = int(os.getenv("COUNTER_CACHE_TIMEOUT", "86400"))
+COUNTER_LOCAL_CACHE_TIMEOUT = int(os.getenv("COUNTER_LOCAL_CACHE_TIMEOUT", "30"))
+# FastAPI 챗봇 백엔드 HTTP 풀 (utils/chat_backend.py) — 프로세스(비동기는 이벤트 루프)당 커넥션 상한 / keep-alive
+CHAT_BACKEND_MAX_CONNECTIONS = int(os.getenv("CHAT_BACKEND_MAX_CONNECTIONS", "200"))
+CHAT_BACKEND_MAX_KEEPALIVE = int(os.getenv("CHAT_BACKEND_MAX_KEEPALIVE", "50"))
+CHAT_BACKEND_KEEPALIVE_EXPIRY = float(os.getenv("CHAT_BACKEND_KEEPALIVE_EXPIRY", "30"))
+# 연결 / 읽기(chat_submit_api) / 풀 대기 타임아웃(초), 스트림 읽기 타임아웃은 CHAT_STREAM_READ_TIMEOUT
+CHAT_BACKEND_CONNECT_TIMEOUT = float(os.getenv("CHAT_BACKEND_CONNECT_TIMEOUT", "5"))
+CHAT_BACKEND_READ_TIMEOUT = float(os.getenv("CHAT_BACKEND_READ_TIMEOUT", "60"))
+CHAT_BACKEND_POOL_TIMEOUT = float(os.getenv("CHAT_BACKEND_POOL_TIMEOUT", "10"))
+CHAT_STREAM_READ_TIMEOUT = float(os.getenv("CHAT_STREAM_READ_TIMEOUT", "120"))
+# 스트림 이어받기 (utils/stream_resume.py): 스트림당 버퍼 프레임 수 / 완료 후 보관(초) / 읽는 쪽이 없을 때 업스트림 취소까지(초)
+CHAT_STREAM_BUFFER_SIZE = int(os.getenv("CHAT_STREAM_BUFFER_SIZE", "4096"))
+CHAT_STREAM_RESUME_TTL = int(os.getenv("CHAT_STREAM_RESUME_TTL", "120"))
+CHAT_STREAM_ORPHAN_TIMEOUT = float(os.getenv("CHAT_STREAM_ORPHAN_TIMEOUT", "15"))
+# 채팅 전송 멱등성 (utils/idempotency.py): 서버 유도 키 중복 창(초) / 클라이언트 키 결과 보관(초) / 처리 중 표식 수명(초)
+CHAT_IDEMPOTENCY_WINDOW = int(os.getenv("CHAT_IDEMPOTENCY_WINDOW", "30"))
+CHAT_IDEMPOTENCY_TTL = int(os.getenv("CHAT_IDEMPOTENCY_TTL", "86400"))
+CHAT_IDEMPOTENCY_PENDING_TTL = int(os.getenv("CHAT_IDEMPOTENCY_PENDING_TTL", "300"))
+# 답변 캐시 (utils/answer_cache.py, 기본 꺼짐): 항목 수명(초) / 근접 적중 코사인 임계값 / 슬롯별 근접 후보 수 / 임베딩 함수 dotted path(비우면 글자 n-gram 해시)
+CHAT_ANSWER_CACHE_ENABLED = os.getenv("CHAT_ANSWER_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+CHAT_ANSWER_CACHE_TTL = int(os.getenv("CHAT_ANSWER_CACHE_TTL", "21600"))
+CHAT_ANSWER_CACHE_THRESHOLD = float(os.getenv("CHAT_ANSWER_CACHE_THRESHOLD", "0.9"))
+CHAT_ANSWER_CACHE_BUCKET_SIZE = int(os.getenv("CHAT_ANSWER_CACHE_BUCKET_SIZE", "200"))
+CHAT_ANSWER_CACHE_EMBEDDER = os.getenv("CHAT_ANSWER_CACHE_EMBEDDER", "")
+# 요청 N건마다 풀 통계(재사용 비율, 풀 대기 시간) INFO 로그 (0이면 끔)
+CHAT_BACKEND_STATS_LOG_EVERY = int(os.getenv("CHAT_BACKEND_STATS_LOG_EVERY", "500"))
+# 채팅 첨부 이미지 (utils/chat_images.py): 저장소 "s3"(AWS_STORAGE_BUCKET_NAME) | "local", 긴 변 / 포맷(JPEG|WEBP) / 품질 / 업로드 스레드 수
+CHAT_IMAGE_STORAGE = os.getenv("CHAT_IMAGE_STORAGE", "s3")
+CHAT_IMAGE_MAX_EDGE = int(os.getenv("CHAT_IMAGE_MAX_EDGE", "1280"))
+CHAT_IMAGE_FORMAT = os.getenv("CHAT_IMAGE_FORMAT", "JPEG")
+CHAT_IMAGE_QUALITY = int(os.getenv("CHAT_IMAGE_QUALITY", "85"))
+CHAT_IMAGE_UPLOAD_WORKERS = int(os.getenv("CHAT_IMAGE_UPLOAD_WORKERS", "4"))
+# LangGraph state 압축 보관 (utils/state_snapshots.py): 전체 스냅샷(keyframe) 간격 / zlib 압축 레벨(1~9)
+MESSAGE_STATE_KEYFRAME_INTERVAL = int(os.getenv("MESSAGE_STATE_KEYFRAME_INTERVAL", "20"))
+MESSAGE_STATE_COMPRESS_LEVEL = int(os.getenv("MESSAGE_STATE_COMPRESS_LEVEL", "6"))
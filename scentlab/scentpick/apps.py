@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScentpickConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scentpick'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
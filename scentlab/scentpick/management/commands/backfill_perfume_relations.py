@@ -0,0 +1,29 @@
+"""
+perfume_accords / perfume_notes 전체 재생성
+
+sql/perfumes.sql 처럼 ORM(signals)을 거치지 않고 perfumes를 적재한 뒤 실행:
+    python manage.py backfill_perfume_relations
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Perfume, PerfumeAccord, PerfumeNote
+from scentpick.utils.perfume_relations import backfill_perfume_relations
+
+
+class Command(BaseCommand):
+    help = "Perfume JSON 컬럼(main_accords, top/middle/base_notes)으로 어코드/노트 조인 테이블 재생성"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        n_perfumes, n_accords, n_notes = backfill_perfume_relations(
+            Perfume, PerfumeAccord, PerfumeNote, batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"perfumes={n_perfumes} accords={n_accords} notes={n_notes} "
+            f"({time.perf_counter() - t0:.1f}s)"
+        ))
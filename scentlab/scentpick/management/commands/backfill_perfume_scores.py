@@ -0,0 +1,26 @@
+"""
+perfumes.day_score / night_score / spring_score ... 재계산
+
+sql/perfumes.sql 처럼 ORM(save)을 거치지 않고 season_score / day_night_score를 적재·수정한 뒤 실행:
+    python manage.py backfill_perfume_scores
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Perfume
+from scentpick.utils.scores import backfill_perfume_scores
+
+
+class Command(BaseCommand):
+    help = "season_score / day_night_score JSON으로 정렬용 숫자 점수 컬럼 재계산"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        updated = backfill_perfume_scores(Perfume, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"perfumes={updated} ({time.perf_counter() - t0:.1f}s)"
+        ))
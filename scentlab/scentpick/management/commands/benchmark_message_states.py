@@ -0,0 +1,162 @@
+"""
+LangGraph state 스냅샷 보관 벤치마크: messages.state(JSON 전체) vs message_states(delta + zlib)
+
+대화별로 압축 전/후를 같은 트랜잭션 안에서 측정하고 마지막에 롤백 (DB에는 남지 않음):
+- 저장 크기: 원본 JSON / 스냅샷마다 zlib 전체 / delta 체인(keyframe 간격 MESSAGE_STATE_KEYFRAME_INTERVAL)
+- 메시지 목록 읽기: 대화의 messages 전체 컬럼 조회 (defer 없이 — state가 행에 있으면 함께 끌려옴)
+- state 읽기: 마지막 메시지의 state (압축 후에는 keyframe부터 복원)
+
+    python manage.py benchmark_message_states                        # state가 남아 있는 최근 대화 (운영 DB 사본에서)
+    python manage.py benchmark_message_states --synthetic 20 --turns 30
+"""
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from scentpick.models import Conversation, Message
+from scentpick.utils.state_snapshots import FULL, compact, encode_snapshot, load_state, pack
+
+SYNTHETIC_QUERIES = [
+    "여름에 출근할 때 뿌릴 가벼운 향수 추천해 줘", "좀 더 달달한 쪽으로", "우디 계열이면 좋겠어", "가격대는 10만원 이하",
+    "데이트할 때 쓸 만한 건?", "비슷한데 지속력이 더 긴 걸로", "샤넬 말고 다른 브랜드도", "겨울에도 괜찮을까?",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _synthetic_states(turns, rng):
+    """LangGraph 채팅 그래프와 비슷한 모양의 state: 누적 messages + 턴마다 바뀌는 슬롯/후보/답변"""
+    messages = []
+    for turn in range(turns):
+        query = rng.choice(SYNTHETIC_QUERIES)
+        answer = " ".join(rng.choice(["시트러스", "머스크", "베르가못", "은은한", "잔향이", "좋은", "향수예요.", "추천드려요."])
+                          for _ in range(80))
+        candidates = [
+            {"id": rng.randrange(1, 5000), "brand": "브랜드", "name": f"향수 {rng.randrange(1000)}",
+             "score": round(rng.random(), 4), "main_accords": ["citrus", "woody", "musky"]}
+            for _ in range(10)
+        ]
+        messages.append({"type": "human", "content": query, "id": uuid.uuid4().hex, "additional_kwargs": {}})
+        messages.append({
+            "type": "ai", "content": answer, "id": uuid.uuid4().hex, "additional_kwargs": {},
+            "response_metadata": {"model_name": "gpt-4o-mini", "finish_reason": "stop",
+                                  "token_usage": {"prompt_tokens": rng.randrange(800, 4000), "completion_tokens": 300}},
+        })
+        yield query, answer, {
+            "messages": list(messages),
+            "user_query": query,
+            "parsed_slots": {"season": rng.choice(["spring", "summer", "fall", "winter"]), "turn": turn},
+            "candidates": candidates,
+            "final_answer": answer,
+            "next": "END",
+        }
+
+
+class Command(BaseCommand):
+    help = "LangGraph state 보관 벤치마크: 원본 JSON vs delta + zlib (저장 크기 / 읽기 지연, 변경은 롤백)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conversations", type=int, default=50, help="측정할 최근 대화 수")
+        parser.add_argument("--synthetic", type=int, default=0, help="가짜 대화 N개를 만들어 측정 (state가 없는 DB용)")
+        parser.add_argument("--turns", type=int, default=20, help="가짜 대화의 턴 수")
+        parser.add_argument("--repeat", type=int, default=5, help="읽기 측정 반복 횟수")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["synthetic"]:
+                conversation_ids = self._create_synthetic(options["synthetic"], options["turns"], options["seed"])
+            else:
+                conversation_ids = list(
+                    Message.objects.filter(state__isnull=False).values_list("conversation_id", flat=True)
+                    .distinct().order_by("-conversation_id")[:options["conversations"]]
+                )
+            if not conversation_ids:
+                self.stderr.write("messages.state가 있는 대화가 없습니다. --synthetic N 으로 가짜 대화를 만들어 측정하세요.")
+                return
+            self._run(conversation_ids, options["repeat"])
+            transaction.set_rollback(True)
+
+    def _create_synthetic(self, count, turns, seed):
+        rng = random.Random(seed)
+        user = User.objects.create(username=f"bench_state_{uuid.uuid4().hex[:8]}")
+        ids = []
+        for _ in range(count):
+            conv = Conversation.objects.create(user=user)
+            for query, answer, state in _synthetic_states(turns, rng):
+                Message.objects.create(conversation=conv, role="user", content=query)
+                Message.objects.create(conversation=conv, role="assistant", content=answer, state=state)
+            ids.append(conv.id)
+        return ids
+
+    def _time_reads(self, conversation_ids, last_ids, repeat):
+        list_ms, state_ms = [], []
+        for _ in range(repeat):
+            for conversation_id in conversation_ids:
+                t0 = time.perf_counter()
+                list(Message.objects.filter(conversation_id=conversation_id).order_by("created_at", "id"))
+                list_ms.append((time.perf_counter() - t0) * 1000)
+                t0 = time.perf_counter()
+                load_state(last_ids[conversation_id])
+                state_ms.append((time.perf_counter() - t0) * 1000)
+        return list_ms, state_ms
+
+    def _run(self, conversation_ids, repeat):
+        states, last_ids = {}, {}
+        for conversation_id in conversation_ids:
+            rows = list(
+                Message.objects.filter(conversation_id=conversation_id, state__isnull=False)
+                .order_by("created_at", "id").values_list("id", "state")
+            )
+            states[conversation_id] = [state for _, state in rows]
+            if rows:
+                last_ids[conversation_id] = rows[-1][0]
+        conversation_ids = [c for c in conversation_ids if states[c]]
+        snapshots = sum(len(v) for v in states.values())
+
+        raw = full = delta = keyframes = 0
+        for chain in states.values():
+            prev, base = None, 0
+            for seq, state in enumerate(chain):
+                raw += len(json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                full += len(pack(state))
+                codec, data = encode_snapshot(prev, state, seq - 1 - base)
+                if codec == FULL:
+                    base = seq
+                    keyframes += 1
+                delta += len(data)
+                prev = state
+        self.stdout.write(f"conversations={len(conversation_ids)}  snapshots={snapshots}  keyframes={keyframes}")
+        self.stdout.write(
+            f"storage  raw json={raw / 1024:.0f}KiB  zlib per snapshot={full / 1024:.0f}KiB ({full / raw:.1%})  "
+            f"delta+zlib={delta / 1024:.0f}KiB ({delta / raw:.1%})"
+        )
+
+        before_list, before_state = self._time_reads(conversation_ids, last_ids, repeat)
+        t0 = time.perf_counter()
+        for conversation_id in conversation_ids:
+            compact(conversation_id)
+        compact_ms = (time.perf_counter() - t0) * 1000
+        after_list, after_state = self._time_reads(conversation_ids, last_ids, repeat)
+
+        self.stdout.write(f"compaction {compact_ms:.0f}ms ({compact_ms / snapshots:.2f}ms/snapshot)")
+        self.stdout.write(f"{'read':<26}{'inline p50':>12}{'p95':>9}{'compact p50':>13}{'p95':>9}")
+        for label, before, after in (
+            ("messages list (all cols)", before_list, after_list),
+            ("last message state", before_state, after_state),
+        ):
+            self.stdout.write(
+                f"{label:<26}{statistics.median(before):>10.2f}ms{_percentile(before, 95):>7.2f}ms"
+                f"{statistics.median(after):>11.2f}ms{_percentile(after, 95):>7.2f}ms"
+            )
+        self.stdout.write("측정 후 롤백 — DB에는 변경이 남지 않음")
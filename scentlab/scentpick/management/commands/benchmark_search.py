@@ -0,0 +1,82 @@
+"""
+향수 목록 검색 벤치마크: 기존 icontains Q-chain vs 인메모리 BM25
+
+sql/perfumes.sql 전체를 적재한 DB에서 실행:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --repeat 50 --query 장미 --query bergamot
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Perfume
+from scentpick.utils.search import SearchIndex, keyword_q
+
+DEFAULT_QUERIES = [
+    "장미", "플로랄", "우디 머스크", "시트러스", "바닐라", "베르가못", "bergamot",
+    "오 드 퍼퓸", "오드퍼퓸", "겔랑", "샤넬 넘버", "여름 바다", "파우더리 머스크", "rose",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+class Command(BaseCommand):
+    help = "향수 검색(q) 벤치마크: icontains Q-chain vs BM25 역색인"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="질의별 반복 횟수")
+        parser.add_argument("--query", action="append", dest="queries", help="벤치마크 질의 (여러 번 지정 가능)")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        queries = options["queries"] or DEFAULT_QUERIES
+
+        total = Perfume.objects.count()
+        if not total:
+            self.stderr.write("perfumes 테이블이 비어 있습니다. sql/perfumes.sql을 먼저 적재하세요.")
+            return
+
+        t0 = time.perf_counter()
+        index = SearchIndex()
+        index.load_rows(Perfume.objects.values(*SearchIndex.SOURCE_FIELDS).iterator())
+        build_ms = (time.perf_counter() - t0) * 1000
+        self.stdout.write(
+            f"perfumes={total}  terms={len(index.postings)}  index build={build_ms:.1f}ms"
+        )
+        self.stdout.write(
+            f"{'query':<16}{'qchain p50':>12}{'p95':>9}{'bm25 p50':>11}{'p95':>9}"
+            f"{'qchain n':>10}{'bm25 n':>8}{'overlap':>9}"
+        )
+
+        all_qchain, all_bm25 = [], []
+        for q in queries:
+            qchain_ms, bm25_ms = [], []
+            qchain_ids, bm25_ids = [], []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                qchain_ids = list(Perfume.objects.filter(keyword_q(q)).values_list("id", flat=True))
+                qchain_ms.append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                bm25_ids = [pid for pid, _ in index.search(q)]
+                bm25_ms.append((time.perf_counter() - t0) * 1000)
+
+            all_qchain.extend(qchain_ms)
+            all_bm25.extend(bm25_ms)
+            overlap = len(set(qchain_ids) & set(bm25_ids)) / len(qchain_ids) if qchain_ids else 0.0
+            self.stdout.write(
+                f"{q:<16}{statistics.median(qchain_ms):>11.2f}ms{_percentile(qchain_ms, 95):>7.2f}ms"
+                f"{statistics.median(bm25_ms):>9.2f}ms{_percentile(bm25_ms, 95):>7.2f}ms"
+                f"{len(qchain_ids):>10}{len(bm25_ids):>8}{overlap:>8.0%}"
+            )
+
+        self.stdout.write(
+            f"{'ALL':<16}{statistics.median(all_qchain):>11.2f}ms{_percentile(all_qchain, 95):>7.2f}ms"
+            f"{statistics.median(all_bm25):>9.2f}ms{_percentile(all_bm25, 95):>7.2f}ms"
+        )
+        self.stdout.write("overlap = Q-chain 결과 중 BM25 결과에도 포함된 비율 (BM25는 관련도 순 정렬)")
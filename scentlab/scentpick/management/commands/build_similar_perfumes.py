@@ -0,0 +1,64 @@
+"""
+유사 향수 Top-K 계산 → perfume_similar 전체 교체
+
+    python manage.py build_similar_perfumes
+    python manage.py build_similar_perfumes --k 20 --snapshot   # DB 대신 export_catalog_snapshot 결과 사용
+
+향수 데이터를 바꾼 뒤(또는 가중치 조정 후) 다시 실행
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scentpick.models import Perfume
+from scentpick.utils.catalog_cache import bump_catalog_generation, catalog_cache_is_shared
+from scentpick.utils.catalog_snapshot import SOURCE_FIELDS, build_snapshot_arrays, get_catalog_snapshot
+from scentpick.utils.similarity import _numpy, perfume_vectors, store_similar_perfumes, top_k_neighbours
+
+
+class Command(BaseCommand):
+    help = "notes_score / main_accords / season_score 코사인 유사도로 향수별 유사 향수 Top-K 저장"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=12, help="향수당 저장할 유사 향수 수")
+        parser.add_argument("--batch-size", type=int, default=256, help="행렬곱 배치 행 수")
+        parser.add_argument("--snapshot", action="store_true", help="CATALOG_SNAPSHOT_DIR 스냅샷에서 읽기")
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        if options["snapshot"]:
+            snapshot = get_catalog_snapshot()
+            if snapshot is None:
+                raise CommandError("스냅샷이 없습니다. python manage.py export_catalog_snapshot 먼저 실행")
+            arrays = {name: getattr(snapshot, name) for name in ("ids", "brand", "accords", "note_scores", "scores")}
+            score_fields = snapshot.score_fields
+            # 스냅샷 이후 삭제된 향수는 빼고 계산 (perfume_similar FK 위반 방지, 순위도 빈칸 없이)
+            live = _numpy().isin(arrays["ids"], list(Perfume.objects.values_list("id", flat=True)))
+            if not live.all():
+                arrays = {name: values[live] for name, values in arrays.items()}
+                self.stderr.write(f"스냅샷에만 있는 향수 {int((~live).sum())}개 제외 (export_catalog_snapshot 재실행 권장)")
+        else:
+            arrays, meta = build_snapshot_arrays(Perfume.objects.values(*SOURCE_FIELDS).iterator())
+            score_fields = meta["score_fields"]
+        load_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        vectors = perfume_vectors(arrays, score_fields)
+        neighbours = top_k_neighbours(
+            vectors, arrays["ids"], arrays["brand"], k=options["k"], batch_size=options["batch_size"]
+        )
+        compute_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        saved = store_similar_perfumes(neighbours)
+        store_s = time.perf_counter() - t0
+        if catalog_cache_is_shared():
+            bump_catalog_generation()  # 상세 페이지 ETag 갱신
+        else:
+            # locmem 세대는 이 프로세스에만 바뀜 → 올리지 않음 (그 구성에서는 상세 페이지가 조건부 GET 없이 매번 새로 렌더링)
+            self.stdout.write("카탈로그 캐시가 프로세스별 백엔드라 세대를 올리지 않음 (상세 페이지 ETag 미사용)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"perfumes={len(neighbours)} dim={vectors.shape[1]} rows={saved} "
+            f"(load {load_s:.1f}s, compute {compute_s:.2f}s, store {store_s:.1f}s)"
+        ))
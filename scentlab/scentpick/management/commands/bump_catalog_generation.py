@@ -0,0 +1,35 @@
+"""
+카탈로그 세대 카운터 +1 → 향수 목록 그리드 캐시/패싯 인덱스/검색 인덱스 무효화
+
+sql/perfumes.sql 처럼 ORM(signals)을 거치지 않고 perfumes를 적재·수정한 뒤 실행:
+    python manage.py bump_catalog_generation
+sql/note_images.sql 재적재 후에는 노트 이미지 리졸버도 갱신:
+    python manage.py bump_catalog_generation --note-images
+
+세대 카운터는 카탈로그 캐시에 있으므로 서버와 공유되는 백엔드(file / redis 등)에서만 효과가 있음
+→ locmem(프로세스별)이면 이 명령의 변경이 실행 중인 워커에 닿지 않으므로 오류로 중단
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scentpick.utils.catalog_cache import bump_catalog_generation, bump_note_images_version, catalog_cache_is_shared
+
+
+class Command(BaseCommand):
+    help = "카탈로그 세대를 올려 향수 목록 캐시를 무효화"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--note-images", action="store_true", help="note_images 버전도 올림")
+
+    def handle(self, *args, **options):
+        if not catalog_cache_is_shared():
+            raise CommandError(
+                f"카탈로그 캐시가 프로세스별 백엔드({settings.CACHES[settings.CATALOG_CACHE_ALIAS]['BACKEND']})라 "
+                "실행 중인 서버에 세대 변경이 전달되지 않습니다. CATALOG_CACHE_BACKEND를 file 또는 redis 등 공용 백엔드로 "
+                "설정하거나 서버를 재시작하세요."
+            )
+        generation = bump_catalog_generation()
+        self.stdout.write(self.style.SUCCESS(f"catalog generation={generation}"))
+        if options["note_images"]:
+            version = bump_note_images_version()
+            self.stdout.write(self.style.SUCCESS(f"note_images version={version}"))
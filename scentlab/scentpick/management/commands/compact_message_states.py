@@ -0,0 +1,36 @@
+"""
+messages.state(LangGraph 스냅샷) → message_states 압축 보관 (utils/state_snapshots.py)
+
+chat_stream_api는 응답이 끝난 대화를 바로 옮기고, 그 외 경로(chat_submit_api, FastAPI 직접 기록)는 주기적으로 실행:
+    python manage.py compact_message_states
+    python manage.py compact_message_states --conversation 42
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from scentpick.models import Message, MessageState
+from scentpick.utils.state_snapshots import compact_all, compact_conversation
+
+
+class Command(BaseCommand):
+    help = "messages.state를 압축(delta + zlib) 사이드 테이블 message_states로 이동"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conversation", type=int, help="이 대화만 압축")
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        if options["conversation"]:
+            conversations, moved = 1, compact_conversation(Message, MessageState, options["conversation"])
+        else:
+            conversations, moved = compact_all(Message, MessageState)
+        totals = MessageState.objects.aggregate(raw=Sum("raw_size"), stored=Sum(Length("data")))
+        raw, stored = totals["raw"] or 0, totals["stored"] or 0
+        self.stdout.write(self.style.SUCCESS(
+            f"conversations={conversations} messages={moved} ({time.perf_counter() - t0:.1f}s)  "
+            f"message_states: raw={raw / 1024:.0f}KiB stored={stored / 1024:.0f}KiB"
+            + (f" ({stored / raw:.1%})" if raw else "")
+        ))
@@ -0,0 +1,54 @@
+"""
+Perfume 테이블 → 컬럼형 NumPy 스냅샷 (CATALOG_SNAPSHOT_DIR)
+
+    python manage.py export_catalog_snapshot
+    python manage.py export_catalog_snapshot --out /srv/scentpick/snapshot --keep 3
+
+읽는 쪽: python manage.py build_similar_perfumes --snapshot
+(다른 프로세스는 scentpick.utils.catalog_snapshot.open_current_snapshot(경로)로 mmap해서 사용 가능)
+"""
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Perfume
+from scentpick.utils.catalog_cache import get_catalog_generation
+from scentpick.utils.catalog_snapshot import SOURCE_FIELDS, CatalogSnapshot, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "향수 카탈로그를 mmap 가능한 컬럼형 NumPy 스냅샷으로 내보내기"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--out", help="스냅샷 디렉터리 (기본: CATALOG_SNAPSHOT_DIR)")
+        parser.add_argument("--keep", type=int, default=2, help="남겨 둘 버전 수")
+
+    def handle(self, *args, **options):
+        base_dir = options["out"] or settings.CATALOG_SNAPSHOT_DIR
+
+        t0 = time.perf_counter()
+        rows = list(Perfume.objects.values(*SOURCE_FIELDS))
+        read_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        path = write_snapshot(rows, base_dir, generation=get_catalog_generation(), keep=options["keep"])
+        write_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        snapshot = CatalogSnapshot(path)
+        open_ms = (time.perf_counter() - t0) * 1000
+
+        snapshot_bytes = sum(f.stat().st_size for f in path.iterdir())
+        json_bytes = len(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8"))
+        meta = snapshot.meta
+        self.stdout.write(self.style.SUCCESS(f"snapshot → {path}"))
+        self.stdout.write(
+            f"rows={len(snapshot)} brands={len(meta['brands'])} accords={len(meta['accords'])} "
+            f"notes={len(meta['notes'])} note_score_keys={len(meta['note_score_keys'])}"
+        )
+        self.stdout.write(
+            f"size={snapshot_bytes / 1024:.1f}KB (JSON {json_bytes / 1024:.1f}KB)  "
+            f"db read={read_ms:.0f}ms write={write_ms:.0f}ms mmap open={open_ms:.1f}ms"
+        )
@@ -0,0 +1,106 @@
+"""
+향수 이미지 반응형 변형(썸네일) 생성: perfumes/{id}.jpg → perfumes/w{width}/{id}.{webp|jpg}
+
+    python manage.py generate_perfume_images                       # 전체, 이미 있으면 건너뜀
+    python manage.py generate_perfume_images --ids 1 2 3 --force
+    python manage.py generate_perfume_images --storage local --source-base-url https://scentpick-images.s3.ap-northeast-2.amazonaws.com
+
+생성 후 PERFUME_IMAGE_VARIANTS=1 로 켜면 템플릿이 srcset/썸네일 URL을 사용
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Perfume
+from scentpick.utils.image_storage import get_image_storage
+from scentpick.utils.perfume_images import (
+    CONTENT_TYPES,
+    perfume_image_key,
+    render_variants,
+    variant_widths,
+)
+
+
+class Command(BaseCommand):
+    help = "향수 이미지 썸네일(WebP/JPEG, 여러 폭) 생성 후 저장소(S3/로컬)에 업로드"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ids", type=int, nargs="+", help="대상 향수 id (기본: 전체)")
+        parser.add_argument("--widths", type=int, nargs="+", help="생성할 폭 (기본: PERFUME_IMAGE_WIDTHS)")
+        parser.add_argument("--formats", nargs="+", default=["webp", "jpg"], choices=sorted(CONTENT_TYPES))
+        parser.add_argument("--storage", help='저장소 ("s3" | "local" | dotted path, 기본: PERFUME_IMAGE_STORAGE)')
+        parser.add_argument("--source-base-url", help="원본을 저장소 대신 이 URL에서 내려받음 (로컬 저장소 채우기용)")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--force", action="store_true", help="이미 있는 변형도 다시 생성")
+
+    def handle(self, *args, **options):
+        storage = get_image_storage(options["storage"])
+        widths = sorted(options["widths"] or variant_widths())
+        formats = options["formats"]
+        source_base = (options["source_base_url"] or "").rstrip("/")
+        force = options["force"]
+
+        qs = Perfume.objects.order_by("id")
+        if options["ids"]:
+            qs = qs.filter(id__in=options["ids"])
+        ids = list(qs.values_list("id", flat=True))
+
+        def read_original(pid):
+            key = perfume_image_key(pid)
+            if not source_base:
+                return storage.read(key)
+            resp = requests.get(f"{source_base}/{key}", timeout=20)
+            resp.raise_for_status()
+            if not storage.exists(key):
+                storage.save(key, resp.content, CONTENT_TYPES["jpg"])
+            return resp.content
+
+        def process(pid):
+            targets = [(w, f) for w in widths for f in formats]
+            if not force:
+                targets = [(w, f) for w, f in targets if not storage.exists(perfume_image_key(pid, w, f))]
+            if not targets:
+                return pid, None, {}
+            original = read_original(pid)
+            rendered = render_variants(original, sorted({w for w, _ in targets}), sorted({f for _, f in targets}))
+            sizes = {}
+            for (w, f), data in rendered.items():
+                if (w, f) in targets:
+                    storage.save(perfume_image_key(pid, w, f), data, CONTENT_TYPES[f])
+                    sizes[(w, f)] = len(data)
+            return pid, len(original), sizes
+
+        t0 = time.perf_counter()
+        done = skipped = failed = 0
+        original_bytes = 0
+        variant_bytes = {}
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            futures = {pool.submit(process, pid): pid for pid in ids}
+            for future in as_completed(futures):
+                pid = futures[future]
+                try:
+                    _, size, sizes = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"[{pid}] 실패: {e}")
+                    continue
+                if size is None:
+                    skipped += 1
+                    continue
+                done += 1
+                original_bytes += size
+                for key, n in sizes.items():
+                    variant_bytes[key] = variant_bytes.get(key, 0) + n
+
+        self.stdout.write(self.style.SUCCESS(
+            f"perfumes={len(ids)} generated={done} skipped={skipped} failed={failed} "
+            f"({time.perf_counter() - t0:.1f}s)"
+        ))
+        if done:
+            self.stdout.write(f"원본 평균 {original_bytes / done / 1024:.1f}KB")
+            for (w, f), n in sorted(variant_bytes.items()):
+                self.stdout.write(
+                    f"  w{w}.{f}: 평균 {n / done / 1024:.1f}KB ({n / original_bytes:.0%} of original)"
+                )
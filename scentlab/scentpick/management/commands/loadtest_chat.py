@@ -0,0 +1,170 @@
+"""
+채팅 엔드포인트 부하 테스트: 가짜 FastAPI SSE 백엔드 + 동시 가상 사용자, 배포 방식(sync/async)별 비교
+
+가짜 백엔드(utils/mock_chat_backend.py)를 이 프로세스에서 띄우고, 배포 방식마다 Django 서버를 하위 프로세스로
+실행(FASTAPI_CHAT_URL을 가짜 백엔드로)한 뒤 가상 사용자 N명으로 부하를 걸어 지표를 비교:
+    sync  = gunicorn scentlab.wsgi (sync/gthread 워커) — 프레임 단위로 전송하지만 스트림마다 워커 스레드를 점유
+    async = uvicorn scentlab.asgi — 스트림마다 워커를 잡지 않고 프레임 단위 중계
+
+    python manage.py loadtest_chat
+    python manage.py loadtest_chat --users 100 --requests 3 --mode async --token-rate 30 --latency 0.8
+    python manage.py loadtest_chat --error-rate 0.05 --drop-rate 0.05 --json
+    python manage.py loadtest_chat --target http://127.0.0.1:8000   # 이미 띄운 서버 (FASTAPI_CHAT_URL=출력되는 가짜 백엔드 주소)
+
+지표: TTFB(첫 바이트), data 프레임 간 간격 p50/p90/p99, 처리량(완료 요청/초, 프레임/초), 오류율
+- 가상 사용자마다 DB에 loadtest_<i> 사용자와 세션을 만들고, 끝나면 세션만 삭제 (사용자는 재사용)
+- 서버와 같은 설정(DJANGO_SETTINGS_MODULE)/DB를 사용하므로 운영 DB가 아닌 곳에서 실행
+- 주입한 장애 수는 가짜 백엔드 집계(mock)로 함께 출력 — 뷰가 FastAPI 실패를 임시 응답으로 대체하므로
+  클라이언트 오류율과 다를 수 있음
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scentpick.utils.chat_loadtest import issue_sessions, revoke_sessions, run_load, summarize
+from scentpick.utils.mock_chat_backend import MockChatBackend, serve_in_thread
+
+HOST = "127.0.0.1"
+
+
+def _server_command(mode, port, workers, threads):
+    if mode == "sync":
+        return [
+            sys.executable, "-m", "gunicorn", "scentlab.wsgi:application",
+            "--bind", f"{HOST}:{port}", "--workers", str(workers), "--threads", str(threads),
+            "--timeout", "300", "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "scentlab.asgi:application",
+        "--host", HOST, "--port", str(port), "--workers", str(workers),
+        "--log-level", "warning", "--no-access-log",
+    ]
+
+
+def _wait_ready(process, base_url, timeout=30.0):
+    """서버가 HTTP 응답을 줄 때까지 대기 (로그인 리다이렉트/403도 준비 완료로 봄)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"서버 프로세스가 종료되었습니다 (exit {process.returncode}).")
+        try:
+            httpx.get(base_url + "/api/chat/metrics", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise CommandError(f"서버가 {timeout:.0f}초 안에 응답하지 않습니다: {base_url}")
+
+
+def _fmt(values):
+    return "/".join("-" if values[p] is None else f"{values[p]:.0f}" for p in (50, 90, 99))
+
+
+class Command(BaseCommand):
+    help = "채팅 엔드포인트 부하 테스트 (가짜 FastAPI SSE 백엔드, sync vs async 배포 비교)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=["sync", "async", "both"], default="both", help="배포 방식")
+        parser.add_argument("--target", help="이미 실행 중인 Django 서버 URL (지정하면 서버를 띄우지 않음)")
+        parser.add_argument("--endpoint", choices=["stream", "submit"], default="stream",
+                            help="stream=/api/chat/stream, submit=/api/chat")
+        parser.add_argument("--users", type=int, default=20, help="동시 가상 사용자 수")
+        parser.add_argument("--requests", type=int, default=2, help="사용자별 연속 요청 수")
+        parser.add_argument("--think", type=float, default=0.0, help="요청 사이 대기(초)")
+        parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃(초)")
+        parser.add_argument("--port", type=int, default=8765, help="Django 서버 포트")
+        parser.add_argument("--workers", type=int, default=1, help="서버 워커 프로세스 수")
+        parser.add_argument("--threads", type=int, default=1, help="sync 워커당 스레드 수 (gunicorn --threads)")
+        # 가짜 백엔드
+        parser.add_argument("--mock-port", type=int, default=8766, help="가짜 FastAPI 포트")
+        parser.add_argument("--tokens", type=int, default=40, help="응답당 토큰(프레임) 수")
+        parser.add_argument("--token-rate", type=float, default=20.0, help="초당 토큰 수")
+        parser.add_argument("--latency", type=float, default=0.5, help="첫 토큰까지 지연(초)")
+        parser.add_argument("--jitter", type=float, default=0.1, help="첫 토큰 지연 ± 범위(초)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 주입 확률")
+        parser.add_argument("--drop-rate", type=float, default=0.0, help="스트림 중간 끊김 주입 확률")
+        parser.add_argument("--seed", type=int, help="장애 주입 난수 시드")
+        parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+
+    def handle(self, *args, **options):
+        backend = MockChatBackend(
+            tokens=options["tokens"], token_rate=options["token_rate"], latency=options["latency"],
+            jitter=options["jitter"], error_rate=options["error_rate"], drop_rate=options["drop_rate"],
+            seed=options["seed"],
+        )
+        mock_server, mock_thread = serve_in_thread(backend, HOST, options["mock_port"])
+        mock_url = f"http://{HOST}:{options['mock_port']}/chat"
+        if not options["json"]:
+            self.stdout.write(
+                f"mock backend {mock_url}  tokens={options['tokens']}  rate={options['token_rate']}/s  "
+                f"latency={options['latency']}±{options['jitter']}s  "
+                f"error={options['error_rate']:.0%}  drop={options['drop_rate']:.0%}"
+            )
+
+        session_keys = issue_sessions(options["users"])
+        reports = {}
+        try:
+            if options["target"]:
+                reports["target"] = self._run(options["target"], session_keys, backend, options)
+            else:
+                modes = ["sync", "async"] if options["mode"] == "both" else [options["mode"]]
+                for mode in modes:
+                    reports[mode] = self._run_server(mode, mock_url, session_keys, backend, options)
+        finally:
+            revoke_sessions(session_keys)
+            mock_server.should_exit = True
+            mock_thread.join(timeout=5)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            f"{'mode':<8}{'req':>6}{'ok':>6}{'err%':>7}{'req/s':>8}{'frm/s':>8}"
+            f"{'ttfb p50/90/99':>20}{'gap p50/90/99':>18}{'total p50/90/99':>22}"
+        )
+        for mode, report in reports.items():
+            self.stdout.write(
+                f"{mode:<8}{report['requests']:>6}{report['ok']:>6}{report['error_rate']:>7.1%}"
+                f"{report['throughput_rps']:>8.2f}{report['frames_per_s']:>8.1f}"
+                f"{_fmt(report['ttfb_ms']):>20}{_fmt(report['gap_ms']):>18}{_fmt(report['duration_ms']):>22}"
+            )
+        for mode, report in reports.items():
+            self.stdout.write(f"{mode}: errors={report['errors'] or '{}'}  mock={report['mock']}")
+        self.stdout.write("시간 단위 ms, ttfb = 응답 첫 바이트, gap = data 프레임 간 간격 (성공한 요청 기준)")
+
+    def _run_server(self, mode, mock_url, session_keys, backend, options):
+        port = options["port"]
+        env = {**os.environ, "FASTAPI_CHAT_URL": mock_url}
+        quiet = options["verbosity"] < 2
+        process = subprocess.Popen(
+            _server_command(mode, port, options["workers"], options["threads"]),
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL if quiet else None, stderr=subprocess.DEVNULL if quiet else None,
+        )
+        base_url = f"http://{HOST}:{port}"
+        try:
+            _wait_ready(process, base_url)
+            return self._run(base_url, session_keys, backend, options)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def _run(self, base_url, session_keys, backend, options):
+        backend.reset_stats()
+        results, elapsed = asyncio.run(run_load(
+            base_url, session_keys, endpoint=options["endpoint"], requests=options["requests"],
+            think=options["think"], timeout=options["timeout"],
+        ))
+        report = summarize(results, elapsed)
+        report["mock"] = backend.snapshot()
+        return report
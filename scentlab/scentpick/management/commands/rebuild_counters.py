@@ -0,0 +1,28 @@
+"""
+perfume_stats / user_stats 재계산 (favorites / feedback_events 기준, 조회 수는 유지)
+
+최초 배포 후 또는 카운터가 이벤트 테이블과 어긋났다고 의심될 때 실행:
+    python manage.py rebuild_counters
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from scentpick.models import Favorite, FeedbackEvent, PerfumeStats, UserStats
+from scentpick.utils.counters import PERFUME, USER, flush_counters, rebuild_counter_tables, reset_cached_counts
+
+
+class Command(BaseCommand):
+    help = "찜/좋아요/싫어요 카운터를 이벤트 테이블 기준으로 다시 계산하고 캐시 카운터 초기화"
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        flush_counters()
+        old_perfumes = set(PerfumeStats.objects.values_list("perfume_id", flat=True))
+        old_users = set(UserStats.objects.values_list("user_id", flat=True))
+        perfumes, users = rebuild_counter_tables(Favorite, FeedbackEvent, PerfumeStats, UserStats)
+        reset_cached_counts(PERFUME, old_perfumes | set(PerfumeStats.objects.values_list("perfume_id", flat=True)))
+        reset_cached_counts(USER, old_users | set(UserStats.objects.values_list("user_id", flat=True)))
+        self.stdout.write(self.style.SUCCESS(
+            f"perfume_stats={perfumes} user_stats={users} ({time.perf_counter() - t0:.1f}s)"
+        ))
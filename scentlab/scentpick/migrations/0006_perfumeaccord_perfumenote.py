@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2025-10-02 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from scentpick.utils.perfume_relations import backfill_perfume_relations
+
+    backfill_perfume_relations(
+        apps.get_model('scentpick', 'Perfume'),
+        apps.get_model('scentpick', 'PerfumeAccord'),
+        apps.get_model('scentpick', 'PerfumeNote'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0005_message_chat_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfumeAccord',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('accord', models.CharField(max_length=50)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('perfume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accords', to='scentpick.perfume')),
+            ],
+            options={
+                'db_table': 'perfume_accords',
+                'indexes': [models.Index(fields=['accord', 'perfume'], name='idx_perfume_accords_accord')],
+                'constraints': [models.UniqueConstraint(fields=('perfume', 'accord'), name='uq_perfume_accord')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PerfumeNote',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('layer', models.CharField(choices=[('top', 'top'), ('middle', 'middle'), ('base', 'base')], max_length=10)),
+                ('note', models.CharField(max_length=100)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('perfume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notes', to='scentpick.perfume')),
+            ],
+            options={
+                'db_table': 'perfume_notes',
+                'indexes': [models.Index(fields=['note', 'layer'], name='idx_perfume_notes_note_layer')],
+                'constraints': [models.UniqueConstraint(fields=('perfume', 'layer', 'note'), name='uq_perfume_note_layer')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.5 on 2025-10-02 14:31
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from scentpick.utils.scores import backfill_perfume_scores
+
+    backfill_perfume_scores(apps.get_model('scentpick', 'Perfume'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0006_perfumeaccord_perfumenote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfume',
+            name='day_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='perfume',
+            name='night_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='perfume',
+            name='spring_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='perfume',
+            name='summer_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='perfume',
+            name='fall_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='perfume',
+            name='winter_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['gender', 'day_score'], name='idx_perfumes_gender_day'),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['gender', 'night_score'], name='idx_perfumes_gender_night'),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['spring_score'], name='idx_perfumes_spring'),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['summer_score'], name='idx_perfumes_summer'),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['fall_score'], name='idx_perfumes_fall'),
+        ),
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['winter_score'], name='idx_perfumes_winter'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
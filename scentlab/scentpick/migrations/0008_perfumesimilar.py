@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2025-10-04 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0007_perfume_score_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfumeSimilar',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('perfume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar', to='scentpick.perfume')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scentpick.perfume')),
+            ],
+            options={
+                'db_table': 'perfume_similar',
+                'constraints': [models.UniqueConstraint(fields=('perfume', 'rank'), name='uq_perfume_similar_rank')],
+            },
+        ),
+    ]
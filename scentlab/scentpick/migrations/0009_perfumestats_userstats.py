@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2025-10-05 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from scentpick.utils.counters import rebuild_counter_tables
+
+    rebuild_counter_tables(
+        apps.get_model('scentpick', 'Favorite'),
+        apps.get_model('scentpick', 'FeedbackEvent'),
+        apps.get_model('scentpick', 'PerfumeStats'),
+        apps.get_model('scentpick', 'UserStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0008_perfumesimilar'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfumeStats',
+            fields=[
+                ('perfume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='scentpick.perfume')),
+                ('favorite_count', models.IntegerField(default=0)),
+                ('like_count', models.IntegerField(default=0)),
+                ('dislike_count', models.IntegerField(default=0)),
+                ('view_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'perfume_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scent_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('favorite_count', models.IntegerField(default=0)),
+                ('like_count', models.IntegerField(default=0)),
+                ('dislike_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_stats',
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
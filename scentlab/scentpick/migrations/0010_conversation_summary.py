@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2025-10-06 10:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from scentpick.utils.conversation_summary import backfill_conversation_summaries
+
+    backfill_conversation_summaries(
+        apps.get_model('scentpick', 'Conversation'),
+        apps.get_model('scentpick', 'Message'),
+    )
+
+
+def create_trigger(apps, schema_editor):
+    from scentpick.utils.conversation_summary import install_summary_trigger
+
+    install_summary_trigger(schema_editor)
+
+
+def drop_trigger(apps, schema_editor):
+    from scentpick.utils.conversation_summary import drop_summary_trigger
+
+    drop_summary_trigger(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0009_perfumestats_userstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='idx_conv_user_updated'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
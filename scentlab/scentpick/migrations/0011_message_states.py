@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def compact_existing(apps, schema_editor):
+    from scentpick.utils.state_snapshots import compact_all
+
+    compact_all(apps.get_model('scentpick', 'Message'), apps.get_model('scentpick', 'MessageState'))
+
+
+def restore_existing(apps, schema_editor):
+    from scentpick.utils.state_snapshots import restore_all
+
+    restore_all(apps.get_model('scentpick', 'Message'), apps.get_model('scentpick', 'MessageState'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0010_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageState',
+            fields=[
+                ('message', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='compact_state', serialize=False, to='scentpick.message')),
+                ('seq', models.PositiveIntegerField()),
+                ('base_seq', models.PositiveIntegerField(help_text='복원 시작 keyframe의 seq')),
+                ('codec', models.CharField(max_length=8)),
+                ('data', models.BinaryField()),
+                ('raw_size', models.PositiveIntegerField(help_text='원본 JSON 바이트 수')),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scentpick.conversation')),
+            ],
+            options={
+                'db_table': 'message_states',
+                'constraints': [models.UniqueConstraint(fields=('conversation', 'seq'), name='uniq_message_states_conv_seq')],
+            },
+        ),
+        migrations.RunPython(compact_existing, restore_existing),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0011_message_states'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatSubmissionClaim',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'chat_submission_claims',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scentpick', '0012_chat_submission_claims'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='perfume',
+            name='day_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='perfume',
+            name='fall_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='perfume',
+            name='night_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='perfume',
+            name='spring_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='perfume',
+            name='summer_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+        migrations.AlterField(
+            model_name='perfume',
+            name='winter_score',
+            field=models.FloatField(db_default=0.0, default=0.0),
+        ),
+    ]
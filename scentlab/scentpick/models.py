@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .utils.scores import SCORE_FIELDS, score_columns
+
 USER_MODEL = settings.AUTH_USER_MODEL  # 기본값: auth.User
 
 # Django 모델에서 기본값은 null=False (즉, NOT NULL)
@@ -43,6 +45,15 @@ class Perfume(models.Model):
     season_score = models.JSONField(blank=True, null=True)          # {"winter": 14.2, "summer": 22.5, ...}
     day_night_score = models.JSONField(blank=True, null=True)       # {"day": 47.1, "night": 25.9}
 
+    # 정렬/필터용 숫자 컬럼 (save() 시 season_score / day_night_score에서 자동 계산)
+    # db_default: sql/perfumes.sql처럼 점수 컬럼 없이 INSERT해도 0 → 적재 후 backfill_perfume_scores
+    day_score = models.FloatField(default=0.0, db_default=0.0)
+    night_score = models.FloatField(default=0.0, db_default=0.0)
+    spring_score = models.FloatField(default=0.0, db_default=0.0)
+    summer_score = models.FloatField(default=0.0, db_default=0.0)
+    fall_score = models.FloatField(default=0.0, db_default=0.0)
+    winter_score = models.FloatField(default=0.0, db_default=0.0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -52,6 +63,12 @@ class Perfume(models.Model):
             models.Index(fields=["brand"]),
             models.Index(fields=["name"]),
             models.Index(fields=["updated_at"]),
+            models.Index(fields=["gender", "day_score"], name="idx_perfumes_gender_day"),
+            models.Index(fields=["gender", "night_score"], name="idx_perfumes_gender_night"),
+            models.Index(fields=["spring_score"], name="idx_perfumes_spring"),
+            models.Index(fields=["summer_score"], name="idx_perfumes_summer"),
+            models.Index(fields=["fall_score"], name="idx_perfumes_fall"),
+            models.Index(fields=["winter_score"], name="idx_perfumes_winter"),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -63,6 +80,87 @@ class Perfume(models.Model):
     def __str__(self):
         return f"{self.brand} {self.name}"
 
+    def save(self, *args, **kwargs):
+        for field, value in score_columns(self.season_score, self.day_night_score).items():
+            setattr(self, field, value)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"season_score", "day_night_score"} & set(update_fields):
+            kwargs["update_fields"] = set(update_fields) | set(SCORE_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class PerfumeAccord(models.Model):
+    """
+    향수-메인어코드 정규화 테이블 (perfume_accords)
+    Perfume.main_accords JSON을 풀어서 보관 → 어코드 필터를 인덱스 조인으로 처리
+    """
+    id = models.BigAutoField(primary_key=True)
+    perfume = models.ForeignKey(Perfume, on_delete=models.CASCADE, related_name="accords")
+    accord = models.CharField(max_length=50)
+    position = models.PositiveSmallIntegerField(default=0)   # main_accords 내 순서(0부터)
+
+    class Meta:
+        db_table = "perfume_accords"
+        indexes = [
+            models.Index(fields=["accord", "perfume"], name="idx_perfume_accords_accord"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["perfume", "accord"], name="uq_perfume_accord"),
+        ]
+
+    def __str__(self):
+        return f"P#{self.perfume_id} {self.accord}"
+
+
+class PerfumeNote(models.Model):
+    """
+    향수-노트 정규화 테이블 (perfume_notes)
+    top_notes / middle_notes / base_notes JSON을 layer별로 풀어서 보관
+    """
+    class Layer(models.TextChoices):
+        TOP = "top", "top"
+        MIDDLE = "middle", "middle"
+        BASE = "base", "base"
+
+    id = models.BigAutoField(primary_key=True)
+    perfume = models.ForeignKey(Perfume, on_delete=models.CASCADE, related_name="notes")
+    layer = models.CharField(max_length=10, choices=Layer.choices)
+    note = models.CharField(max_length=100)
+    position = models.PositiveSmallIntegerField(default=0)   # 같은 layer 내 순서(0부터)
+
+    class Meta:
+        db_table = "perfume_notes"
+        indexes = [
+            models.Index(fields=["note", "layer"], name="idx_perfume_notes_note_layer"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["perfume", "layer", "note"], name="uq_perfume_note_layer"),
+        ]
+
+    def __str__(self):
+        return f"P#{self.perfume_id} {self.layer}:{self.note}"
+
+
+class PerfumeSimilar(models.Model):
+    """
+    향수별 유사 향수 Top-K (perfume_similar)
+    notes_score / main_accords / season_score 벡터 코사인 유사도를 build_similar_perfumes 관리 명령으로 미리 계산
+    """
+    id = models.BigAutoField(primary_key=True)
+    perfume = models.ForeignKey(Perfume, on_delete=models.CASCADE, related_name="similar")
+    similar = models.ForeignKey(Perfume, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()   # 1부터
+    score = models.FloatField()                 # 코사인 유사도
+
+    class Meta:
+        db_table = "perfume_similar"
+        constraints = [
+            models.UniqueConstraint(fields=["perfume", "rank"], name="uq_perfume_similar_rank"),
+        ]
+
+    def __str__(self):
+        return f"P#{self.perfume_id} #{self.rank} P#{self.similar_id} ({self.score:.3f})"
+
 
 class NoteImage(models.Model):
     """
@@ -94,11 +192,18 @@ class Conversation(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # 사이드바 요약 — messages INSERT 시 트리거(MySQL) / 시그널로 유지 (utils.conversation_summary)
+    last_message_preview = models.CharField(max_length=100, blank=True, null=True)
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(blank=True, null=True)
+
     class Meta:
         db_table = "conversations"
         indexes = [
             models.Index(fields=["user"]),
             models.Index(fields=["updated_at"]),
+            # 사이드바: WHERE user_id = ? ORDER BY updated_at DESC, id DESC (커서)
+            models.Index(fields=["user", "-updated_at", "-id"], name="idx_conv_user_updated"),
             # 🔸 external_thread_id는 UniqueConstraint로 커버되므로 별도 Index 제거하는 걸 권장
             # models.Index(fields=["external_thread_id"]),
         ]
@@ -145,6 +250,54 @@ class Message(models.Model):
     def __str__(self):
         return f"{self.role}@{self.conversation_id}"
 
+    def get_state(self):
+        """LangGraph state — 압축 보관된 경우 message_states에서 복원 (utils.state_snapshots)"""
+        if "state" not in self.get_deferred_fields() and self.state is not None:
+            return self.state
+        from .utils.state_snapshots import load_state
+
+        return load_state(self.pk)
+
+
+class MessageState(models.Model):
+    """
+    messages.state 압축 보관 (utils.state_snapshots) — 대화별 seq 순서의 zlib JSON, keyframe(full) + 직전 대비 delta
+    메시지 단건 삭제로 delta 체인이 끊기지 않도록 message는 FK 제약 없이 연결, 대화 삭제 시 함께 삭제
+    """
+    message = models.OneToOneField(
+        Message, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name="compact_state",
+    )
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name="+")
+    seq = models.PositiveIntegerField()
+    base_seq = models.PositiveIntegerField(help_text="복원 시작 keyframe의 seq")
+    codec = models.CharField(max_length=8)
+    data = models.BinaryField()
+    raw_size = models.PositiveIntegerField(help_text="원본 JSON 바이트 수")
+
+    class Meta:
+        db_table = "message_states"
+        constraints = [
+            models.UniqueConstraint(fields=["conversation", "seq"], name="uniq_message_states_conv_seq"),
+        ]
+
+    def __str__(self):
+        return f"{self.codec}#{self.seq}@{self.conversation_id}"
+
+
+class ChatSubmissionClaim(models.Model):
+    """
+    채팅 전송 처리 중 표식 (utils.idempotency) — 키가 PK라 여러 워커가 동시에 잡아도 INSERT는 한 요청만 성공
+    완료/실패 시 삭제, 워커가 죽어 남은 표식은 CHAT_IDEMPOTENCY_PENDING_TTL이 지나면 다음 요청이 가져감
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "chat_submission_claims"
+
+    def __str__(self):
+        return self.key
+
 # -----------------------------
 # Favorites
 # -----------------------------
@@ -268,4 +421,44 @@ class FeedbackEvent(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.created_at:%Y-%m-%d %H:%M} {self.user_id} {self.action} P#{self.perfume_id}"
\ No newline at end of file
+        return f"{self.created_at:%Y-%m-%d %H:%M} {self.user_id} {self.action} P#{self.perfume_id}"
+
+# -----------------------------
+# Popularity counters (write-behind)
+# -----------------------------
+class PerfumeStats(models.Model):
+    """
+    향수별 찜/좋아요/싫어요/조회 수 (perfume_stats)
+    utils.counters 버퍼에 모았다가 배치로 반영 → 이벤트 테이블 COUNT 대신 조회
+    """
+    perfume = models.OneToOneField(
+        Perfume, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    favorite_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+    dislike_count = models.IntegerField(default=0)
+    view_count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "perfume_stats"
+
+    def __str__(self):
+        return f"P#{self.perfume_id} fav={self.favorite_count} like={self.like_count} view={self.view_count}"
+
+
+class UserStats(models.Model):
+    """사용자별 찜/좋아요/싫어요 합계 (user_stats)"""
+    user = models.OneToOneField(
+        USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="scent_stats"
+    )
+    favorite_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+    dislike_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_stats"
+
+    def __str__(self):
+        return f"{self.user_id} fav={self.favorite_count} like={self.like_count} dislike={self.dislike_count}"
@@ -0,0 +1,98 @@
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from uauth.models import UserDetail
+
+from .models import Conversation, Favorite, FeedbackEvent, Message, NoteImage, Perfume
+from .utils.catalog_cache import bump_catalog_generation, bump_note_images_version, bump_user_version
+from .utils.conversation_summary import apply_message, uses_db_trigger
+from .utils.counters import COUNTED_ACTIONS, PERFUME, USER, maybe_flush_counters, record_on_commit
+from .utils.facets import invalidate_facet_index
+from .utils.perfume_relations import sync_perfume_relations
+from .utils.search import mark_search_index_dirty, remove_from_search_index
+
+
+@receiver(post_save, sender=Perfume)
+def invalidate_catalog_indexes(sender, instance: Perfume, raw=False, **kwargs):
+    if not raw:
+        sync_perfume_relations(instance)
+    invalidate_facet_index()
+    mark_search_index_dirty()
+    bump_catalog_generation()
+
+
+@receiver(post_delete, sender=Perfume)
+def remove_from_catalog_indexes(sender, instance: Perfume, **kwargs):
+    invalidate_facet_index()
+    remove_from_search_index(instance.pk)
+    bump_catalog_generation()
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=FeedbackEvent)
+@receiver(post_delete, sender=FeedbackEvent)
+@receiver(post_save, sender=UserDetail)
+def bump_user_state_version(sender, instance, **kwargs):
+    """찜/피드백/프로필 변경 → 해당 사용자 화면의 ETag 갱신"""
+    bump_user_version(instance.user_id)
+
+
+@receiver(post_save, sender=NoteImage)
+@receiver(post_delete, sender=NoteImage)
+def reload_note_images(sender, instance, **kwargs):
+    """노트 이미지 변경 → 각 프로세스의 노트 이미지 리졸버 재적재"""
+    bump_note_images_version()
+
+
+def _count(instance, field, delta):
+    record_on_commit(PERFUME, instance.perfume_id, field, delta)
+    record_on_commit(USER, instance.user_id, field, delta)
+
+
+@receiver(post_save, sender=Favorite)
+def count_favorite_added(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _count(instance, "favorite", 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_favorite_removed(sender, instance, **kwargs):
+    _count(instance, "favorite", -1)
+
+
+@receiver(post_init, sender=FeedbackEvent)
+def remember_feedback_action(sender, instance, **kwargs):
+    """저장 시 좋아요 ↔ 싫어요 전환을 알 수 있도록 로드 시점 action 보관"""
+    instance._counted_action = instance.action if instance.pk else None
+
+
+@receiver(post_save, sender=FeedbackEvent)
+def count_feedback_saved(sender, instance, created, raw=False, **kwargs):
+    previous = None if created else instance._counted_action
+    if not raw and previous != instance.action:
+        if previous in COUNTED_ACTIONS:
+            _count(instance, previous, -1)
+        if instance.action in COUNTED_ACTIONS:
+            _count(instance, instance.action, 1)
+    instance._counted_action = instance.action
+
+
+@receiver(post_delete, sender=FeedbackEvent)
+def count_feedback_removed(sender, instance, **kwargs):
+    if instance._counted_action in COUNTED_ACTIONS:
+        _count(instance, instance._counted_action, -1)
+
+
+@receiver(request_finished)
+def flush_counters_after_request(sender, **kwargs):
+    """응답 후 카운터 버퍼 배치 반영 (주기/건수 기준)"""
+    maybe_flush_counters()
+
+
+@receiver(post_save, sender=Message)
+def update_conversation_summary(sender, instance, created, raw=False, **kwargs):
+    """새 메시지 → 대화 요약 컬럼 (MySQL은 DB 트리거가 처리)"""
+    if created and not raw and not uses_db_trigger():
+        apply_message(Conversation, instance)
@@ -0,0 +1,27 @@
+"""
+향수 이미지 템플릿 태그
+
+    {% load perfume_images %}
+    <img src="{% perfume_image_url p.id 320 %}" {% perfume_srcset p.id sizes="220px" %} alt="...">
+"""
+from django import template
+from django.utils.html import format_html
+
+from scentpick.utils import perfume_images
+
+register = template.Library()
+
+
+@register.simple_tag
+def perfume_image_url(perfume_id, width=None):
+    """표시 폭에 맞는 썸네일 URL (변형 비활성이면 원본)"""
+    return perfume_images.perfume_image_url(perfume_id, width)
+
+
+@register.simple_tag
+def perfume_srcset(perfume_id, sizes="100vw"):
+    """srcset/sizes 속성 문자열 (변형 비활성이면 빈 문자열 → 원본 src만 사용)"""
+    srcset = perfume_images.perfume_srcset(perfume_id)
+    if not srcset:
+        return ""
+    return format_html('srcset="{}" sizes="{}"', srcset, sizes)
@@ -1,3 +1,1180 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
 
-# Create your tests here.
+import httpx
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    ChatSubmissionClaim, Conversation, Favorite, FeedbackEvent, Message, MessageState, NoteImage, Perfume, PerfumeSimilar, PerfumeStats,
+    RecCandidate, RecRun, UserStats,
+)
+from .utils import (
+    answer_cache, catalog_snapshot, chat_backend, chat_images, chat_loadtest, counters, facets, idempotency,
+    mock_chat_backend, perfume_images, search, similarity, state_snapshots, suggest,
+)
+from .utils.brand_aliases import distinct_brand_aliases, normalize_name
+from .utils.image_storage import LocalImageStorage, S3ImageStorage, get_image_storage
+from .utils.pagination import decode_cursor, encode_cursor
+from .utils.note_images import NoteImageResolver, get_note_image_resolver
+
+# product_detail 쿼리 예산
+# 로그인: 세션 + 사용자 + 상세 로더 + 유사 향수 + base.html의 user.detail
+PRODUCT_DETAIL_QUERY_BUDGET = 5
+# 304 재검증: 세션 + 사용자 + 상세 로더(ETag 계산)
+PRODUCT_DETAIL_NOT_MODIFIED_BUDGET = 3
+# 비로그인: 상세 로더 + 유사 향수
+PRODUCT_DETAIL_ANON_BUDGET = 2
+# 대화 메시지 API: 세션 + 사용자 + 대화 + 메시지 + run 목록 + 후보 (메시지 수와 무관)
+CONVERSATION_MESSAGES_BUDGET = 6
+# 사이드바 대화 목록 API: 세션 + 사용자 + 대화 목록 (대화 수와 무관)
+CONVERSATIONS_BUDGET = 3
+
+
+@contextmanager
+def _shared_catalog_cache():
+    """카탈로그 캐시를 파일 캐시(프로세스 간 공유)로 — ETag/세대 카운터가 켜지는 구성"""
+    with tempfile.TemporaryDirectory() as tmp, override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "catalog": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tmp},
+    }):
+        yield
+
+
+def _perfume(name):
+    return Perfume.objects.create(
+        brand="테스트", name=name, description="", concentration="오 드 퍼퓸",
+        main_accords=["우디"], top_notes=["베르가못"], middle_notes=["장미"], base_notes=["머스크"],
+        season_score={"fall": 50.0}, day_night_score={"day": 40.0, "night": 60.0},
+    )
+
+
+
+def _perfume_of(brand, name):
+    return Perfume.objects.create(
+        brand=brand, name=name, description="", concentration="오 드 퍼퓸", main_accords=["우디"],
+    )
+
+
+def _catalog():
+    """패싯/검색/커서 테스트용 카탈로그: 브랜드 3 × 성별 3 × 농도 2 = 18개"""
+    brands = ["샤넬", "톰 포드", "딥티크"]
+    genders = ["Male", "Female", "Unisex"]
+    concs = ["오 드 퍼퓸", "오 드 뚜왈렛"]
+    accords = ["woody", "citrus", "floral", "musky"]
+    perfumes = []
+    for i in range(18):
+        perfumes.append(Perfume.objects.create(
+            brand=brands[i % 3], name=f"향수 {i:02d}", description="", concentration=concs[i % 2],
+            gender=genders[(i // 3) % 3], main_accords=[accords[i % 4], accords[(i + 1) % 4]],
+            sizes=[[30, 50], [50, 100], [100]][(i // 2) % 3],
+        ))
+    return perfumes
+
+
+# 카운터 배치 반영이 측정 구간에 끼지 않도록 주기 반영 끔
+@override_settings(COUNTER_FLUSH_INTERVAL=0)
+class ProductDetailQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prev = _perfume("이전")
+        cls.perfume = _perfume("본품")
+        cls.next = _perfume("다음")
+        cls.user = User.objects.create_user("budget", password="pw")
+        Favorite.objects.create(user=cls.user, perfume=cls.perfume)
+        FeedbackEvent.objects.create(user=cls.user, perfume=cls.perfume, source="detail", action="like")
+        PerfumeSimilar.objects.create(perfume=cls.perfume, similar=cls.next, rank=1, score=0.9)
+        PerfumeSimilar.objects.create(perfume=cls.perfume, similar=cls.prev, rank=2, score=0.8)
+
+    def setUp(self):
+        # 노트 이미지 리졸버는 프로세스당 1회 적재 → 예산에서 제외
+        get_note_image_resolver()
+        self.addCleanup(counters._buffer.clear)  # 조회 수 버퍼 (롤백된 향수)
+        self.url = reverse("scentpick:product_detail", args=[self.perfume.id])
+
+    def test_logged_in_query_budget(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(PRODUCT_DETAIL_QUERY_BUDGET):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["is_favorite"])
+        self.assertEqual(response.context["feedback_status"], "like")
+        self.assertEqual(response.context["prev_perfume_id"], self.prev.id)
+        self.assertEqual(response.context["next_perfume_id"], self.next.id)
+        self.assertEqual([p.id for p in response.context["similar_perfumes"]], [self.next.id, self.prev.id])
+
+    def test_not_modified_query_budget(self):
+        self.client.force_login(self.user)
+        with _shared_catalog_cache():
+            self.client.get(self.url)  # CSRF 쿠키 발급
+            etag = self.client.get(self.url)["ETag"]
+            with self.assertNumQueries(PRODUCT_DETAIL_NOT_MODIFIED_BUDGET):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_process_local_cache_skips_conditional_get(self):
+        # locmem 세대/사용자 버전은 워커마다 달라 다른 워커의 찜 변경을 놓친 304가 될 수 있음 → 항상 200
+        self.client.force_login(self.user)
+        with _shared_catalog_cache():
+            self.client.get(self.url)
+            etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_anonymous_query_budget(self):
+        with self.assertNumQueries(PRODUCT_DETAIL_ANON_BUDGET):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["is_favorite"])
+        self.assertIsNone(response.context["feedback_status"])
+
+    def test_missing_perfume_is_404(self):
+        response = self.client.get(reverse("scentpick:product_detail", args=[self.next.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CatalogCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.perfumes = [_perfume(f"향수 {i:02d}") for i in range(30)] + _catalog()
+        cls.user = User.objects.create_user("catalog", password="pw")
+
+    def setUp(self):
+        counters.catalog_cache().clear()
+        self.client.force_login(self.user)
+
+    def _page(self, cursor):
+        response = self.client.get(reverse("scentpick:perfumes"), {"ajax": "1", "cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+        return [p.id for p in response.context["page_obj"]], response.context["next_cursor"]
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        first, _ = self._page("")
+        for payload in ({"k": [1, 2, 999999]}, {"k": ["a", None, 3]}, {"k": ["a", "b", True]}, {"o": -1}):
+            self.assertIsNone(decode_cursor(encode_cursor(payload)))
+            self.assertEqual(self._page(encode_cursor(payload))[0], first)
+        self.assertEqual(self._page("!!not-base64!!")[0], first)
+
+    def _walk(self, **params):
+        seen, cursor = [], ""
+        while True:
+            response = self.client.get(reverse("scentpick:perfumes"), {"ajax": "1", "cursor": cursor, **params})
+            seen.extend(p.id for p in response.context["page_obj"])
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                return seen
+
+    def test_keyset_pages_have_no_gaps_or_duplicates(self):
+        expected = [p.id for p in sorted(Perfume.objects.all(), key=lambda p: (p.brand, p.name, p.id))]
+        self.assertGreater(len(expected), 24)
+        self.assertEqual(self._walk(), expected)
+        shanel = list(Perfume.objects.filter(brand="샤넬").order_by("name", "id").values_list("id", flat=True))
+        self.assertEqual(self._walk(brand="샤넬"), shanel)
+
+    def test_cursor_survives_deleting_the_last_seen_perfume(self):
+        first, cursor = self._page("")
+        Perfume.objects.filter(pk=first[-1]).delete()
+        rest, _ = self._page(cursor)
+        ordered = [p.id for p in sorted(Perfume.objects.all(), key=lambda p: (p.brand, p.name, p.id))]
+        self.assertEqual(rest, ordered[len(first) - 1:len(first) - 1 + len(rest)])
+
+    def test_search_pages_follow_relevance_order(self):
+        ranked = search.search_perfume_ids("향수")[0]
+        self.assertEqual(self._walk(q="향수"), ranked)
+
+
+class FacetIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _catalog()
+
+    def setUp(self):
+        facets.invalidate_facet_index()
+        self.index = facets.get_facet_index()
+
+    def _orm_ids(self, selection):
+        """baseline perfumes 뷰의 ORM 필터 (sizes__contains는 sqlite 미지원 → 파이썬으로)"""
+        from django.db.models import Q
+
+        qs = Perfume.objects.all()
+        if selection.get("brand"):
+            qs = qs.filter(brand__in=selection["brand"])
+        for facet, lookup in (("gender", "gender__iexact"), ("conc", "concentration__icontains"),
+                              ("accord", "main_accords__icontains")):
+            if selection.get(facet):
+                q = Q()
+                for value in selection[facet]:
+                    q |= Q(**{lookup: value})
+                qs = qs.filter(q)
+        sizes = {int(v) for v in selection.get("size", [])}
+        return [
+            p.id for p in qs.order_by("brand", "name", "id")
+            if not sizes or sizes & set(p.sizes)
+        ]
+
+    def test_filters_match_orm(self):
+        for selection in (
+            {},
+            {"brand": ["샤넬", "딥티크"]},
+            {"gender": ["male"]},
+            {"conc": ["뚜왈렛"], "accord": ["wood"]},
+            {"brand": ["톰 포드"], "gender": ["Female", "unisex"], "size": ["100"]},
+            {"accord": ["citrus", "musky"], "size": ["30", "50"]},
+            {"brand": ["없는 브랜드"]},
+        ):
+            mask, _ = self.index.search(selection)
+            self.assertEqual(self.index.ids_for(mask), self._orm_ids(selection), selection)
+
+    def test_option_counts_apply_other_facets_only(self):
+        selection = {"brand": ["샤넬"], "gender": ["male"]}
+        _, counts = self.index.search(selection)
+        for brand in ("샤넬", "톰 포드", "딥티크"):
+            self.assertEqual(counts["brand"][brand], len(self._orm_ids({"brand": [brand], "gender": ["male"]})))
+        for gender in ("Male", "Female", "Unisex"):
+            self.assertEqual(counts["gender"][gender], len(self._orm_ids({"brand": ["샤넬"], "gender": [gender]})))
+        self.assertEqual(counts["size"][100], len(self._orm_ids({**selection, "size": ["100"]})))
+
+
+@override_settings(CATALOG_SEARCH_BACKEND="bm25", SEARCH_INDEX_REFRESH=0)
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def make(brand, name, description="", top_notes=None, accords=("woody",)):
+            return Perfume.objects.create(
+                brand=brand, name=name, description=description, concentration="오 드 퍼퓸",
+                main_accords=list(accords), top_notes=top_notes or [], middle_notes=[], base_notes=[],
+            )
+
+        cls.oud_name = make("톰 포드", "Oud Wood")
+        cls.oud_desc = make("샤넬", "Coco", description="a little oud in the drydown")
+        cls.bergamot = make("딥티크", "Philosykos", top_notes=["베르가못"], accords=("green",))
+        cls.fresh = make("딥티크", "Eau Rose", accords=("floral",))
+
+    def setUp(self):
+        search._index = None
+
+    def test_field_weights_rank_name_above_description(self):
+        self.assertEqual(search.search_perfume_ids("oud"), ([self.oud_name.id, self.oud_desc.id], True))
+
+    def test_korean_spacing_and_brand_aliases_match(self):
+        expected = [self.oud_name.id]
+        for q in ("톰 포드", "톰포드", "tom ford", "Tom Ford"):
+            self.assertEqual(search.search_perfume_ids(q)[0], expected, q)
+        self.assertEqual(search.search_perfume_ids("bergamot")[0], [self.bergamot.id])  # 한국어 노트의 영문명
+        self.assertEqual(search.search_perfume_ids("베르가못")[0], [self.bergamot.id])
+
+    def test_incremental_refresh_after_updated_at_change(self):
+        self.assertEqual(search.search_perfume_ids("velvet")[0], [])
+        Perfume.objects.filter(pk=self.fresh.pk).update(
+            name="Velvet Rose", updated_at=timezone.now() + timedelta(seconds=5),
+        )
+        with patch.object(search, "_build", side_effect=AssertionError("full rebuild")):
+            self.assertEqual(search.search_perfume_ids("velvet")[0], [self.fresh.id])
+            self.assertEqual(search.search_perfume_ids("eau rose")[0], [])
+
+
+class PerfumeSuggestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.oud = _perfume_of("톰 포드", "오드 우드")
+        cls.orchid = _perfume_of("톰 포드", "블랙 오키드")
+        _perfume_of("샤넬", "넘버 5")
+        PerfumeStats.objects.create(perfume_id=cls.orchid.id, favorite_count=10)
+        cls.user = User.objects.create_user("suggest", password="pw")
+
+    def setUp(self):
+        suggest._index = None
+        counters.catalog_cache().clear()
+        self.client.force_login(self.user)
+
+    def _suggest(self, q):
+        return self.client.get(reverse("scentpick:perfume_suggest_api"), {"q": q}).json()["items"]
+
+    def test_brand_aliases_normalize_to_one_key(self):
+        self.assertEqual({normalize_name(a) for a in ("톰 포드", "톰포드", "톰포 드")}, {"톰포드"})
+        self.assertEqual(normalize_name("Tom Ford"), "tomford")
+        self.assertEqual(distinct_brand_aliases("톰 포드"), ["톰 포드", "Tom Ford"])
+
+    def test_korean_english_and_unspaced_brand_give_same_suggestions(self):
+        results = [self._suggest(q) for q in ("톰 포드", "tom ford", "톰포드")]
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[0][0], {"type": "brand", "brand": "톰 포드", "count": 2})
+        # 같은 브랜드 향수는 인기도(찜) 순
+        self.assertEqual([i["id"] for i in results[0][1:]], [self.orchid.id, self.oud.id])
+
+    def test_brand_plus_name_and_partial_name(self):
+        self.assertEqual([i["id"] for i in self._suggest("tom ford 오드")], [self.oud.id])
+        self.assertEqual([i["id"] for i in self._suggest("톰포드오")], [self.oud.id])
+        self.assertEqual([i.get("id") for i in self._suggest("우드")], [self.oud.id])
+        self.assertEqual(self._suggest("   "), [])
+
+
+class NoteImageResolverTests(TestCase):
+    def test_match_precedence(self):
+        resolver = NoteImageResolver([
+            (1, "Bergamot Leaf", "leaf.jpg"),
+            (2, "bergamot", "bergamot.jpg"),
+            (3, "Sandalwood Oil", "sandal-1.jpg"),
+            (4, "Australian Sandalwood", "sandal-2.jpg"),
+            (5, "Pepper Tree", "pepper.jpg"),
+            (6, "White Musk", "musk.jpg"),
+            (7, "유자껍질 추출물", "yuja.jpg"),
+            (8, None, "none.jpg"),
+        ])
+        self.assertEqual(resolver.resolve("베르가못"), "bergamot.jpg")   # 1. 영문명 정확 일치 (id가 작은 포함 일치보다 우선)
+        self.assertEqual(resolver.resolve("샌달우드"), "sandal-1.jpg")   # 2. 영문명 포함, id가 작은 행
+        self.assertEqual(resolver.resolve("후추"), "pepper.jpg")         # 3. Black Pepper → 3글자 이상 단어 "pepper"
+        self.assertEqual(resolver.resolve("화이트 머스크"), "musk.jpg")  # NOTE_TRANSLATIONS 역방향 번역
+        self.assertEqual(resolver.resolve("유자껍질"), "yuja.jpg")       # 4. 한국어 원문 포함
+        self.assertIsNone(resolver.resolve("없는 노트"))
+        self.assertIsNone(resolver.resolve(""))
+        self.assertEqual(resolver.resolve_many(["베르가못", "없는 노트"]), {"베르가못": "bergamot.jpg", "없는 노트": None})
+
+    def test_reloads_after_note_image_change(self):
+        note = NoteImage.objects.create(note_name="Bergamot", image_url="old.jpg")
+        self.assertEqual(get_note_image_resolver().resolve("베르가못"), "old.jpg")
+        NoteImage.objects.filter(pk=note.pk).update(image_url="new.jpg")  # update()는 signals 없음 → 버전 그대로
+        self.assertEqual(get_note_image_resolver().resolve("베르가못"), "old.jpg")
+        note.refresh_from_db()
+        note.save()  # 저장 signal → 버전 +1 → 재적재
+        self.assertEqual(get_note_image_resolver().resolve("베르가못"), "new.jpg")
+
+
+# 카운터는 커밋 후(on_commit) 기록 → 실제 커밋이 일어나는 TransactionTestCase
+@override_settings(COUNTER_FLUSH_INTERVAL=0)
+class PopularityCounterTests(TransactionTestCase):
+    def setUp(self):
+        self.perfume = _perfume("카운터")
+        self.user = User.objects.create_user("counter", password="pw")
+        counters._buffer.clear()
+        counters.catalog_cache().clear()
+        self.addCleanup(counters._buffer.clear)
+        self.client.force_login(self.user)
+
+    def _post(self, name, **data):
+        response = self.client.post(
+            reverse(f"scentpick:{name}"), {"perfume_id": self.perfume.id, **data},
+            content_type="application/json",
+        )
+        return response.json()
+
+    def test_toggles_update_counters_without_event_counts(self):
+        self.assertEqual(self._post("toggle_favorite")["debug_total_favorites"], 1)
+        self._post("toggle_like_dislike", action="like")
+        body = self._post("toggle_like_dislike", action="dislike")  # 좋아요 → 싫어요
+        self.assertEqual((body["debug_likes"], body["debug_dislikes"]), (0, 1))
+        self.assertEqual(self._post("toggle_favorite")["debug_total_favorites"], 0)
+        self.assertEqual(
+            counters.get_perfume_counts(self.perfume.id),
+            {"favorite": 0, "like": 0, "dislike": 1, "view": 0},
+        )
+
+    def test_flush_writes_batched_deltas(self):
+        self._post("toggle_favorite")
+        self._post("toggle_like_dislike", action="like")
+        self.client.get(reverse("scentpick:product_detail", args=[self.perfume.id]))
+        self.client.get(reverse("scentpick:product_detail", args=[self.perfume.id]))
+        self.assertEqual(counters.flush_counters(), 2)
+        stats = PerfumeStats.objects.get(pk=self.perfume.id)
+        self.assertEqual((stats.favorite_count, stats.like_count, stats.view_count), (1, 1, 2))
+        self.assertEqual(UserStats.objects.get(pk=self.user.id).favorite_count, 1)
+
+        # 캐시가 비어도 테이블 + 버퍼로 같은 값
+        counters.catalog_cache().clear()
+        counters.record_perfume_view(self.perfume.id)
+        self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 3)
+
+    def test_process_local_cache_picks_up_other_workers_after_flush(self):
+        self.assertFalse(counters.catalog_cache_is_shared())  # 테스트 설정: locmem
+        self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 0)
+        # 다른 워커가 조회 수 5를 반영 → 이 프로세스 캐시에는 아직 0
+        PerfumeStats.objects.create(perfume_id=self.perfume.id, view_count=5)
+        self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 0)
+        counters.record_perfume_view(self.perfume.id)
+        counters.flush_counters()
+        self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 6)
+
+        with patch.object(counters.catalog_cache(), "add", wraps=counters.catalog_cache().add) as add:
+            counters.get_user_counts(self.user.id)
+        self.assertEqual({c.args[2] for c in add.call_args_list}, {30})
+
+
+    def test_shared_cache_drops_flushed_keys(self):
+        with _shared_catalog_cache():
+            view_key = counters._cache_key(counters.PERFUME, self.perfume.id, "view")
+            counters.record_perfume_view(self.perfume.id)  # 키가 없어 incr 실패 → 이 워커 버퍼에만 1
+            # 다른 워커가 캐시 미스로 채움: 테이블 0 + 그 워커 버퍼 0
+            counters.catalog_cache().set(view_key, 0)
+            self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 0)
+            counters.flush_counters()
+            self.assertIsNone(counters.catalog_cache().get(view_key))
+            self.assertEqual(counters.get_perfume_counts(self.perfume.id)["view"], 1)
+
+    def test_not_modified_revisit_counts_as_view(self):
+        url = reverse("scentpick:product_detail", args=[self.perfume.id])
+        with _shared_catalog_cache():
+            self.client.get(url)  # CSRF 쿠키 발급
+            etag = self.client.get(url)["ETag"]
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        counters.flush_counters()
+        self.assertEqual(PerfumeStats.objects.get(pk=self.perfume.id).view_count, 3)
+
+
+class CatalogGenerationCommandTests(SimpleTestCase):
+    def test_refuses_process_local_cache(self):
+        before = counters.catalog_cache().get("scentpick:catalog:generation")
+        with self.assertRaisesMessage(CommandError, "프로세스별 백엔드"):
+            call_command("bump_catalog_generation")
+        self.assertEqual(counters.catalog_cache().get("scentpick:catalog:generation"), before)
+
+    def test_bumps_shared_cache(self):
+        with _shared_catalog_cache():
+            out = io.StringIO()
+            call_command("bump_catalog_generation", stdout=out)
+            generation = counters.catalog_cache().get("scentpick:catalog:generation")
+            self.assertIn(f"catalog generation={generation}", out.getvalue())
+
+
+class PerfumeScoreColumnTests(TestCase):
+    def test_seed_insert_without_score_columns_then_backfill(self):
+        # sql/perfumes.sql은 점수 컬럼 없이 INSERT → DB 기본값 0, 적재 후 backfill_perfume_scores
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO perfumes (brand, name, description, concentration, gender, main_accords, "
+                "season_score, day_night_score, created_at, updated_at) VALUES (%s, %s, '', %s, '', %s, %s, %s, %s, %s)",
+                ["겔랑", "시드", "오 드 퍼퓸", "[]", json.dumps({"summer": 61.5}), json.dumps({"night": 70.0}), now, now],
+            )
+        perfume = Perfume.objects.get(name="시드")
+        self.assertEqual((perfume.summer_score, perfume.night_score), (0.0, 0.0))
+
+        call_command("backfill_perfume_scores", stdout=io.StringIO())
+        perfume.refresh_from_db()
+        self.assertEqual((perfume.summer_score, perfume.night_score, perfume.day_score), (61.5, 70.0, 0.0))
+
+
+class ConversationRecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("history", password="pw")
+        cls.a, cls.b = _perfume("에이"), _perfume("비")
+        cls.conv = Conversation.objects.create(user=cls.user, title="추천")
+        base = timezone.now() - timedelta(hours=1)
+        cls.replies = []
+        # (추천 후보) — 두 번째 run은 후보 없음 → 해당 답변에는 perfume_list 없음
+        for turn, ranked in enumerate([[cls.a], [], [cls.b, cls.a]]):
+            asked = cls._message("user", f"질문 {turn}", base + timedelta(minutes=turn * 10))
+            run = RecRun.objects.create(user=cls.user, conversation=cls.conv, request_msg=asked)
+            for rank, perfume in enumerate(ranked, start=1):
+                RecCandidate.objects.create(run_rec=run, perfume=perfume, rank=rank, score=1.0 / rank)
+            cls.replies.append(cls._message("assistant", f"답변 {turn}", base + timedelta(minutes=turn * 10 + 1)))
+
+    @classmethod
+    def _message(cls, role, content, created_at):
+        message = Message.objects.create(conversation=cls.conv, role=role, content=content)
+        Message.objects.filter(pk=message.pk).update(created_at=created_at)
+        return message
+
+    def test_messages_api_maps_latest_run_in_fixed_queries(self):
+        self.client.force_login(self.user)
+        url = reverse("scentpick:conversation_messages_api", args=[self.conv.id])
+        with self.assertNumQueries(CONVERSATION_MESSAGES_BUDGET):
+            items = self.client.get(url).json()["items"]
+        replies = [item for item in items if item["role"] == "assistant"]
+        self.assertEqual([p["id"] for p in replies[0]["perfume_list"]], [self.a.id])
+        self.assertNotIn("perfume_list", replies[1])
+        self.assertEqual([p["id"] for p in replies[2]["perfume_list"]], [self.b.id, self.a.id])
+        self.assertNotIn("perfume_list", items[0])
+
+    def test_messages_api_pages_backwards_with_before_cursor(self):
+        self.client.force_login(self.user)
+        url = reverse("scentpick:conversation_messages_api", args=[self.conv.id])
+        pages, before = [], None
+        while True:
+            params = {"limit": 2, **({"before": before} if before else {})}
+            with self.assertNumQueries(CONVERSATION_MESSAGES_BUDGET) as ctx:
+                body = self.client.get(url, params).json()
+            pages.append([item["content"] for item in body["items"]])
+            self.assertFalse(any("`state`" in q["sql"] or '"state"' in q["sql"] for q in ctx.captured_queries))
+            before = body["before"]
+            if not body["has_more"]:
+                break
+        self.assertEqual(pages, [["질문 2", "답변 2"], ["질문 1", "답변 1"], ["질문 0", "답변 0"]])
+        self.assertIsNone(before)
+        self.assertEqual(self.client.get(url, {"limit": "x"}).status_code, 400)
+
+
+class ConversationSidebarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("sidebar", password="pw")
+        cls.convs = [Conversation.objects.create(user=cls.user) for _ in range(5)]
+        for i, conv in enumerate(cls.convs):
+            Message.objects.create(conversation=conv, role="user", content=f"{i}번째 대화의 첫 질문입니다 길게")
+            Message.objects.create(conversation=conv, role="assistant", content=f"답변 {i}")
+
+    def test_message_insert_maintains_summary(self):
+        conv = Conversation.objects.get(pk=self.convs[0].pk)
+        self.assertEqual(conv.message_count, 2)
+        self.assertEqual(conv.title, "0번째 대화의 첫 질문입니다"[:15])
+        self.assertEqual(conv.last_message_preview, "답변 0")
+        last = conv.messages.order_by("-created_at").first()
+        self.assertEqual(conv.last_message_at, last.created_at)
+
+    def test_sidebar_pages_with_cursor_in_one_query(self):
+        self.client.force_login(self.user)
+        url = reverse("scentpick:conversations_api")
+        seen, cursor = [], ""
+        with patch("scentpick.utils.conversation_summary.SIDEBAR_PAGE_SIZE", 2):
+            while True:
+                with self.assertNumQueries(CONVERSATIONS_BUDGET):
+                    body = self.client.get(url, {"cursor": cursor} if cursor else {}).json()
+                self.assertLessEqual(len(body["items"]), 2)
+                seen.extend(item["id"] for item in body["items"])
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+        self.assertEqual(seen, [c.id for c in reversed(self.convs)])
+
+
+class _FakeChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    calls = 0
+
+    def do_POST(self):
+        type(self).calls += 1
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({
+            "conversation_id": payload.get("conversation_id") or 1,
+            "final_answer": f"응답: {payload['query']}",
+            "perfume_list": [],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ChatBackendPoolTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeChatHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/chat"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        chat_backend.get_client().close()  # 새 풀에서 시작
+        chat_backend.stats.reset()
+        counters.catalog_cache().clear()
+        _FakeChatHandler.calls = 0
+
+    def test_submit_reuses_pooled_connection(self):
+        user = User.objects.create_user("pool", password="pw")
+        self.client.force_login(user)
+        with patch("scentpick.views.FASTAPI_CHAT_URL", self.url):
+            for i in range(3):
+                body = self.client.post(
+                    reverse("scentpick:chat_submit_api"),
+                    data=json.dumps({"content": f"질문 {i}"}), content_type="application/json",
+                ).json()
+                self.assertEqual(body["final_answer"], f"응답: 질문 {i}")
+        stats = chat_backend.backend_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reuse_ratio"], round(2 / 3, 3))
+
+    def _submit(self, content, key=None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return self.client.post(
+            reverse("scentpick:chat_submit_api"),
+            data=json.dumps({"content": content}), content_type="application/json", headers=headers,
+        ).json()
+
+    def test_duplicate_submission_is_answered_once(self):
+        user = User.objects.create_user("idem", password="pw")
+        self.client.force_login(user)
+        with patch("scentpick.views.FASTAPI_CHAT_URL", self.url):
+            first = self._submit("겨울 향수", key="k-1")
+            again = self._submit("겨울 향수", key="k-1")
+            double_click = [self._submit("봄 향수") for _ in range(2)]
+        self.assertEqual(_FakeChatHandler.calls, 2)
+        self.assertTrue(again["replayed"])
+        self.assertEqual(again["final_answer"], first["final_answer"])
+        self.assertTrue(double_click[1]["replayed"])
+
+    @override_settings(CHAT_ANSWER_CACHE_ENABLED=True)
+    def test_answer_cache_serves_equivalent_first_questions(self):
+        user = User.objects.create_user("answer-cache", password="pw")
+        self.client.force_login(user)
+        answer_cache.stats.reset()
+        with patch("scentpick.views.FASTAPI_CHAT_URL", self.url):
+            first = self._submit("여름에 시원한 향수 추천", key="a")
+            exact = self._submit("여름에 시원한 향수 추천해 주세요!", key="b")
+            similar = self._submit("여름에 시원한 향수 추천요", key="c")
+            other_season = self._submit("겨울에 시원한 향수 추천", key="d")
+        self.assertEqual(_FakeChatHandler.calls, 2)
+        self.assertTrue(exact["cached"] and similar["cached"])
+        self.assertEqual(exact["final_answer"], first["final_answer"])
+        self.assertNotIn("cached", other_season)
+        conv = Conversation.objects.get(pk=exact["conversation_id"], user=user)
+        self.assertEqual(list(conv.messages.order_by("id").values_list("role", flat=True)), ["user", "assistant"])
+        metrics = answer_cache.answer_cache_stats()
+        self.assertEqual((metrics["lookups"], metrics["exact_hits"], metrics["semantic_hits"]), (4, 1, 1))
+
+    def test_follow_up_of_cached_conversation_starts_fastapi_thread_with_history(self):
+        user = User.objects.create_user("answer-cache-follow", password="pw")
+        cached_id = answer_cache.materialize(
+            user.id, "여름 향수 추천", {"final_answer": "시트러스 계열을 추천해요", "perfume_list": [], "slots": {}},
+        )
+        sent = []
+
+        def fake_fastapi(url, payload):
+            # FastAPI: 새 스레드/대화를 만들고 받은 질문 그대로 저장
+            sent.append(payload)
+            conv = Conversation.objects.create(user=user)
+            Message.objects.create(conversation=conv, role="user", content=payload["query"])
+            Message.objects.create(conversation=conv, role="assistant", content="더 가벼운 향은 이거예요")
+            return {"conversation_id": conv.id, "final_answer": "더 가벼운 향은 이거예요", "perfume_list": []}
+
+        self.client.force_login(user)
+        with patch("scentpick.views.post_json", fake_fastapi):
+            body = self.client.post(
+                reverse("scentpick:chat_submit_api"),
+                data=json.dumps({"content": "좀 더 가벼운 걸로", "conversation_id": cached_id}),
+                content_type="application/json",
+            ).json()
+        self.assertNotIn("conversation_id", sent[0])
+        self.assertIn("시트러스 계열을 추천해요", sent[0]["query"])
+        self.assertTrue(sent[0]["query"].endswith("좀 더 가벼운 걸로"))
+
+        conv = Conversation.objects.get(pk=body["conversation_id"])
+        self.assertFalse(Conversation.objects.filter(pk=cached_id).exists())
+        self.assertEqual(
+            list(conv.messages.order_by("created_at", "id").values_list("role", "content")),
+            [("user", "여름 향수 추천"), ("assistant", "시트러스 계열을 추천해요"),
+             ("user", "좀 더 가벼운 걸로"), ("assistant", "더 가벼운 향은 이거예요")],
+        )
+        self.assertEqual(conv.title, "여름 향수 추천")
+        # 합친 대화는 FastAPI 답변이 있으므로 다음 질문부터는 그 스레드로
+        self.assertIsNone(answer_cache.cached_turns(user.id, conv.id))
+
+    def test_completed_submission_is_served_from_stored_messages(self):
+        user = User.objects.create_user("idem-db", password="pw")
+        conv = Conversation.objects.create(user=user)
+        key, _ = idempotency.submission_key("k-db", user.id, None, "가을 향수")
+        Message.objects.create(conversation=conv, role="user", content="가을 향수", idempotency_key=key)
+        Message.objects.create(conversation=conv, role="assistant", content="저장된 답변")
+        self.client.force_login(user)
+        with patch("scentpick.views.FASTAPI_CHAT_URL", self.url):
+            body = self._submit("가을 향수", key="k-db")
+        self.assertEqual(_FakeChatHandler.calls, 0)
+        self.assertEqual((body["conversation_id"], body["final_answer"]), (conv.id, "저장된 답변"))
+
+    def test_pending_claim_is_shared_across_workers(self):
+        user = User.objects.create_user("idem-workers", password="pw")
+        key, _ = idempotency.submission_key("k-w", user.id, None, "여름 향수")
+        self.assertTrue(idempotency.begin(key))
+        counters.catalog_cache().clear()  # 다른 워커: 프로세스 캐시는 비어 있고 DB 표식만 보임
+        with override_settings(CHAT_BACKEND_READ_TIMEOUT=0.3):
+            self.assertEqual(idempotency.claim(key, user.id, True), (None, False))
+
+        def finish_on_other_worker(_):
+            conv = Conversation.objects.create(user=user)
+            Message.objects.create(conversation=conv, role="user", content="여름 향수", idempotency_key=key)
+            Message.objects.create(conversation=conv, role="assistant", content="다른 워커의 답변")
+            ChatSubmissionClaim.objects.filter(key=key).delete()
+
+        with patch("scentpick.utils.idempotency.time.sleep", side_effect=finish_on_other_worker):
+            result, owner = idempotency.claim(key, user.id, True)
+        self.assertFalse(owner)
+        self.assertEqual(result["final_answer"], "다른 워커의 답변")
+
+    def test_failure_after_claim_releases_it(self):
+        user = User.objects.create_user("idem-release", password="pw")
+        self.client.force_login(user)
+        with patch("scentpick.views.FASTAPI_CHAT_URL", self.url):
+            with patch("scentpick.views.idempotency.mark_request_message", side_effect=RuntimeError("db down")):
+                failed = self.client.post(
+                    reverse("scentpick:chat_submit_api"),
+                    data=json.dumps({"content": "가을 향수"}), content_type="application/json",
+                )
+            self.assertEqual(failed.status_code, 500)
+            self.assertFalse(ChatSubmissionClaim.objects.exists())
+            retried = self._submit("가을 향수")  # 같은 유도 키 — 표식이 남았으면 대기 후 409
+        self.assertEqual(retried["final_answer"], "응답: 가을 향수")
+        self.assertEqual(_FakeChatHandler.calls, 2)
+
+    @override_settings(CHAT_ANSWER_CACHE_ENABLED=True)
+    def test_stream_failure_before_streaming_releases_claim(self):
+        user = User.objects.create_user("idem-stream-release", password="pw")
+        self.client.force_login(user)
+        with patch("scentpick.views.answer_cache.lookup", side_effect=RuntimeError("cache down")):
+            response = self.client.post(reverse("scentpick:chat_stream_api"), {"content": "겨울 향수 추천"})
+            frames = b"".join(response.streaming_content).decode()
+        self.assertIn("cache down", frames)
+        self.assertFalse(ChatSubmissionClaim.objects.exists())
+
+    @override_settings(CHAT_IDEMPOTENCY_PENDING_TTL=60)
+    def test_stale_claim_is_taken_over(self):
+        self.assertTrue(idempotency.begin("k-stale"))
+        self.assertFalse(idempotency.begin("k-stale"))
+        ChatSubmissionClaim.objects.filter(key="k-stale").update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertTrue(idempotency.begin("k-stale"))
+
+
+class CatalogSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def make(brand, name, notes_score, accords, season):
+            return Perfume.objects.create(
+                brand=brand, name=name, description="", concentration="오 드 퍼퓸", main_accords=accords,
+                top_notes=["베르가못"], middle_notes=["장미"], base_notes=["머스크", "베르가못"],
+                notes_score=notes_score, season_score=season, day_night_score={"day": 60.0, "night": 40.0},
+            )
+
+        cls.perfumes = [
+            make("샤넬", "No 5", {"Rose": 90, "Musk": 40}, ["floral", "powdery"], {"spring": 80.0, "fall": 20.0}),
+            make("딥티크", "Tam Dao", {"Sandalwood": 100}, ["woody"], {"fall": 70.0, "winter": 60.0}),
+            make("톰 포드", "Oud Wood", {"Oud": 95, "Sandalwood": 50}, ["woody", "oud"], {"winter": 90.0}),
+        ]
+
+    def test_export_then_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command("export_catalog_snapshot", out=tmp, stdout=io.StringIO())
+            snapshot = catalog_snapshot.open_current_snapshot(tmp)
+            expected_ids = sorted(p.id for p in self.perfumes)
+            self.assertEqual(snapshot.ids.tolist(), expected_ids)
+
+            i = snapshot.index_of(self.perfumes[2].id)
+            row = snapshot.row(i)
+            self.assertEqual((row["brand"], row["name"], row["main_accords"]), ("톰 포드", "Oud Wood", ["oud", "woody"]))
+            self.assertEqual(row["scores"]["winter_score"], self.perfumes[2].winter_score)
+            notes = snapshot.meta["notes"]
+            self.assertEqual(int(snapshot.notes[i, notes.index("베르가못")]), 1 | 4)  # top + base
+            self.assertIsNone(snapshot.index_of(max(expected_ids) + 1))
+
+            # 스냅샷에서 만든 유사도 벡터 == DB에서 바로 만든 벡터
+            arrays, meta = catalog_snapshot.build_snapshot_arrays(Perfume.objects.values(*catalog_snapshot.SOURCE_FIELDS))
+            from_db = similarity.perfume_vectors(arrays, meta["score_fields"])
+            from_snapshot = similarity.perfume_vectors(
+                {name: getattr(snapshot, name) for name in ("note_scores", "accords", "scores")}, snapshot.score_fields,
+            )
+            self.assertEqual(from_snapshot.tolist(), from_db.tolist())
+
+
+    def test_build_similar_from_stale_snapshot_skips_deleted_perfumes(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(CATALOG_SNAPSHOT_DIR=tmp, CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "catalog": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tmp + "/cache"},
+        }):
+            call_command("export_catalog_snapshot", out=tmp, stdout=io.StringIO())
+            gone = self.perfumes[2]
+            gone.delete()
+            err = io.StringIO()
+            call_command("build_similar_perfumes", snapshot=True, stdout=io.StringIO(), stderr=err)
+        self.assertIn("1개 제외", err.getvalue())
+        rows = list(PerfumeSimilar.objects.values_list("perfume_id", "similar_id", "rank"))
+        self.assertTrue(rows)
+        self.assertNotIn(gone.id, {pid for pid, _, _ in rows} | {sid for _, sid, _ in rows})
+        self.assertEqual(sorted(rank for pid, _, rank in rows if pid == self.perfumes[0].id), [1])
+
+    def test_build_similar_on_process_local_cache_leaves_generation_alone(self):
+        generation = counters.catalog_cache().get("scentpick:catalog:generation")
+        out = io.StringIO()
+        call_command("build_similar_perfumes", stdout=out)
+        self.assertIn("세대를 올리지 않음", out.getvalue())
+        self.assertEqual(counters.catalog_cache().get("scentpick:catalog:generation"), generation)
+        self.assertTrue(PerfumeSimilar.objects.exists())
+
+
+class TopKNeighboursTests(SimpleTestCase):
+    def test_orders_by_score_and_skips_self_and_same_brand_duplicates(self):
+        import numpy as np
+
+        raw = np.array([
+            [1.0, 0.0, 0.0],    # 10 brand 0
+            [1.0, 0.001, 0.0],  # 11 brand 0 — 10과 같은 향 (리필)
+            [0.9, 0.1, 0.0],    # 12 brand 1
+            [0.9, 0.101, 0.0],  # 13 brand 1 — 12와 같은 향, 한 번만
+            [0.5, 0.5, 0.0],    # 14 brand 2
+            [0.0, 0.0, 1.0],    # 15 brand 3 — 직교, 유사도 0
+        ], dtype=np.float32)
+        vectors = raw / np.linalg.norm(raw, axis=1, keepdims=True)
+        ids = [10, 11, 12, 13, 14, 15]
+        brands = [0, 0, 1, 1, 2, 3]
+
+        result = dict(similarity.top_k_neighbours(vectors, ids, brands, k=5, batch_size=4))
+        self.assertEqual(list(result), ids)
+        self.assertEqual([sid for sid, _ in result[10]], [12, 14])
+        scores = [score for _, score in result[10]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual([sid for sid, _ in result[12]], [11, 14])
+        self.assertEqual(result[15], [])
+
+        limited = dict(similarity.top_k_neighbours(vectors, ids, brands, k=1))
+        self.assertEqual([sid for sid, _ in limited[14]], [13])
+
+
+class PerfumeImageTests(SimpleTestCase):
+    def setUp(self):
+        get_image_storage.cache_clear()
+        self.addCleanup(get_image_storage.cache_clear)
+
+    def _render(self, source):
+        from django.template import Context, Template
+
+        return Template("{% load perfume_images %}" + source).render(Context())
+
+    @override_settings(PERFUME_IMAGE_STORAGE="s3", PERFUME_IMAGE_BASE_URL="https://cdn.example.com/",
+                       PERFUME_IMAGE_VARIANTS=True, PERFUME_IMAGE_WIDTHS=(320, 160, 640), PERFUME_IMAGE_FORMAT="webp")
+    def test_srcset_tag_lists_variants_and_picks_nearest_src(self):
+        html = self._render('<img src="{% perfume_image_url 7 300 %}" {% perfume_srcset 7 sizes="220px" %}>')
+        self.assertEqual(html, (
+            '<img src="https://cdn.example.com/perfumes/w320/7.webp" srcset="'
+            "https://cdn.example.com/perfumes/w160/7.webp 160w, https://cdn.example.com/perfumes/w320/7.webp 320w, "
+            'https://cdn.example.com/perfumes/w640/7.webp 640w" sizes="220px">'
+        ))
+        self.assertEqual(perfume_images.perfume_image_url(7, 2000), "https://cdn.example.com/perfumes/w640/7.webp")
+
+    @override_settings(PERFUME_IMAGE_STORAGE="s3", PERFUME_IMAGE_BASE_URL="", PERFUME_IMAGE_VARIANTS=False,
+                       PERFUME_IMAGE_BUCKET="scentpick-images", AWS_REGION="ap-northeast-2")
+    def test_variants_disabled_uses_original_without_srcset(self):
+        html = self._render('<img src="{% perfume_image_url 7 300 %}" {% perfume_srcset 7 %}>')
+        self.assertEqual(html, '<img src="https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/7.jpg" >')
+
+    @override_settings(PERFUME_IMAGE_BASE_URL="https://cdn.example.com", AWS_REGION="ap-northeast-2")
+    def test_s3_urls_use_cdn_only_for_default_bucket(self):
+        self.assertEqual(S3ImageStorage().url("perfumes/1.jpg"), "https://cdn.example.com/perfumes/1.jpg")
+        self.assertEqual(
+            S3ImageStorage(bucket="chat-bucket").url("chat_images/1/a.jpg"),
+            "https://chat-bucket.s3.ap-northeast-2.amazonaws.com/chat_images/1/a.jpg",
+        )
+
+    def test_local_storage_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            PERFUME_IMAGE_STORAGE="local", PERFUME_IMAGE_LOCAL_ROOT=tmp, PERFUME_IMAGE_BASE_URL="",
+        ):
+            storage = get_image_storage()
+            self.assertIsInstance(storage, LocalImageStorage)
+            key = perfume_images.perfume_image_key(3, 160, "webp")
+            self.assertFalse(storage.exists(key))
+            self.assertEqual(storage.save(key, b"data", "image/webp"), "/media/scentpick-images/perfumes/w160/3.webp")
+            self.assertTrue(storage.exists(key))
+            self.assertEqual(storage.read(key), b"data")
+            self.assertEqual(os.listdir(os.path.join(tmp, "perfumes", "w160")), ["3.webp"])  # .part 임시 파일 없음
+
+    def test_render_variants_does_not_upscale(self):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("RGBA", (400, 200), (10, 20, 30, 128)).save(buf, format="PNG")
+        out = perfume_images.render_variants(buf.getvalue(), (160, 640), ("webp", "jpg"))
+        self.assertEqual(set(out), {(160, "webp"), (160, "jpg"), (640, "webp"), (640, "jpg")})
+        self.assertEqual(Image.open(io.BytesIO(out[(160, "jpg")])).size, (160, 80))
+        self.assertEqual(Image.open(io.BytesIO(out[(640, "webp")])).size, (400, 200))
+
+
+class ChatImageUploadTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        overrides = override_settings(CHAT_IMAGE_STORAGE="local", PERFUME_IMAGE_LOCAL_ROOT=tmp.name, CHAT_IMAGE_MAX_EDGE=640)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for cached in (get_image_storage, chat_images.get_chat_image_storage):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def _png(self, size):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("RGBA", size, (200, 120, 40, 128)).save(buf, format="PNG")
+        buf.seek(0)
+        return buf
+
+    def test_background_upload_downscales_and_dedups(self):
+        from PIL import Image
+
+        first = chat_images.submit_chat_image(7, self._png((2000, 1000))).result(timeout=10)
+        self.assertRegex(first, r"chat_images/7/[0-9a-f]{32}\.jpg$")
+        saved = get_image_storage("local").read(first.split("scentpick-images/", 1)[1])
+        self.assertEqual(Image.open(io.BytesIO(saved)).size, (640, 320))
+
+        with patch.object(chat_images.get_chat_image_storage(), "save") as save:
+            again = chat_images.submit_chat_image(7, self._png((2000, 1000))).result(timeout=10)
+        self.assertEqual(again, first)
+        save.assert_not_called()
+
+    def test_rejects_non_image(self):
+        with self.assertRaises(ValueError):
+            chat_images.submit_chat_image(7, io.BytesIO(b"not an image")).result(timeout=10)
+
+
+class ChatStreamResumeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("resume", password="pw")
+
+    async def _frames(self, response, limit=None):
+        frames = []
+        async for chunk in response.streaming_content:
+            frames.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+            if limit and len(frames) >= limit:
+                break
+        return frames
+
+    @patch("scentpick.views.FASTAPI_CHAT_URL", None)  # 내장 mock 응답으로 스트리밍
+    async def test_reconnect_replays_only_missing_frames(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("scentpick:chat_stream_api")
+        with patch("scentpick.views.asyncio.sleep", return_value=None):
+            first = await self._frames(await self.async_client.post(url, {"content": "여름 향수 추천"}), limit=3)
+            self.assertTrue(all(f.startswith("id: ") for f in first))
+            last_id = first[-1].split("\n", 1)[0][4:]
+            stream_id, seq = last_id.split(":")
+
+            rest = await self._frames(await self.async_client.post(url, {}, headers={"Last-Event-ID": last_id}))
+        seqs = [int(f.split("\n", 1)[0].rsplit(":", 1)[1]) for f in rest]
+        self.assertEqual(seqs, list(range(int(seq) + 1, int(seq) + 1 + len(rest))))
+        self.assertIn('"done": true', rest[-1])
+        self.assertTrue(all(f.startswith(f"id: {stream_id}:") for f in rest))
+
+        expired = await self._frames(await self.async_client.post(url, {}, headers={"Last-Event-ID": "nope:1"}))
+        self.assertIn('"resumable": false', expired[0])
+
+
+class _FakeSSEHandler(BaseHTTPRequestHandler):
+    """업스트림 SSE: interval초마다 content 프레임, 쓰기 실패(연결 끊김)는 disconnected로 알림"""
+    frames = 3
+    interval = 0.0
+    conversation_id = None
+    finished = threading.Event()
+    disconnected = threading.Event()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        cls = type(self)
+        try:
+            for i in range(cls.frames):
+                self.wfile.write(f"data: {json.dumps({'content': f'토큰{i} '}, ensure_ascii=False)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(cls.interval)
+            # conversation_id 없으면 완료 후 DB 기록 없이 끝남
+            done = {"done": True, "conversation_id": cls.conversation_id} if cls.conversation_id else {"done": True}
+            self.wfile.write(f"data: {json.dumps(done)}\n\n".encode())
+            self.wfile.flush()
+        except OSError:
+            cls.disconnected.set()
+            return
+        cls.finished.set()
+
+    def log_message(self, *args):
+        pass
+
+
+# WSGI 경로의 스트림은 공용 이벤트 루프 스레드(별도 DB 연결)에서 멱등성 표식을 지움 → 실제 커밋이 일어나는 TransactionTestCase
+class ChatStreamRelayTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeSSEHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/chat"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("relay", password="pw")
+        _FakeSSEHandler.frames, _FakeSSEHandler.interval, _FakeSSEHandler.conversation_id = 3, 0.0, None
+        _FakeSSEHandler.finished = threading.Event()
+        _FakeSSEHandler.disconnected = threading.Event()
+        patcher = patch("scentpick.views.FASTAPI_CHAT_URL", self.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, content):
+        self.client.force_login(self.user)
+        return self.client.post(reverse("scentpick:chat_stream_api"), {"content": content})
+
+    def test_wsgi_relays_upstream_frames_in_order(self):
+        response = self._post("릴레이 순서")
+        self.assertFalse(response.is_async)  # 동기 iterator → WSGI가 프레임마다 전송
+        frames = [chunk.decode() for chunk in response.streaming_content]
+        response.close()
+        data = [json.loads(f[6:]) for f in frames]
+        self.assertEqual([d.get("content") for d in data[:3]], ["토큰0 ", "토큰1 ", "토큰2 "])
+        self.assertTrue(data[-1]["done"])
+
+    def test_wsgi_stream_recycles_db_connection_of_loop_thread(self):
+        # 루프 스레드의 ORM 호출은 request_started/finished 밖 → 스트림 전후로 같은 스레드에서 연결 정리
+        _FakeSSEHandler.conversation_id = 7
+        close_threads, mark_threads = [], []
+
+        def record_close():
+            close_threads.append(threading.get_ident())
+
+        def record_mark(*args, **kwargs):
+            mark_threads.append(threading.get_ident())
+
+        with patch("scentpick.utils.chat_stream.close_old_connections", record_close), \
+                patch("scentpick.utils.idempotency.mark_request_message", record_mark):
+            response = self._post("연결 정리")
+            b"".join(response.streaming_content)
+            response.close()
+        self.assertEqual(len(close_threads), 2)
+        self.assertEqual(len(mark_threads), 1)
+        self.assertEqual(set(close_threads), set(mark_threads))
+        self.assertNotEqual(mark_threads[0], threading.get_ident())
+
+    def test_wsgi_sends_first_frame_before_upstream_ends_and_cancels_on_close(self):
+        _FakeSSEHandler.frames, _FakeSSEHandler.interval = 100, 0.05
+        response = self._post("끊기 테스트")
+        first = next(iter(response.streaming_content)).decode()
+        self.assertIn("토큰0", first)
+        self.assertFalse(_FakeSSEHandler.finished.is_set())
+        response.close()  # 클라이언트 끊김 → WSGI 서버가 close() 호출
+        self.assertTrue(_FakeSSEHandler.disconnected.wait(5))
+        self.assertFalse(_FakeSSEHandler.finished.is_set())
+
+    @override_settings(CHAT_STREAM_ORPHAN_TIMEOUT=0.1)
+    async def test_asgi_cancels_upstream_after_orphan_timeout(self):
+        _FakeSSEHandler.frames, _FakeSSEHandler.interval = 100, 0.05
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse("scentpick:chat_stream_api"), {"content": "ASGI 끊기"})
+        frames = []
+
+        async def read():
+            async for chunk in response.streaming_content:
+                frames.append(chunk.decode())
+
+        reader = asyncio.ensure_future(read())
+        while not frames:
+            await asyncio.sleep(0.01)
+        self.assertIn("토큰0", frames[0])
+        reader.cancel()  # ASGIHandler는 클라이언트가 끊기면 응답 태스크를 취소
+        self.assertFalse(_FakeSSEHandler.disconnected.is_set())  # 바로 닫지 않음 (이어받기 대기)
+        for _ in range(50):
+            if _FakeSSEHandler.disconnected.is_set():
+                break
+            await asyncio.sleep(0.1)
+        self.assertTrue(_FakeSSEHandler.disconnected.is_set())
+        self.assertFalse(_FakeSSEHandler.finished.is_set())
+
+
+class ChatLoadTestHarnessTests(SimpleTestCase):
+    async def test_mock_backend_streams_tokens_and_injects_failures(self):
+        backend = mock_chat_backend.MockChatBackend(tokens=3, token_rate=0, latency=0, jitter=0)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=backend), base_url="http://mock") as client:
+            response = await client.post("/chat/stream", json={"user_id": 1, "query": "q"})
+            frames = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+            self.assertEqual(len(frames), 4)
+            self.assertTrue(frames[-1]["done"])
+            self.assertEqual(frames[-1]["conversation_id"], 1)
+
+            backend.error_rate = 1.0
+            self.assertEqual((await client.post("/chat/stream", json={})).status_code, 500)
+            self.assertEqual((await client.get("/stats")).json(), {
+                "started": 2, "finished": 1, "errors": 1, "dropped": 0, "cancelled": 0,
+            })
+
+    def test_summary_reports_percentiles_and_error_rate(self):
+        results = []
+        for i in range(10):
+            result = chat_loadtest.RequestResult(i, 0)
+            result.ttfb, result.duration, result.gaps, result.frames = (i + 1) / 10, 1.0, [0.05], 2
+            results.append(result)
+        results[-1].error = "incomplete"
+        report = chat_loadtest.summarize(results, elapsed=2.0)
+        self.assertEqual((report["ok"], report["error_rate"], report["errors"]), (9, 0.1, {"incomplete": 1}))
+        self.assertEqual(report["ttfb_ms"][50], 500.0)
+        self.assertEqual(report["ttfb_max_ms"], 900.0)
+        self.assertEqual(report["gap_ms"][99], 50.0)
+        self.assertEqual(report["throughput_rps"], 4.5)
+
+
+@override_settings(MESSAGE_STATE_KEYFRAME_INTERVAL=3)
+class MessageStateSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("state", password="pw")
+
+    def _state(self, turn):
+        history = [{"type": t, "content": f"{t} " + " ".join(str(i * 7919 + k * 104729) for k in range(30))} for i in range(turn + 1) for t in ("human", "ai")]
+        state = {"messages": history, "final_answer": f"답변 {turn}", "candidates": [{"id": turn, "score": 0.5}]}
+        if turn % 2:
+            state["error"] = None
+        return state
+
+    def _add_turns(self, conv, turns):
+        return [
+            Message.objects.create(conversation=conv, role="assistant", content=f"답변 {t}", state=self._state(t))
+            for t in turns
+        ]
+
+    def test_diff_patch_roundtrip(self):
+        prev = {"messages": [1, 2], "slots": {"season": "summer", "gender": "male"}, "next": "a"}
+        cur = {"messages": [1, 2, 3], "slots": {"season": "winter"}, "next": "a", "extra": [None]}
+        op = state_snapshots.diff(prev, cur)
+        self.assertEqual(op["k"]["messages"], {"+": [3]})
+        self.assertEqual(state_snapshots.patch(prev, op), cur)
+        self.assertIsNone(state_snapshots.diff(cur, cur))
+
+    def test_compaction_moves_states_and_restores_them(self):
+        conv = Conversation.objects.create(user=self.user)
+        messages = self._add_turns(conv, range(5))
+        self.assertEqual(state_snapshots.compact(conv.id), 5)
+        self.assertFalse(Message.objects.filter(conversation=conv, state__isnull=False).exists())
+        rows = list(MessageState.objects.filter(conversation=conv).order_by("seq").values_list("codec", "base_seq"))
+        self.assertEqual(rows, [("full", 0), ("delta", 0), ("delta", 0), ("full", 3), ("delta", 3)])
+        self.assertLess(sum(len(bytes(d)) for d in MessageState.objects.values_list("data", flat=True)),
+                        sum(MessageState.objects.values_list("raw_size", flat=True)) / 3)
+
+        # 이어서 들어온 스냅샷은 마지막 seq 다음으로
+        messages += self._add_turns(conv, [5])
+        self.assertEqual(state_snapshots.compact(conv.id), 1)
+        self.assertEqual(MessageState.objects.get(message=messages[-1]).seq, 5)
+
+        for turn, message in enumerate(messages):
+            with self.assertNumQueries(3):
+                self.assertEqual(state_snapshots.load_state(message.pk), self._state(turn))
+        self.assertEqual(Message.objects.defer("state").get(pk=messages[2].pk).get_state(), self._state(2))
+
+        self.assertEqual(state_snapshots.restore_all(Message, MessageState), 6)
+        self.assertFalse(MessageState.objects.exists())
+        self.assertEqual(Message.objects.get(pk=messages[4].pk).state, self._state(4))
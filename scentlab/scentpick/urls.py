@@ -8,6 +8,7 @@ urlpatterns = [
     path('chat/', views.chat, name='chat'),
     path('recommend/', views.recommend, name='recommend'),
     path('perfumes/', views.perfumes, name='perfumes'),
+    path('api/perfumes/suggest', views.perfume_suggest_api, name='perfume_suggest_api'),
     path('perfume/<int:perfume_id>/', views.product_detail, name='product_detail'),
     path('scentpick/api/toggle-favorite/', views.toggle_favorite, name='toggle_favorite'),
     path('scentpick/api/toggle-like-dislike/', views.toggle_like_dislike, name='toggle_like_dislike'),
@@ -17,6 +18,7 @@ urlpatterns = [
     path('mypage/password/', views.password_change_view, name='password_change'),
     path("api/chat", views.chat_submit_api, name="chat_submit_api"),
     path("api/chat/stream", views.chat_stream_api, name="chat_stream_api"),
+    path("api/chat/metrics", views.chat_metrics_api, name="chat_metrics_api"),
     # Chat sidebar + history APIs
     path("api/conversations", views.conversations_api, name="conversations_api"),
     path("api/conversations/<int:conv_id>/messages", views.conversation_messages_api, name="conversation_messages_api"),
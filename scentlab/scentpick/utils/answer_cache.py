@@ -0,0 +1,294 @@
+# scentpick/utils/answer_cache.py
+"""
+FastAPI 챗봇 앞단 답변 캐시 (옵트인: CHAT_ANSWER_CACHE_ENABLED)
+
+- 대상: 새 대화의 첫 질문 + 이미지 없음 + 개인화/부정 표현 없음 (이어지는 대화는 앞선 맥락에 따라 답이 달라짐)
+- 키: 정규화한 질문 + 규칙으로 뽑은 슬롯(계절/성별/시간대/어코드/브랜드/숫자) + 카탈로그 세대
+  → 정확히 같으면 바로 적중
+- 근접 적중: 슬롯이 완전히 같은 항목들 중 질문 임베딩 코사인 유사도 ≥ CHAT_ANSWER_CACHE_THRESHOLD
+  (기본 임베딩은 글자 2~3-gram 해시 벡터, CHAT_ANSWER_CACHE_EMBEDDER로 교체 가능: 텍스트 → 1차원 벡터)
+- 적중 시 대화/메시지/추천 기록(RecRun, RecCandidate)을 직접 저장 → 대화 기록·사이드바는 평소와 같음
+- 적중으로 만든 대화에는 FastAPI(LangGraph) 스레드가 없음 → 이어지는 질문은 conversation_id 없이 새 대화로 보내고
+  앞선 턴을 질문 앞에 붙임(follow_up_query), 답을 받으면 캐시 대화를 FastAPI 대화로 합침(adopt)
+- 항목 수명 CHAT_ANSWER_CACHE_TTL, 카탈로그 세대가 바뀌면 전부 무효
+- 계측(프로세스 단위): 적중률(정확/근접), 저장 수, 절약한 응답 시간 → answer_cache_stats()
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .brand_aliases import BRAND_ALIASES, normalize_name
+from .catalog_cache import catalog_cache, get_catalog_generation
+
+ENTRY_KEY = "scentpick:answer:{generation}:{digest}"
+BUCKET_KEY = "scentpick:answer:nn:{generation}:{slots}"
+EMBEDDING_DIM = 512
+CACHE_AGENT = "answer_cache"
+FOLLOW_UP_ROLES = {"user": "사용자", "assistant": "챗봇"}
+
+SEASON_WORDS = {"봄": "spring", "여름": "summer", "가을": "fall", "겨울": "winter"}
+GENDER_WORDS = {
+    "남자": "male", "남성": "male", "남친": "male", "남편": "male",
+    "여자": "female", "여성": "female", "여친": "female", "아내": "female",
+    "중성": "unisex", "유니섹스": "unisex",
+}
+TIME_WORDS = {"낮": "day", "아침": "day", "출근": "day", "밤": "night", "저녁": "night", "데이트": "night"}
+# 사용자 기록/취향을 가리키는 표현 → 캐시하지 않음
+PERSONAL_WORDS = ("내가", "내 ", "나한테", "나에게", "나랑", "제가", "저한테", "저에게", "제 ",
+                  "지난번", "아까", "방금", "이전에", "찜", "즐겨찾기", "좋아요")
+NEGATION_WORDS = ("말고", "빼고", "제외", "싫", "않은", "안 ")
+FILLER_WORDS = {"좀", "혹시", "please", "pls"}
+# 요청 어미 ("추천해줘" / "추천해 주세요" → "추천")
+REQUEST_ENDINGS = ("해 주세요", "해주세요", "해 줘", "해줘", "해줄래", "해 주실래요", "해주실래요",
+                   "부탁드려요", "부탁해요", "부탁해", "알려 주세요", "알려주세요", "알려줘")
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+class AnswerCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.lookups = 0
+            self.exact_hits = 0
+            self.semantic_hits = 0
+            self.stores = 0
+            self.saved_seconds = 0.0
+
+    def record_lookup(self, kind=None, saved=0.0):
+        with self._lock:
+            self.lookups += 1
+            if kind == "exact":
+                self.exact_hits += 1
+            elif kind == "semantic":
+                self.semantic_hits += 1
+            self.saved_seconds += max(saved, 0.0)
+
+    def record_store(self):
+        with self._lock:
+            self.stores += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            return {
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "hit_rate": round(hits / self.lookups, 3) if self.lookups else 0.0,
+                "stores": self.stores,
+                "latency_saved_s": round(self.saved_seconds, 2),
+                "latency_saved_avg_ms": round(self.saved_seconds / hits * 1000, 1) if hits else 0.0,
+            }
+
+
+stats = AnswerCacheStats()
+
+
+def answer_cache_stats():
+    return stats.snapshot()
+
+
+def is_enabled():
+    return getattr(settings, "CHAT_ANSWER_CACHE_ENABLED", False)
+
+
+def normalize_query(text):
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    words = _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text)).split()
+    query = " ".join(w for w in words if w not in FILLER_WORDS)
+    for ending in REQUEST_ENDINGS:
+        if query.endswith(ending):
+            return query[:-len(ending)].strip()
+    return query
+
+
+def _accord_options():
+    from .facets import get_facet_index
+
+    return get_facet_index().options("accord")
+
+
+def query_slots(text):
+    """질문에서 규칙으로 뽑은 슬롯 (캐시 키 / 근접 후보 범위). 같은 슬롯끼리만 같은 답을 공유"""
+    query = normalize_query(text)
+    compact = query.replace(" ", "")
+    brand_key = normalize_name(query)
+    slots = {
+        "season": sorted({v for k, v in SEASON_WORDS.items() if k in compact}),
+        "gender": sorted({v for k, v in GENDER_WORDS.items() if k in compact}),
+        "time": sorted({v for k, v in TIME_WORDS.items() if k in compact}),
+        "accord": sorted({a for a in _accord_options() if len(a) > 1 and normalize_name(a) in compact}),
+        "brand": sorted({
+            brand for brand, aliases in BRAND_ALIASES.items()
+            if any(len(normalize_name(a)) > 1 and normalize_name(a) in brand_key for a in aliases)
+        }),
+        "number": _NUMBER_RE.findall(query),
+    }
+    return {k: v for k, v in slots.items() if v}
+
+
+def eligible(content, conversation_id=None, has_image=False):
+    if not is_enabled() or conversation_id or has_image:
+        return False
+    text = f" {normalize_query(content)} "
+    return not any(word in text for word in PERSONAL_WORDS + NEGATION_WORDS)
+
+
+def hashed_ngram_embedding(text):
+    """글자 2~3-gram 특징 해싱 벡터 (L2 정규화, 프로세스 간 동일)"""
+    compact = text.replace(" ", "")
+    vec = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for n in (2, 3):
+        for i in range(len(compact) - n + 1):
+            vec[zlib.crc32(compact[i:i + n].encode("utf-8")) % EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+@lru_cache(maxsize=4096)
+def _embed(text):
+    path = getattr(settings, "CHAT_ANSWER_CACHE_EMBEDDER", "")
+    embed = import_string(path) if path else hashed_ngram_embedding
+    vec = np.asarray(embed(text), dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _slot_signature(slots):
+    return hashlib.sha256(repr(sorted(slots.items())).encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_key(generation, query, slots):
+    digest = hashlib.sha256(f"{query}|{_slot_signature(slots)}".encode("utf-8")).hexdigest()[:32]
+    return ENTRY_KEY.format(generation=generation, digest=digest)
+
+
+def lookup(content):
+    """→ (캐시 항목 dict, "exact" | "semantic") 또는 (None, None)"""
+    cache = catalog_cache()
+    generation = get_catalog_generation()
+    query, slots = normalize_query(content), query_slots(content)
+    entry = cache.get(_entry_key(generation, query, slots))
+    kind = "exact" if entry else None
+    if entry is None:
+        bucket = cache.get(BUCKET_KEY.format(generation=generation, slots=_slot_signature(slots))) or []
+        if bucket:
+            target = _embed(query)
+            scores = [float(_embed(q) @ target) for q, _ in bucket]
+            best = int(np.argmax(scores))
+            if scores[best] >= getattr(settings, "CHAT_ANSWER_CACHE_THRESHOLD", 0.9):
+                entry = cache.get(bucket[best][1])
+                kind = "semantic" if entry else None
+    stats.record_lookup(kind, entry.get("latency", 0.0) if entry else 0.0)
+    return entry, kind
+
+
+def store(content, final_answer, perfume_list, latency):
+    """FastAPI 답변 저장 (정확 키 + 슬롯별 근접 후보 목록)"""
+    if not final_answer:
+        return
+    cache = catalog_cache()
+    generation = get_catalog_generation()
+    query, slots = normalize_query(content), query_slots(content)
+    ttl = getattr(settings, "CHAT_ANSWER_CACHE_TTL", 6 * 60 * 60)
+    key = _entry_key(generation, query, slots)
+    cache.set(key, {
+        "query": query,
+        "slots": slots,
+        "final_answer": final_answer,
+        "perfume_list": perfume_list or [],
+        "latency": latency,
+    }, timeout=ttl)
+    bucket_key = BUCKET_KEY.format(generation=generation, slots=_slot_signature(slots))
+    bucket = [item for item in cache.get(bucket_key) or [] if item[0] != query]
+    bucket.append((query, key))
+    cache.set(bucket_key, bucket[-getattr(settings, "CHAT_ANSWER_CACHE_BUCKET_SIZE", 200):], timeout=ttl)
+    stats.record_store()
+
+
+def materialize(user_id, content, entry, idempotency_key=None):
+    """적중한 답변을 새 대화로 저장 (FastAPI가 저장하는 것과 같은 형태) → conversation_id"""
+    from scentpick.models import Conversation, Message, Perfume, RecCandidate, RecRun
+
+    items = [p for p in entry["perfume_list"] if isinstance(p, dict) and isinstance(p.get("id"), int)]
+    known = set(Perfume.objects.filter(id__in=[p["id"] for p in items]).values_list("id", flat=True)) if items else set()
+
+    with transaction.atomic():
+        conv = Conversation.objects.create(user_id=user_id)
+        request_msg = Message.objects.create(
+            conversation=conv, role="user", content=content, idempotency_key=idempotency_key,
+        )
+        Message.objects.create(conversation=conv, role="assistant", content=entry["final_answer"], model=CACHE_AGENT)
+        candidates = [p for p in items if p["id"] in known]
+        if candidates:
+            run = RecRun.objects.create(
+                user_id=user_id, conversation=conv, request_msg=request_msg,
+                query_text=content, parsed_slots=entry["slots"], agent=CACHE_AGENT,
+            )
+            RecCandidate.objects.bulk_create([
+                RecCandidate(run_rec=run, perfume_id=p["id"], rank=p.get("rank") or i, score=p.get("score") or 0.0)
+                for i, p in enumerate(candidates, start=1)
+            ], ignore_conflicts=True)
+    return conv.id
+
+
+def cached_turns(user_id, conversation_id):
+    """답변 캐시로만 채운 대화(FastAPI 스레드 없음)면 [(role, content), ...], 아니면 None"""
+    from scentpick.models import Message
+
+    try:
+        conversation_id = int(conversation_id)
+    except (TypeError, ValueError):
+        return None
+    rows = list(
+        Message.objects.filter(
+            conversation_id=conversation_id, conversation__user_id=user_id,
+            conversation__external_thread_id__isnull=True, role__in=FOLLOW_UP_ROLES,
+        ).order_by("created_at", "id").values_list("role", "model", "content")
+    )
+    answers = [model for role, model, _ in rows if role == "assistant"]
+    if not answers or any(model != CACHE_AGENT for model in answers):
+        return None
+    return [(role, content) for role, _, content in rows]
+
+
+def follow_up_query(turns, content):
+    """캐시 대화의 앞선 턴 + 이번 질문 → FastAPI 새 대화의 첫 질문"""
+    history = "\n".join(f"{FOLLOW_UP_ROLES[role]}: {text}" for role, text in turns)
+    return f"[이전 대화]\n{history}\n\n[이번 질문]\n{content}"
+
+
+def adopt(user_id, cached_conversation_id, conversation_id):
+    """캐시 대화의 메시지/추천 기록을 FastAPI가 만든 대화로 옮기고 캐시 대화 삭제 (제목은 캐시 대화 것 유지)"""
+    from django.db.models import F
+
+    from scentpick.models import Conversation, Message, RecRun
+
+    cached_conversation_id, conversation_id = int(cached_conversation_id), int(conversation_id)
+    if cached_conversation_id == conversation_id:
+        return 0
+    with transaction.atomic():
+        cached = Conversation.objects.filter(pk=cached_conversation_id, user_id=user_id).first()
+        if cached is None or not Conversation.objects.filter(pk=conversation_id, user_id=user_id).exists():
+            return 0
+        moved = Message.objects.filter(conversation_id=cached.id).update(conversation_id=conversation_id)
+        RecRun.objects.filter(conversation_id=cached.id).update(conversation_id=conversation_id)
+        Conversation.objects.filter(pk=conversation_id).update(
+            title=cached.title, message_count=F("message_count") + moved,
+        )
+        cached.delete()
+    return moved
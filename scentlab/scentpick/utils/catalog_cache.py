@@ -0,0 +1,117 @@
+# scentpick/utils/catalog_cache.py
+"""
+카탈로그(향수 목록) 캐시 유틸
+
+- 카탈로그 세대(generation) 카운터: Perfume 변경 시 +1 → 이전 세대 캐시 키는 전부 자연 만료 (O(1) 무효화)
+- ajax 그리드(perfumes_grid.html) 렌더링 결과를 정규화된 쿼리스트링 + 세대 키로 캐시
+- note_images 버전 카운터: NoteImage 변경 시 +1 → 프로세스별 노트 이미지 리졸버 재적재
+- 사용자 상태 버전: 찜/피드백/프로필 변경 시각(ms) → 사용자별 화면(상세/목록)의 ETag·Last-Modified
+- 백엔드는 settings.CATALOG_CACHE_ALIAS 가 가리키는 Django 캐시 (locmem / file / redis 등)
+  locmem은 프로세스마다 따로라 무효화/카운터가 다른 워커에 전달되지 않음 → catalog_cache_is_shared()로 구분
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .pagination import filter_signature
+
+GENERATION_KEY = "scentpick:catalog:generation"
+NOTE_IMAGES_VERSION_KEY = "scentpick:note_images:version"
+USER_VERSION_KEY = "scentpick:user:{}:version"
+USER_VERSION_TIMEOUT = 60 * 60 * 24 * 30
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def catalog_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+def catalog_cache_is_shared():
+    """카탈로그 캐시를 다른 프로세스(워커, 관리 명령)와 공유하는지 — locmem/dummy는 프로세스 메모리"""
+    alias = getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
+
+
+def _get_counter(key):
+    """세대 카운터 조회 (키가 없으면 현재 시각(ms)으로 시작 → 키 유실 후에도 이전 값과 겹치지 않음)"""
+    cache = catalog_cache()
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def _bump_counter(key):
+    cache = catalog_cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        value = int(time.time() * 1000)
+        cache.set(key, value, timeout=None)
+        return value
+
+
+def get_catalog_generation():
+    """현재 카탈로그 세대"""
+    return _get_counter(GENERATION_KEY)
+
+
+def bump_catalog_generation():
+    """Perfume 저장/삭제 또는 데이터 재적재 후 호출"""
+    return _bump_counter(GENERATION_KEY)
+
+
+def get_note_images_version():
+    """note_images 테이블 버전 (노트 이미지 리졸버 재적재 기준)"""
+    return _get_counter(NOTE_IMAGES_VERSION_KEY)
+
+
+def bump_note_images_version():
+    """NoteImage 저장/삭제 또는 sql/note_images.sql 재적재 후 호출"""
+    return _bump_counter(NOTE_IMAGES_VERSION_KEY)
+
+
+def get_user_version(user_id):
+    """사용자 상태 버전 = 마지막 변경 시각(ms). 키가 없으면 현재 시각으로 시작 (유실 시 캐시 미스로만 동작)"""
+    cache = catalog_cache()
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=USER_VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """찜/피드백/프로필 변경 후 호출"""
+    cache = catalog_cache()
+    key = USER_VERSION_KEY.format(user_id)
+    version = max(int(time.time() * 1000), (cache.get(key) or 0) + 1)
+    cache.set(key, version, timeout=USER_VERSION_TIMEOUT)
+    return version
+
+
+def grid_cache_key(params, generation):
+    """필터 시그니처 + page/cursor → 그리드 조각 캐시 키"""
+    signature = filter_signature(params)
+    if "cursor" in params:
+        signature += f"#cursor={params.get('cursor')}"
+    else:
+        signature += f"#page={params.get('page') or 1}"
+    digest = hashlib.sha1(signature.encode("utf-8")).hexdigest()
+    return f"scentpick:perfumes:grid:{generation}:{digest}"
+
+
+def get_cached_grid(key):
+    return catalog_cache().get(key)
+
+
+def set_cached_grid(key, html):
+    timeout = getattr(settings, "CATALOG_FRAGMENT_TIMEOUT", 60 * 60)
+    catalog_cache().set(key, html, timeout)
@@ -0,0 +1,261 @@
+# scentpick/utils/catalog_snapshot.py
+"""
+Perfume 테이블 → 컬럼형 NumPy 스냅샷 (프로세스 간 공유용, 읽기 전용 mmap)
+
+    python manage.py export_catalog_snapshot      # CATALOG_SNAPSHOT_DIR/<버전>/ 생성 후 CURRENT 교체
+
+디렉터리 구조 (배열은 모두 .npy, 행 순서 = id 오름차순)
+- meta.json           : 버전, 행 수, 사전(브랜드/성별/농도/어코드/노트/노트 점수 키), 점수 컬럼 이름
+- ids.npy             : int64 [n]
+- brand.npy           : int16 [n]  (meta.brands 인덱스)
+- gender.npy / concentration.npy : int16 [n]
+- name_offsets.npy    : int64 [n+1], name_bytes.npy : uint8 — UTF-8 문자열 컬럼
+- accords.npy         : uint8 [n, 어코드 수]  multi-hot
+- notes.npy           : uint8 [n, 노트 수]    레이어 비트 (1=top, 2=middle, 4=base)
+- note_scores.npy     : float32 [n, 노트 점수 키 수]  (notes_score JSON)
+- scores.npy          : float32 [n, 6]  (SCORE_FIELDS 순서: day, night, spring, summer, fall, winter)
+
+np.load(mmap_mode="r") 로 열기 때문에 여러 프로세스가 열어도 같은 페이지 캐시를 공유.
+리더(CatalogSnapshot)는 numpy만 필요 (Django 없이 사용 가능).
+현재 읽는 곳은 build_similar_perfumes --snapshot (오프라인)뿐 — 웹 요청 경로는 스냅샷을 읽지 않음
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from .scores import SCORE_FIELDS, score_columns
+
+FORMAT_VERSION = 1
+CURRENT_FILE = "CURRENT"
+NOTE_LAYER_BITS = {"top_notes": 1, "middle_notes": 2, "base_notes": 4}
+
+SOURCE_FIELDS = (
+    "id", "brand", "name", "gender", "concentration", "main_accords",
+    "top_notes", "middle_notes", "base_notes", "notes_score", "season_score", "day_night_score",
+)
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except Exception as e:
+        raise RuntimeError("numpy 패키지 필요: pip install numpy") from e
+    return np
+
+
+def _vocab(values):
+    vocab = sorted({v for v in values if v})
+    return vocab, {v: i for i, v in enumerate(vocab)}
+
+
+def _note_scores(raw):
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return {}
+    if not isinstance(raw, dict):
+        return {}
+    out = {}
+    for key, value in raw.items():
+        try:
+            out[str(key).strip().lower()] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def build_snapshot_arrays(rows):
+    """Perfume values() dict 이터러블 → (arrays dict, meta dict)"""
+    from .facets import parse_accords
+
+    np = _numpy()
+    rows = sorted(rows, key=lambda r: r["id"])
+    n = len(rows)
+
+    accords = [parse_accords(r.get("main_accords")) for r in rows]
+    notes = [
+        {layer: parse_accords(r.get(layer)) for layer in NOTE_LAYER_BITS}
+        for r in rows
+    ]
+    note_scores = [_note_scores(r.get("notes_score")) for r in rows]
+
+    brands, brand_ix = _vocab(r.get("brand") for r in rows)
+    genders, gender_ix = _vocab(r.get("gender") for r in rows)
+    concentrations, conc_ix = _vocab(r.get("concentration") for r in rows)
+    accord_vocab, accord_ix = _vocab(a for toks in accords for a in toks)
+    note_vocab, note_ix = _vocab(t for layers in notes for toks in layers.values() for t in toks)
+    score_keys, score_ix = _vocab(k for d in note_scores for k in d)
+
+    names = [(r.get("name") or "").encode("utf-8") for r in rows]
+    name_offsets = np.zeros(n + 1, dtype=np.int64)
+    name_offsets[1:] = np.cumsum([len(b) for b in names])
+
+    arrays = {
+        "ids": np.fromiter((r["id"] for r in rows), dtype=np.int64, count=n),
+        "brand": np.array([brand_ix.get(r.get("brand"), -1) for r in rows], dtype=np.int16),
+        "gender": np.array([gender_ix.get(r.get("gender"), -1) for r in rows], dtype=np.int16),
+        "concentration": np.array([conc_ix.get(r.get("concentration"), -1) for r in rows], dtype=np.int16),
+        "name_offsets": name_offsets,
+        "name_bytes": np.frombuffer(b"".join(names), dtype=np.uint8).copy(),
+        "accords": np.zeros((n, len(accord_vocab)), dtype=np.uint8),
+        "notes": np.zeros((n, len(note_vocab)), dtype=np.uint8),
+        "note_scores": np.zeros((n, len(score_keys)), dtype=np.float32),
+        "scores": np.zeros((n, len(SCORE_FIELDS)), dtype=np.float32),
+    }
+    for i, r in enumerate(rows):
+        for a in accords[i]:
+            arrays["accords"][i, accord_ix[a]] = 1
+        for layer, bit in NOTE_LAYER_BITS.items():
+            for t in notes[i][layer]:
+                arrays["notes"][i, note_ix[t]] |= bit
+        for key, value in note_scores[i].items():
+            arrays["note_scores"][i, score_ix[key]] = value
+        columns = score_columns(r.get("season_score"), r.get("day_night_score"))
+        arrays["scores"][i] = [columns[f] for f in SCORE_FIELDS]
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "rows": n,
+        "brands": brands,
+        "genders": genders,
+        "concentrations": concentrations,
+        "accords": accord_vocab,
+        "notes": note_vocab,
+        "note_score_keys": score_keys,
+        "score_fields": list(SCORE_FIELDS),
+        "note_layer_bits": NOTE_LAYER_BITS,
+    }
+    return arrays, meta
+
+
+def write_snapshot(rows, base_dir, generation=None, keep=2):
+    """
+    새 버전 디렉터리에 스냅샷을 쓰고 CURRENT를 원자적으로 교체. 반환: 버전 디렉터리 Path
+    이전 버전은 keep개만 남김 (이미 mmap 중인 프로세스는 삭제된 파일도 계속 읽을 수 있음)
+    """
+    np = _numpy()
+    base_dir = Path(base_dir)
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays, meta = build_snapshot_arrays(rows)
+    now_ns = time.time_ns()
+    # 정렬 가능한 버전명 (초 단위 시각 + 나노초 + pid)
+    version = time.strftime("%Y%m%d%H%M%S", time.localtime(now_ns // 10**9)) + f".{now_ns % 10**9:09d}-{os.getpid()}"
+    tmp_dir = base_dir / f".{version}.tmp"
+    tmp_dir.mkdir()
+    for name, array in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", array, allow_pickle=False)
+    meta.update({"version": version, "generation": generation, "created_at": time.time()})
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    final_dir = base_dir / version
+    os.replace(tmp_dir, final_dir)
+    current_tmp = base_dir / f".{CURRENT_FILE}.tmp"
+    current_tmp.write_text(version, encoding="utf-8")
+    os.replace(current_tmp, base_dir / CURRENT_FILE)
+
+    versions = sorted(p for p in base_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-keep] if keep else []:
+        if old != final_dir:
+            shutil.rmtree(old, ignore_errors=True)
+    return final_dir
+
+
+class CatalogSnapshot:
+    """스냅샷 디렉터리 1개를 읽기 전용 mmap으로 연 객체"""
+
+    ARRAYS = (
+        "ids", "brand", "gender", "concentration", "name_offsets", "name_bytes",
+        "accords", "notes", "note_scores", "scores",
+    )
+
+    def __init__(self, path):
+        np = _numpy()
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식: {self.meta.get('format')}")
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r", allow_pickle=False))
+        self.version = self.meta.get("version")
+        self.score_fields = self.meta["score_fields"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index_of(self, perfume_id):
+        """perfume id → 행 번호 (없으면 None)"""
+        np = _numpy()
+        i = int(np.searchsorted(self.ids, perfume_id))
+        if i < len(self.ids) and self.ids[i] == perfume_id:
+            return i
+        return None
+
+    def name(self, i):
+        start, end = self.name_offsets[i], self.name_offsets[i + 1]
+        return bytes(self.name_bytes[start:end]).decode("utf-8")
+
+    def brand_name(self, i):
+        code = int(self.brand[i])
+        return self.meta["brands"][code] if code >= 0 else ""
+
+    def note_matrix(self, layers=("top_notes", "middle_notes", "base_notes")):
+        """선택 레이어 중 하나라도 포함된 노트 multi-hot (bool [n, 노트 수])"""
+        mask = 0
+        for layer in layers:
+            mask |= NOTE_LAYER_BITS[layer]
+        return (self.notes & mask) > 0
+
+    def score(self, field):
+        """점수 컬럼 1개 ("fall" 또는 "fall_score")"""
+        if not field.endswith("_score"):
+            field = f"{field}_score"
+        return self.scores[:, self.score_fields.index(field)]
+
+    def row(self, i):
+        """행 번호 → dict (디버깅/에이전트 응답용)"""
+        meta = self.meta
+        return {
+            "id": int(self.ids[i]),
+            "brand": self.brand_name(i),
+            "name": self.name(i),
+            "gender": meta["genders"][self.gender[i]] if self.gender[i] >= 0 else "",
+            "concentration": meta["concentrations"][self.concentration[i]] if self.concentration[i] >= 0 else "",
+            "main_accords": [meta["accords"][j] for j in self.accords[i].nonzero()[0]],
+            "scores": dict(zip(self.score_fields, map(float, self.scores[i]))),
+        }
+
+
+def open_current_snapshot(base_dir):
+    """CURRENT가 가리키는 스냅샷 열기"""
+    base_dir = Path(base_dir)
+    version = (base_dir / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    return CatalogSnapshot(base_dir / version)
+
+
+_snapshot = None
+_current_mtime = None
+
+
+def get_catalog_snapshot(base_dir=None):
+    """
+    프로세스 단위 스냅샷 (CURRENT가 바뀌면 새 버전으로 다시 mmap)
+    스냅샷이 없으면 None
+    """
+    global _snapshot, _current_mtime
+    if base_dir is None:
+        from django.conf import settings
+
+        base_dir = settings.CATALOG_SNAPSHOT_DIR
+    current = Path(base_dir) / CURRENT_FILE
+    try:
+        mtime = current.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _snapshot is None or mtime != _current_mtime:
+        _snapshot = open_current_snapshot(base_dir)
+        _current_mtime = mtime
+    return _snapshot
@@ -0,0 +1,181 @@
+# scentpick/utils/chat_backend.py
+"""
+FastAPI 챗봇 백엔드(FASTAPI_CHAT_URL) HTTP 클라이언트 — 프로세스 공용 keep-alive 커넥션 풀
+
+- 동기 뷰(chat_submit_api): 프로세스당 httpx.Client 1개 (스레드 간 공유)
+- 비동기 뷰(chat_stream_api): 이벤트 루프당 httpx.AsyncClient 1개
+- 풀 크기 상한 CHAT_BACKEND_MAX_CONNECTIONS (초과 요청은 CHAT_BACKEND_POOL_TIMEOUT까지 대기)
+- 호출별 연결/읽기 타임아웃 (일반 응답 CHAT_BACKEND_READ_TIMEOUT, 스트림 CHAT_STREAM_READ_TIMEOUT)
+- 계측: httpcore trace 확장으로 요청마다 풀 대기 시간과 커넥션 재사용 여부 기록 → backend_stats()
+  요청 시작 ~ 첫 연결/전송 이벤트 = 풀 슬롯 대기, connect_tcp 이벤트가 있으면 새 커넥션
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+class BackendStats:
+    """요청 수 / 새 커넥션 수 / 풀 대기 시간 누적 (프로세스 단위)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.errors = 0
+            self.pool_wait_total = 0.0
+            self.pool_wait_max = 0.0
+
+    def record(self, trace):
+        wait = trace.pool_wait or 0.0
+        with self._lock:
+            self.requests += 1
+            self.new_connections += trace.new_connection
+            self.pool_wait_total += wait
+            self.pool_wait_max = max(self.pool_wait_max, wait)
+            count = self.requests
+        every = getattr(settings, "CHAT_BACKEND_STATS_LOG_EVERY", 500)
+        if every and count % every == 0:
+            logger.info("chat backend pool: %s", self.snapshot())
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            requests = self.requests
+            return {
+                "requests": requests,
+                "new_connections": self.new_connections,
+                "reused_connections": requests - self.new_connections,
+                "reuse_ratio": round((requests - self.new_connections) / requests, 3) if requests else 0.0,
+                "pool_wait_avg_ms": round(self.pool_wait_total / requests * 1000, 2) if requests else 0.0,
+                "pool_wait_max_ms": round(self.pool_wait_max * 1000, 2),
+                "errors": self.errors,
+            }
+
+
+stats = BackendStats()
+
+
+def backend_stats():
+    return stats.snapshot()
+
+
+class _RequestTrace:
+    """요청 1건의 httpcore trace 콜백 (동기: 인스턴스 자체, 비동기: atrace)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pool_wait = None
+        self.new_connection = False
+
+    def __call__(self, name, info):
+        if self.pool_wait is None:
+            self.pool_wait = time.perf_counter() - self.started
+        if name.startswith("connection.connect_"):
+            self.new_connection = True
+
+    async def atrace(self, name, info):
+        self(name, info)
+
+
+def backend_timeout(read=None):
+    return httpx.Timeout(
+        connect=getattr(settings, "CHAT_BACKEND_CONNECT_TIMEOUT", 5.0),
+        read=read or getattr(settings, "CHAT_BACKEND_READ_TIMEOUT", 60.0),
+        write=10.0,
+        pool=getattr(settings, "CHAT_BACKEND_POOL_TIMEOUT", 10.0),
+    )
+
+
+def backend_limits():
+    max_connections = getattr(settings, "CHAT_BACKEND_MAX_CONNECTIONS", 200)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_connections, getattr(settings, "CHAT_BACKEND_MAX_KEEPALIVE", 50)),
+        keepalive_expiry=getattr(settings, "CHAT_BACKEND_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def backend_headers(stream=False):
+    headers = {"Content-Type": "application/json"}
+    token = getattr(settings, "SERVICE_TOKEN", None)
+    if token:  # 미설정이면 헤더 생략
+        headers["X-Service-Token"] = token
+    if stream:
+        headers["Accept"] = "text/event-stream"
+    return headers
+
+
+def get_client():
+    """프로세스 공용 동기 Client"""
+    global _client
+    if _client is None or _client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(timeout=backend_timeout(), limits=backend_limits())
+    return _client
+
+
+def get_async_client():
+    """현재 이벤트 루프의 공용 AsyncClient (루프가 사라지면 함께 정리)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=backend_timeout(), limits=backend_limits())
+        _async_clients[loop] = client
+    return client
+
+
+def post_json(url, payload, read_timeout=None):
+    """동기 POST → 응답 JSON (4xx/5xx는 httpx.HTTPStatusError, 연결 실패 등은 httpx.HTTPError)"""
+    trace = _RequestTrace()
+    try:
+        response = get_client().post(
+            url, json=payload, headers=backend_headers(),
+            timeout=backend_timeout(read_timeout), extensions={"trace": trace},
+        )
+    except httpx.HTTPError:
+        stats.record_error()
+        raise
+    stats.record(trace)
+    response.raise_for_status()
+    return response.json()
+
+
+@asynccontextmanager
+async def stream_post(url, payload, read_timeout=None):
+    """비동기 스트리밍 POST — 응답 헤더를 받은 httpx.Response를 넘기고, 블록을 벗어나면 커넥션을 풀로 반환"""
+    trace = _RequestTrace()
+    timeout = backend_timeout(read_timeout or getattr(settings, "CHAT_STREAM_READ_TIMEOUT", 120.0))
+    connected = False
+    try:
+        async with get_async_client().stream(
+            "POST", url, json=payload, headers=backend_headers(stream=True),
+            timeout=timeout, extensions={"trace": trace.atrace},
+        ) as response:
+            connected = True
+            stats.record(trace)
+            response.raise_for_status()
+            yield response
+    except httpx.HTTPError:
+        if not connected:
+            stats.record_error()
+        raise
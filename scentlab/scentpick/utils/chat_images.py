@@ -0,0 +1,94 @@
+# scentpick/utils/chat_images.py
+"""
+채팅 첨부 이미지 처리 — 요청 경로 밖(백그라운드 스레드 풀)에서 축소/재인코딩 후 업로드
+
+- 긴 변 CHAT_IMAGE_MAX_EDGE로 축소, EXIF 회전 반영, CHAT_IMAGE_FORMAT(JPEG/WEBP)으로 재인코딩
+- 키: chat_images/<user_id>/<결과 바이트 sha256>.<ext> → 같은 이미지를 다시 보내면 업로드 생략(중복 제거)
+- 저장소: CHAT_IMAGE_STORAGE "s3"(AWS_STORAGE_BUCKET_NAME) | "local" | 클래스 dotted path (utils/image_storage.py)
+- submit_chat_image()는 concurrent.futures.Future(URL)를 바로 반환 → 뷰는 SSE 응답을 먼저 시작하고 결과를 기다림
+"""
+import hashlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+
+from .image_storage import S3ImageStorage, get_image_storage
+
+FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "WEBP": ("webp", "image/webp"),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_chat_image_storage():
+    name = getattr(settings, "CHAT_IMAGE_STORAGE", "s3")
+    if name == "s3":
+        return S3ImageStorage(bucket=getattr(settings, "AWS_STORAGE_BUCKET_NAME", None))
+    return get_image_storage(name)
+
+
+def encode_chat_image(data):
+    """원본 바이트 → (재인코딩 바이트, 확장자, content_type). 이미지가 아니면 ValueError"""
+    try:
+        from PIL import Image, ImageOps
+    except Exception as e:
+        raise RuntimeError("Pillow 패키지 필요: pip install pillow") from e
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.seek(0)  # 애니메이션은 첫 프레임
+        img = ImageOps.exif_transpose(img)
+    except Exception as e:
+        raise ValueError("이미지 파일을 읽을 수 없습니다.") from e
+
+    max_edge = getattr(settings, "CHAT_IMAGE_MAX_EDGE", 1280)
+    img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    fmt = getattr(settings, "CHAT_IMAGE_FORMAT", "JPEG").upper()
+    ext, content_type = FORMATS.get(fmt, FORMATS["JPEG"])
+    buf = io.BytesIO()
+    img.save(buf, format=fmt if fmt in FORMATS else "JPEG",
+             quality=getattr(settings, "CHAT_IMAGE_QUALITY", 85), optimize=True)
+    return buf.getvalue(), ext, content_type
+
+
+def upload_chat_image(user_id, data):
+    """축소/재인코딩 후 저장 → 공개 URL (같은 내용이 이미 있으면 저장 생략)"""
+    encoded, ext, content_type = encode_chat_image(data)
+    key = f"chat_images/{user_id}/{hashlib.sha256(encoded).hexdigest()[:32]}.{ext}"
+    storage = get_chat_image_storage()
+    if storage.exists(key):
+        return storage.url(key)
+    return storage.save(key, encoded, content_type)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "CHAT_IMAGE_UPLOAD_WORKERS", 4),
+                    thread_name_prefix="chat-image",
+                )
+    return _executor
+
+
+def submit_chat_image(user_id, image_file):
+    """업로드 파일을 백그라운드 업로드에 넘김 → Future(URL). 파일 내용은 요청이 끝나기 전에 여기서 읽어 둠"""
+    image_file.seek(0)
+    return _get_executor().submit(upload_chat_image, user_id, image_file.read())
@@ -0,0 +1,194 @@
+# scentpick/utils/chat_loadtest.py
+"""
+채팅 엔드포인트 부하 측정 (loadtest_chat 명령) — 가상 사용자 N명이 동시에, 각자 순서대로 질문을 보내고 응답을 끝까지 읽음
+
+- 인증: loadtest_<i> 사용자에게 세션을 직접 발급해 쿠키로 사용 (로그인 폼 우회), CSRF는 쿠키 + X-CSRFToken 헤더
+- 질문마다 내용이 달라 멱등성 키(utils/idempotency.py)와 답변 캐시(utils/answer_cache.py)에 걸리지 않음
+- 요청별 기록: HTTP 상태, 첫 바이트 시간(TTFB), data 프레임 간 간격, 전체 시간, 오류 종류
+- 오류 판정: 연결 실패/타임아웃, 200이 아닌 상태, {"error"} 프레임, done 프레임 없이 종료
+"""
+import asyncio
+import json
+import secrets
+import time
+from importlib import import_module
+
+import httpx
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+
+CSRF_COOKIE = "csrftoken"
+
+
+def _session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def issue_sessions(count, prefix="loadtest"):
+    """가상 사용자 세션 발급 → 세션 키 목록 (사용자는 없으면 비밀번호 없이 생성, 다음 실행에서 재사용)"""
+    from django.contrib.auth.models import User
+
+    store_class = _session_store()
+    backend = settings.AUTHENTICATION_BACKENDS[0]
+    keys = []
+    for i in range(count):
+        user, created = User.objects.get_or_create(username=f"{prefix}_{i}")
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+        session = store_class()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = backend
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        keys.append(session.session_key)
+    return keys
+
+
+def revoke_sessions(keys):
+    store_class = _session_store()
+    for key in keys:
+        store_class(session_key=key).delete()
+
+
+class RequestResult:
+    def __init__(self, user, seq):
+        self.user = user
+        self.seq = seq
+        self.status = None
+        self.ttfb = None          # 요청 시작 ~ 응답 본문 첫 바이트
+        self.gaps = []            # data 프레임 사이 간격
+        self.frames = 0
+        self.duration = None
+        self.error = None         # None | "connect" | "timeout" | "http_<status>" | "error_frame" | "incomplete" | "transport"
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def _stream_once(client, url, headers, content, result):
+    started = time.perf_counter()
+    done = False
+    last_frame = None
+    async with client.stream("POST", url, json={"content": content}, headers=headers) as response:
+        result.status = response.status_code
+        if response.status_code != 200:
+            await response.aread()
+            result.ttfb = time.perf_counter() - started
+            result.error = f"http_{response.status_code}"
+            return
+        async for line in response.aiter_lines():
+            now = time.perf_counter()
+            if result.ttfb is None:
+                result.ttfb = now - started
+            if not line.startswith("data: "):
+                continue  # id: / 주석(": image-upload") 줄
+            if last_frame is not None:
+                result.gaps.append(now - last_frame)
+            last_frame = now
+            result.frames += 1
+            try:
+                data = json.loads(line[6:])
+            except ValueError:
+                continue
+            if isinstance(data, dict) and data.get("error"):
+                result.error = "error_frame"
+            if isinstance(data, dict) and data.get("done"):
+                done = True
+    if result.error is None and not done:
+        result.error = "incomplete"
+
+
+async def _submit_once(client, url, headers, content, result):
+    started = time.perf_counter()
+    response = await client.post(url, json={"content": content}, headers=headers)
+    result.ttfb = time.perf_counter() - started
+    result.status = response.status_code
+    result.frames = 1
+    if response.status_code != 200:
+        result.error = f"http_{response.status_code}"
+        return
+    try:
+        data = response.json()
+    except ValueError:
+        result.error = "incomplete"
+        return
+    if not isinstance(data, dict) or data.get("error"):
+        result.error = "error_frame"
+
+
+async def _virtual_user(url, endpoint, session_key, user, requests, think, timeout, results):
+    """브라우저 1개처럼 사용자마다 쿠키 저장소/커넥션을 따로 둠"""
+    csrf = secrets.token_hex(16)  # 32자 비밀값 그대로 (CsrfViewMiddleware가 마스킹 없는 값도 허용)
+    cookies = {settings.SESSION_COOKIE_NAME: session_key, CSRF_COOKIE: csrf}
+    send = _stream_once if endpoint == "stream" else _submit_once
+    async with httpx.AsyncClient(cookies=cookies, timeout=httpx.Timeout(timeout, connect=10.0)) as client:
+        for seq in range(requests):
+            result = RequestResult(user, seq)
+            content = f"[loadtest {user}-{seq}-{secrets.token_hex(3)}] 여름에 출근할 때 뿌릴 가벼운 향수 추천해 줘"
+            started = time.perf_counter()
+            try:
+                await send(client, url, {"X-CSRFToken": csrf}, content, result)
+            except httpx.ConnectError:
+                result.error = "connect"
+            except httpx.TimeoutException:
+                result.error = "timeout"
+            except httpx.HTTPError:
+                result.error = "transport"
+            result.duration = time.perf_counter() - started
+            results.append(result)
+            if think:
+                await asyncio.sleep(think)
+
+
+async def run_load(base_url, session_keys, endpoint="stream", requests=1, think=0.0, timeout=120.0):
+    """세션마다 가상 사용자 1명을 동시에 실행 → (RequestResult 목록, 경과 시간)"""
+    path = "/api/chat/stream" if endpoint == "stream" else "/api/chat"
+    url = base_url.rstrip("/") + path
+    results = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _virtual_user(url, endpoint, key, i, requests, think, timeout, results)
+        for i, key in enumerate(session_keys)
+    ))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    """요청 결과 → 지표 dict (시간 단위 ms)"""
+    ok = [r for r in results if r.ok]
+    errors = {}
+    for r in results:
+        if r.error:
+            errors[r.error] = errors.get(r.error, 0) + 1
+    ttfb = [r.ttfb for r in ok if r.ttfb is not None]
+    gaps = [g for r in ok for g in r.gaps]
+    durations = [r.duration for r in ok]
+
+    def ms(values, pct):
+        value = percentile(values, pct)
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "frames_per_s": round(sum(r.frames for r in ok) / elapsed, 1) if elapsed else 0.0,
+        "ttfb_ms": {p: ms(ttfb, p) for p in (50, 90, 99)},
+        "ttfb_max_ms": ms(ttfb, 100),
+        "gap_ms": {p: ms(gaps, p) for p in (50, 90, 99)},
+        "gap_max_ms": ms(gaps, 100),
+        "duration_ms": {p: ms(durations, p) for p in (50, 90, 99)},
+    }
@@ -0,0 +1,101 @@
+# scentpick/utils/chat_stream.py
+"""
+chat_stream_api SSE 릴레이 — ASGI(uvicorn)와 WSGI(gunicorn) 모두 프레임 단위로 전송
+
+- 업스트림(FastAPI) 호출은 chat_backend의 공용 AsyncClient 풀 사용 (keep-alive, 동시 스트림 상한, 계측)
+- relay_sse는 소비자가 다음 프레임을 요청할 때만 업스트림에서 다음 줄을 읽음 (자체 버퍼 없음). 소비자는 배포 방식별로 다름:
+  - ASGI: stream_resume의 producer 태스크가 클라이언트와 무관하게 끝까지 읽어 링 버퍼에 쌓음 (이어받기용)
+    → 클라이언트 속도의 역압은 업스트림까지 가지 않음. 클라이언트가 끊겨도 바로 닫지 않고
+      읽는 쪽이 없는 채로 CHAT_STREAM_ORPHAN_TIMEOUT초가 지나야 producer 취소 → 업스트림 요청 종료
+  - WSGI: iterate_in_background()가 프로세스 공용 이벤트 루프 스레드에서 생성기를 돌리고 한 프레임씩(큐 크기 1) 넘김
+    → 워커 스레드가 프레임을 보낸 뒤에야 다음 프레임을 읽음(역압), 응답 close()(클라이언트 끊김) 시 즉시 취소
+    → 스트림 동안 워커 스레드 1개를 점유 (이어받기 없음)
+    → 생성기 안의 ORM 호출(sync_to_async)은 루프 쪽 스레드의 DB 연결을 쓰는데 request_started/finished를 받지 못함
+      → _pump가 스트림 전후로 close_old_connections() (wait_timeout 지난 연결 재사용 방지)
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .chat_backend import stream_post
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def sse_frame(data):
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def relay_sse(url, payload):
+    """
+    업스트림 SSE를 줄 단위로 읽어 (data dict 또는 None, 클라이언트로 보낼 프레임) 생성
+    - "data: ..." 줄은 그대로 전달 (JSON이면 파싱 결과도 함께)
+    - 그 외 텍스트 줄은 {"content": 줄} 프레임으로 감쌈
+    """
+    async with stream_post(url, payload) as response:
+        try:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if line.startswith("data: "):
+                    try:
+                        data = json.loads(line[6:])
+                    except ValueError:
+                        data = None
+                    yield (data if isinstance(data, dict) else None), f"{line}\n\n"
+                else:
+                    yield None, sse_frame({"content": line})
+        except (asyncio.CancelledError, GeneratorExit):
+            logger.info("chat stream cancelled, closing upstream %s", url)
+            raise
+
+
+def get_background_loop():
+    """WSGI 워커 프로세스 공용 이벤트 루프 (데몬 스레드) — AsyncClient 풀도 이 루프 기준으로 재사용"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="chat-stream-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+async def _pump(frames, channel):
+    await sync_to_async(close_old_connections)()
+    try:
+        async for frame in frames:
+            await channel.put(frame)
+    except Exception as e:
+        await channel.put(e)
+        return
+    finally:
+        await frames.aclose()
+        await sync_to_async(close_old_connections)()
+    await channel.put(_END)
+
+
+def iterate_in_background(frames):
+    """async 프레임 생성기 → 동기 iterator (WSGI StreamingHttpResponse용). 닫히면 생성기 태스크 취소"""
+    loop = get_background_loop()
+    channel = asyncio.Queue(maxsize=1)
+    task = asyncio.run_coroutine_threadsafe(_pump(frames, channel), loop)
+    try:
+        while True:
+            item = asyncio.run_coroutine_threadsafe(channel.get(), loop).result()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        task.cancel()
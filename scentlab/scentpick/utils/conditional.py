@@ -0,0 +1,91 @@
+# scentpick/utils/conditional.py
+"""
+조건부 GET(ETag / Last-Modified)용 함수 — django.views.decorators.http.condition 에 연결
+
+- 목록(perfumes): 카탈로그 세대 + 정규화한 쿼리스트링 + 사용자 상태 버전 → DB 조회 없이 계산
+- 상세(product_detail): Perfume.updated_at(상세 로더 1회 조회, 뷰와 공유) + 카탈로그 세대(이전/다음 향수)
+  + note_images 버전(노트 이미지) + 사용자 상태 버전
+- 공통: CSRF 쿠키(페이지에 박힌 토큰), RESPONSE_ETAG_VERSION(배포 시 템플릿 변경 반영)
+- 세대/사용자 버전은 카탈로그 캐시에 있음 → 캐시가 프로세스별(locmem)이면 다른 워커의 찜/피드백/관리자 수정을
+  놓친 채 304를 줄 수 있으므로 shared_condition은 공용 캐시일 때만 조건부 처리
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.views.decorators.http import condition
+
+from .catalog_cache import (
+    catalog_cache_is_shared, get_catalog_generation, get_note_images_version, get_user_version,
+)
+from .perfume_detail import load_perfume_detail
+
+
+def _user_part(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return "anon"
+    return f"{user.pk}:{get_user_version(user.pk)}"
+
+
+def _etag(request, *parts):
+    raw = "|".join([
+        str(getattr(settings, "RESPONSE_ETAG_VERSION", "1")),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        *map(str, parts),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _user_modified(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return datetime.fromtimestamp(get_user_version(user.pk) / 1000, tz=timezone.utc)
+
+
+def _perfume_updated_at(request, perfume_id):
+    """product_detail 로더 결과(요청 단위 메모)를 재사용 → ETag 계산과 렌더링이 같은 쿼리 1회"""
+    perfume = load_perfume_detail(request, perfume_id)
+    return perfume.updated_at if perfume is not None else None
+
+
+def perfumes_etag(request):
+    query = urlencode(sorted((k, sorted(v)) for k, v in request.GET.lists()), doseq=True)
+    return _etag(request, "perfumes", get_catalog_generation(), _user_part(request), query)
+
+
+def product_detail_etag(request, perfume_id):
+    updated_at = _perfume_updated_at(request, perfume_id)
+    if updated_at is None:
+        return None  # 404는 조건부 처리 없이 그대로
+    return _etag(
+        request, "detail", perfume_id, updated_at.isoformat(),
+        get_catalog_generation(), get_note_images_version(), _user_part(request),
+    )
+
+
+def product_detail_last_modified(request, perfume_id):
+    updated_at = _perfume_updated_at(request, perfume_id)
+    if updated_at is None:
+        return None
+    user_modified = _user_modified(request)
+    if user_modified is not None and updated_at.tzinfo is not None:
+        return max(updated_at, user_modified)
+    return updated_at
+
+
+def shared_condition(etag_func=None, last_modified_func=None):
+    """condition()과 같되 카탈로그 캐시가 공용일 때만 적용 (locmem이면 ETag 없이 항상 200)"""
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if catalog_cache_is_shared():
+                return conditional_view(request, *args, **kwargs)
+            return view(request, *args, **kwargs)
+        return inner
+    return decorator
@@ -0,0 +1,131 @@
+# scentpick/utils/conversation_summary.py
+"""
+대화(conversations) 요약 컬럼 유지: title / last_message_preview / message_count / last_message_at
+
+messages에 행이 추가될 때 같은 트랜잭션 안에서 conversations 행을 갱신
+- MySQL: AFTER INSERT 트리거(trg_messages_conversation_summary) — FastAPI(chatbot.py)가 직접 INSERT해도 반영
+- 그 외 DB(sqlite 개발/테스트): Message post_save 시그널에서 같은 UPDATE를 ORM으로 실행
+- title은 비어 있을 때만 첫 사용자 메시지 앞부분으로 채움 (기존 사이드바 fallback과 동일)
+- updated_at도 메시지 시각으로 올림 → 사이드바 정렬 (user, updated_at DESC, id DESC) 인덱스 1회 조회
+"""
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.dateparse import parse_datetime
+
+from .pagination import decode_cursor, encode_cursor
+
+TITLE_LENGTH = 15
+PREVIEW_LENGTH = 100
+PREVIEW_ROLES = ("user", "assistant")
+SIDEBAR_PAGE_SIZE = 30
+SIDEBAR_FIELDS = ("id", "title", "updated_at", "last_message_preview", "message_count", "last_message_at")
+
+TRIGGER_NAME = "trg_messages_conversation_summary"
+
+CREATE_TRIGGER_SQL = f"""
+CREATE TRIGGER {TRIGGER_NAME} AFTER INSERT ON messages
+FOR EACH ROW
+UPDATE conversations SET
+    message_count = message_count + 1,
+    last_message_at = GREATEST(COALESCE(last_message_at, NEW.created_at), NEW.created_at),
+    last_message_preview = IF(NEW.role IN ('user', 'assistant'), LEFT(NEW.content, {PREVIEW_LENGTH}), last_message_preview),
+    title = COALESCE(title, IF(NEW.role = 'user', LEFT(NEW.content, {TITLE_LENGTH}), NULL)),
+    updated_at = GREATEST(updated_at, NEW.created_at)
+WHERE id = NEW.conversation_id
+"""
+DROP_TRIGGER_SQL = f"DROP TRIGGER IF EXISTS {TRIGGER_NAME}"
+
+
+def uses_db_trigger(conn=None):
+    """DB 트리거가 요약을 유지하는지 (MySQL)"""
+    return (conn or connection).vendor == "mysql"
+
+
+def install_summary_trigger(schema_editor):
+    if uses_db_trigger(schema_editor.connection):
+        schema_editor.execute(DROP_TRIGGER_SQL)
+        schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+def drop_summary_trigger(schema_editor):
+    if uses_db_trigger(schema_editor.connection):
+        schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+def apply_message(conversation_model, message):
+    """트리거가 없는 DB에서 새 메시지 1건을 요약에 반영 (트리거와 같은 UPDATE)"""
+    content = message.content or ""
+    updates = {
+        "message_count": F("message_count") + 1,
+        "last_message_at": Greatest(Coalesce(F("last_message_at"), Value(message.created_at)), Value(message.created_at)),
+        "updated_at": Greatest(F("updated_at"), Value(message.created_at)),
+    }
+    if message.role in PREVIEW_ROLES:
+        updates["last_message_preview"] = Value(content[:PREVIEW_LENGTH])
+    if message.role == "user":
+        updates["title"] = Coalesce(F("title"), Value(content[:TITLE_LENGTH]))
+    conversation_model.objects.filter(pk=message.conversation_id).update(**updates)
+
+
+def sidebar_title(conversation):
+    return conversation.title or f"대화 {conversation.id}"
+
+
+def sidebar_page(user, cursor=None, limit=None):
+    """
+    사이드바 대화 목록 한 페이지 — (user, updated_at DESC, id DESC) 인덱스 범위 조회 1회
+    cursor: 직전 페이지의 next_cursor ({"u": updated_at, "i": id}) — 잘못된 값이면 첫 페이지
+    → (Conversation 목록, next_cursor 또는 "")
+    """
+    from scentpick.models import Conversation
+
+    limit = limit or SIDEBAR_PAGE_SIZE
+    qs = Conversation.objects.filter(user=user).only(*SIDEBAR_FIELDS)
+    after = decode_cursor(cursor) or {}
+    updated_at = parse_datetime(str(after.get("u") or ""))
+    if updated_at is not None and isinstance(after.get("i"), int):
+        qs = qs.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lt=after["i"]))
+    rows = list(qs.order_by("-updated_at", "-id")[:limit + 1])
+    next_cursor = ""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"u": rows[-1].updated_at.isoformat(), "i": rows[-1].id})
+    return rows, next_cursor
+
+
+def backfill_conversation_summaries(conversation_model, message_model, batch_size=500):
+    """기존 대화의 요약 컬럼 재계산. 반환: 갱신한 대화 수"""
+    updated = 0
+    batch = []
+    for conv in conversation_model.objects.only("id", "title", "updated_at").iterator(chunk_size=batch_size):
+        messages = message_model.objects.filter(conversation_id=conv.id)
+        conv.message_count = messages.count()
+        last = messages.order_by("-created_at", "-id").values("created_at").first()
+        conv.last_message_at = last["created_at"] if last else None
+        preview = (
+            messages.filter(role__in=PREVIEW_ROLES).order_by("-created_at", "-id")
+            .values_list("content", flat=True).first()
+        )
+        conv.last_message_preview = (preview or "")[:PREVIEW_LENGTH] or None
+        if not conv.title:
+            first_user = (
+                messages.filter(role="user").order_by("created_at", "id")
+                .values_list("content", flat=True).first()
+            )
+            conv.title = (first_user or "")[:TITLE_LENGTH] or None
+        batch.append(conv)
+        if len(batch) >= batch_size:
+            updated += _save_batch(conversation_model, batch)
+            batch = []
+    if batch:
+        updated += _save_batch(conversation_model, batch)
+    return updated
+
+
+def _save_batch(conversation_model, batch):
+    # bulk_update는 auto_now(updated_at)를 건드리지 않음 → 사이드바 순서 유지
+    conversation_model.objects.bulk_update(
+        batch, ["title", "last_message_preview", "message_count", "last_message_at"]
+    )
+    return len(batch)
@@ -0,0 +1,301 @@
+# scentpick/utils/counters.py
+"""
+인기도 카운터 (write-behind): 향수별 찜/좋아요/싫어요/조회 수 + 사용자별 찜/좋아요/싫어요 합계
+
+- 증감은 프로세스 버퍼에 모으고 요청 종료 시(request_finished) 주기/건수 기준으로 배치 반영
+  → perfume_stats / user_stats 에 같은 증감량끼리 묶어 UPDATE ... SET n = n + d WHERE pk IN (...)
+- 조회는 Django 캐시 카운터(settings.CATALOG_CACHE_ALIAS)에서 O(1)
+  캐시에 없으면 테이블 값 + 아직 반영 안 된 버퍼 값으로 채움
+- 공용 캐시(redis 등)는 모든 워커가 같은 키를 incr → COUNTER_CACHE_TIMEOUT 동안 유지
+  프로세스별 캐시(locmem)는 다른 워커의 증감이 보이지 않으므로 COUNTER_LOCAL_CACHE_TIMEOUT(짧게)만 유지
+- 두 경우 모두 배치 반영 후 반영한 키를 지워 다음 조회 때 테이블에서 다시 채움
+  (캐시 미스로 채울 때는 이 프로세스 버퍼만 더하므로, 다른 워커의 미반영분은 그 워커가 반영하며 키를 지울 때 맞춰짐)
+- Favorite/FeedbackEvent 변경은 signals에서 커밋 후(on_commit) 기록,
+  조회 수는 product_detail에서 조건부 GET 판단 전에 기록 (304 재방문 포함)
+- 프로세스 간 타이밍 차이로 생기는 오차는 python manage.py rebuild_counters 로 이벤트 테이블 기준 재계산
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .catalog_cache import catalog_cache, catalog_cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+PERFUME = "perfume"
+USER = "user"
+COUNTER_FIELDS = {
+    PERFUME: ("favorite", "like", "dislike", "view"),
+    USER: ("favorite", "like", "dislike"),
+}
+COUNTED_ACTIONS = ("like", "dislike")
+COUNTER_KEY = "scentpick:counter:{}:{}:{}"
+
+
+def _models():
+    from scentpick.models import PerfumeStats, UserStats
+
+    return {PERFUME: PerfumeStats, USER: UserStats}
+
+
+class CounterBuffer:
+    """(kind, id, field) → 증감량. 반영 중(inflight)인 값도 조회에 포함"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._inflight = {}
+        self._since = None
+
+    def add(self, kind, obj_id, field, delta):
+        with self._lock:
+            self._pending[(kind, obj_id, field)] += delta
+            if self._since is None:
+                self._since = time.monotonic()
+
+    def pending(self, kind, obj_id):
+        with self._lock:
+            return {
+                field: self._pending.get((kind, obj_id, field), 0)
+                + self._inflight.get((kind, obj_id, field), 0)
+                for field in COUNTER_FIELDS[kind]
+            }
+
+    def pending_items(self, kind):
+        """kind 전체의 (id, field) → 미반영 증감량"""
+        with self._lock:
+            merged = defaultdict(int)
+            for source in (self._pending, self._inflight):
+                for (k, obj_id, field), delta in source.items():
+                    if k == kind:
+                        merged[(obj_id, field)] += delta
+            return merged
+
+    def due(self, interval, max_pending):
+        with self._lock:
+            if not self._pending:
+                return False
+            if max_pending and len(self._pending) >= max_pending:
+                return True
+            return bool(interval) and time.monotonic() - self._since >= interval
+
+    def drain(self):
+        with self._lock:
+            drained = {key: delta for key, delta in self._pending.items() if delta}
+            self._pending = defaultdict(int)
+            self._inflight = drained
+            self._since = None
+            return drained
+
+    def done(self, drained, ok):
+        """반영 완료(ok) 또는 실패 시 다시 대기열로"""
+        with self._lock:
+            self._inflight = {}
+            if not ok:
+                for key, delta in drained.items():
+                    self._pending[key] += delta
+                if self._since is None:
+                    self._since = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._pending = defaultdict(int)
+            self._inflight = {}
+            self._since = None
+
+
+_buffer = CounterBuffer()
+_flush_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _cache_key(kind, obj_id, field):
+    return COUNTER_KEY.format(kind, obj_id, field)
+
+
+def _cache_timeout():
+    if catalog_cache_is_shared():
+        return getattr(settings, "COUNTER_CACHE_TIMEOUT", 60 * 60 * 24)
+    return getattr(settings, "COUNTER_LOCAL_CACHE_TIMEOUT", 30)
+
+
+def _register_atexit():
+    global _atexit_registered
+    if not _atexit_registered:
+        _atexit_registered = True
+        atexit.register(flush_counters)
+
+
+def record(kind, obj_id, field, delta=1):
+    """카운터 증감: 버퍼에 적재 + 캐시 값이 있으면 즉시 반영 (없으면 다음 조회 때 테이블+버퍼로 채움)"""
+    if not obj_id or not delta:
+        return
+    _register_atexit()
+    _buffer.add(kind, obj_id, field, delta)
+    try:
+        catalog_cache().incr(_cache_key(kind, obj_id, field), delta)
+    except ValueError:
+        pass
+
+
+def record_on_commit(kind, obj_id, field, delta=1):
+    """트랜잭션이 커밋된 경우에만 반영 (롤백된 토글은 집계하지 않음)"""
+    transaction.on_commit(lambda: record(kind, obj_id, field, delta))
+
+
+def record_perfume_view(perfume_id):
+    record(PERFUME, perfume_id, "view")
+
+
+def get_counts(kind, obj_id):
+    """{field: 값} — 캐시 조회 1회, 미스일 때만 테이블 1회"""
+    fields = COUNTER_FIELDS[kind]
+    cache = catalog_cache()
+    keys = {field: _cache_key(kind, obj_id, field) for field in fields}
+    cached = cache.get_many(keys.values())
+    if len(cached) == len(keys):
+        return {field: cached[key] for field, key in keys.items()}
+
+    row = (
+        _models()[kind].objects.filter(pk=obj_id)
+        .values(*(f"{field}_count" for field in fields))
+        .first()
+    ) or {}
+    pending = _buffer.pending(kind, obj_id)
+    timeout = _cache_timeout()
+    counts = {}
+    for field, key in keys.items():
+        if key in cached:
+            counts[field] = cached[key]
+            continue
+        counts[field] = row.get(f"{field}_count", 0) + pending[field]
+        if not cache.add(key, counts[field], timeout):
+            counts[field] = cache.get(key, counts[field])
+    return counts
+
+
+def get_perfume_counts(perfume_id):
+    return get_counts(PERFUME, perfume_id)
+
+
+def get_user_counts(user_id):
+    return get_counts(USER, user_id)
+
+
+def perfume_counts_table():
+    """perfume_id → {field: 값} (전체, 테이블 1회 + 미반영 버퍼) — 인기도 정렬/자동완성용"""
+    from scentpick.models import PerfumeStats
+
+    fields = COUNTER_FIELDS[PERFUME]
+    table = defaultdict(lambda: dict.fromkeys(fields, 0))
+    for row in PerfumeStats.objects.values("perfume_id", *(f"{f}_count" for f in fields)).iterator():
+        table[row["perfume_id"]] = {f: row[f"{f}_count"] for f in fields}
+    for (perfume_id, field), delta in _buffer.pending_items(PERFUME).items():
+        table[perfume_id][field] += delta
+    return table
+
+
+def _apply(drained):
+    """증감량 → 행별 증감 벡터로 묶고, 같은 벡터끼리 UPDATE 1회"""
+    models = _models()
+    vectors = defaultdict(dict)
+    for (kind, obj_id, field), delta in drained.items():
+        vectors[(kind, obj_id)][field] = delta
+
+    now = timezone.now()
+    with transaction.atomic():
+        for kind, model in models.items():
+            # 증가분이 있는 행만 미리 생성 (삭제된 사용자/향수의 감소분은 무시)
+            new_ids = [
+                obj_id for (k, obj_id), vec in vectors.items()
+                if k == kind and any(d > 0 for d in vec.values())
+            ]
+            if new_ids:
+                model.objects.bulk_create(
+                    [model(pk=obj_id) for obj_id in new_ids], ignore_conflicts=True
+                )
+            groups = defaultdict(list)
+            for (k, obj_id), vec in vectors.items():
+                if k == kind:
+                    groups[tuple(sorted(vec.items()))].append(obj_id)
+            for vec, ids in groups.items():
+                updates = {f"{field}_count": F(f"{field}_count") + delta for field, delta in vec}
+                model.objects.filter(pk__in=ids).update(updated_at=now, **updates)
+    return len(vectors)
+
+
+def flush_counters():
+    """버퍼 → perfume_stats / user_stats 배치 반영. 반환: 갱신 행 수"""
+    with _flush_lock:
+        drained = _buffer.drain()
+        if not drained:
+            return 0
+        try:
+            rows = _apply(drained)
+        except Exception:
+            logger.exception("counter flush failed (%d keys, will retry)", len(drained))
+            _buffer.done(drained, ok=False)
+            return 0
+        _buffer.done(drained, ok=True)
+        # 캐시 값은 미스 때 채운 프로세스의 버퍼만 포함 (locmem은 다른 워커 반영분도 모름) → 테이블 기준으로 다시 채우게 함
+        catalog_cache().delete_many({_cache_key(kind, obj_id, field) for kind, obj_id, _ in drained
+                                     for field in COUNTER_FIELDS[kind]})
+        return rows
+
+
+def maybe_flush_counters():
+    """COUNTER_FLUSH_INTERVAL(초)이 지났거나 버퍼 키가 COUNTER_FLUSH_MAX_PENDING 이상이면 반영"""
+    interval = getattr(settings, "COUNTER_FLUSH_INTERVAL", 10)
+    max_pending = getattr(settings, "COUNTER_FLUSH_MAX_PENDING", 1000)
+    if _buffer.due(interval, max_pending):
+        return flush_counters()
+    return 0
+
+
+def rebuild_counter_tables(favorite_model, feedback_model, perfume_stats_model, user_stats_model):
+    """
+    찜/피드백 이벤트 테이블 기준으로 카운터 테이블 재계산 (조회 수는 원천이 없으므로 유지)
+    반환: (향수 행 수, 사용자 행 수)
+    """
+    perfume_rows = defaultdict(dict)
+    user_rows = defaultdict(dict)
+    for row in favorite_model.objects.values("perfume_id").annotate(n=Count("id")):
+        perfume_rows[row["perfume_id"]]["favorite_count"] = row["n"]
+    for row in favorite_model.objects.values("user_id").annotate(n=Count("id")):
+        user_rows[row["user_id"]]["favorite_count"] = row["n"]
+    feedback = feedback_model.objects.filter(action__in=COUNTED_ACTIONS)
+    for row in feedback.values("perfume_id", "action").annotate(n=Count("id")):
+        perfume_rows[row["perfume_id"]][f"{row['action']}_count"] = row["n"]
+    for row in feedback.values("user_id", "action").annotate(n=Count("id")):
+        user_rows[row["user_id"]][f"{row['action']}_count"] = row["n"]
+
+    with transaction.atomic():
+        views = dict(perfume_stats_model.objects.filter(view_count__gt=0).values_list("perfume_id", "view_count"))
+        perfume_stats_model.objects.all().delete()
+        perfume_stats_model.objects.bulk_create(
+            [
+                perfume_stats_model(perfume_id=pid, view_count=views.get(pid, 0), **perfume_rows.get(pid, {}))
+                for pid in perfume_rows.keys() | views.keys()
+            ],
+            batch_size=1000,
+        )
+        user_stats_model.objects.all().delete()
+        user_stats_model.objects.bulk_create(
+            [user_stats_model(user_id=uid, **counts) for uid, counts in user_rows.items()],
+            batch_size=1000,
+        )
+    return len(perfume_rows.keys() | views.keys()), len(user_rows)
+
+
+def reset_cached_counts(kind, ids):
+    """캐시 카운터 삭제 → 다음 조회 때 테이블에서 다시 채움"""
+    keys = [_cache_key(kind, obj_id, field) for obj_id in ids for field in COUNTER_FIELDS[kind]]
+    if keys:
+        catalog_cache().delete_many(keys)
@@ -0,0 +1,246 @@
+# scentpick/utils/facets.py
+"""
+향수 목록(/perfumes/) 사이드바용 인메모리 패싯 인덱스
+
+- Perfume 전체를 (brand, name, id) 순으로 한 번 읽어서 각 향수에 정렬 위치(0..N-1)를 부여
+- 브랜드/성별/농도/어코드/용량 옵션마다 "정렬 위치 비트셋"(파이썬 int)을 posting list로 보관
+- 필터 = 비트 AND/OR, 개수 = bit_count(), 정렬 = 비트 순서 그대로 → DB 조회 없음
+- Perfume 저장/삭제 시 signals에서 invalidate_facet_index() 호출, 다음 요청에서 재빌드
+  (다른 프로세스는 카탈로그 세대(catalog_cache) 변경을 보고 재빌드)
+"""
+import itertools
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+
+from .catalog_cache import get_catalog_generation
+
+# 사이드바에 노출하지 않을 어코드 토큰
+_ACCORD_STOPWORDS = {"/", "-", "_"}
+
+# 필터 파라미터 이름 → 인덱스 패싯 이름
+FACETS = ("brand", "gender", "conc", "accord", "size")
+
+
+def parse_accords(raw):
+    """main_accords(JSON 리스트 또는 레거시 문자열)를 토큰 리스트로 변환"""
+    if not raw:
+        return []
+    if isinstance(raw, list):
+        parts = [str(p).strip() for p in raw if p]
+    else:
+        cleaned = str(raw).strip("[]").replace("'", "").replace('"', "")
+        parts = [p.strip() for p in cleaned.split(",") if p.strip()]
+    return [p for p in parts if p and p not in _ACCORD_STOPWORDS]
+
+
+def parse_sizes(raw):
+    """sizes(JSON 리스트)를 int 리스트로 변환"""
+    if not raw:
+        return []
+    if not isinstance(raw, list):
+        raw = [raw]
+    sizes = []
+    for s in raw:
+        try:
+            sizes.append(int(s))
+        except (TypeError, ValueError):
+            pass
+    return sizes
+
+
+def iter_bits(mask):
+    """비트셋에서 켜진 위치를 오름차순으로 반환"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FacetIndex:
+    """
+    정렬 위치 기반 비트셋 패싯 인덱스
+
+    postings[facet][option] = 해당 옵션을 가진 향수들의 정렬 위치 비트셋
+    """
+
+    def __init__(self, rows, generation=None):
+        # rows: (id, brand, name, gender, concentration, main_accords, sizes) — DB에서 brand, name, id 순으로 정렬된 상태
+        # (페이지/사이드바 브랜드 순서가 DB 콜레이션 그대로)
+        self.ids = []
+        self.sort_keys = []
+        self.position = {}
+        self.postings = {facet: {} for facet in FACETS}
+
+        for pos, (pid, brand, name, gender, conc, main_accords, sizes) in enumerate(rows):
+            self.ids.append(pid)
+            self.sort_keys.append((brand, name, pid))
+            self.position[pid] = pos
+            bit = 1 << pos
+            self._add("brand", brand, bit)
+            self._add("gender", gender, bit)
+            self._add("conc", conc, bit)
+            for accord in set(parse_accords(main_accords)):
+                self._add("accord", accord, bit)
+            for size in set(parse_sizes(sizes)):
+                self._add("size", size, bit)
+
+        self.all_mask = (1 << len(self.ids)) - 1
+        self.built_at = time.monotonic()
+        # 빌드 시점의 카탈로그 세대 (캐시 키 버전 / 다른 프로세스 변경 감지용)
+        self.generation = generation
+
+    def _add(self, facet, option, bit):
+        if option is None or option == "":
+            return
+        bucket = self.postings[facet]
+        bucket[option] = bucket.get(option, 0) | bit
+
+    # ---------- 사이드바 옵션 ----------
+    def options(self, facet):
+        """패싯 옵션 목록 (정렬됨)"""
+        if facet == "brand":
+            # 빌드 순서가 곧 brand 정렬 순서
+            return list(self.postings["brand"])
+        return sorted(self.postings[facet])
+
+    def options_with_counts(self, facet, counts):
+        """템플릿용 [{"value": 옵션, "count": 개수}, ...]"""
+        facet_counts = counts.get(facet, {})
+        return [
+            {"value": option, "count": facet_counts.get(option, 0)}
+            for option in self.options(facet)
+        ]
+
+    # ---------- 필터 ----------
+    def _matching_options(self, facet, values):
+        """기존 ORM 필터와 같은 매칭 규칙으로 선택값 → 옵션 목록"""
+        bucket = self.postings[facet]
+        if facet == "brand":
+            return [v for v in values if v in bucket]
+        if facet == "gender":
+            wanted = {v.lower() for v in values}
+            return [o for o in bucket if o.lower() in wanted]
+        if facet in ("conc", "accord"):
+            needles = [v.lower() for v in values if v]
+            return [o for o in bucket if any(n in o.lower() for n in needles)]
+        if facet == "size":
+            return [s for s in parse_sizes(values) if s in bucket]
+        return []
+
+    def facet_mask(self, facet, values):
+        """한 패싯 안의 선택값은 OR, 선택값이 없으면 전체"""
+        if not values:
+            return self.all_mask
+        bucket = self.postings[facet]
+        mask = 0
+        for option in self._matching_options(facet, values):
+            mask |= bucket[option]
+        return mask
+
+    def mask_for_ids(self, ids):
+        """id 목록(예: 검색어 결과) → 비트셋"""
+        mask = 0
+        position = self.position
+        for pid in ids:
+            pos = position.get(pid)
+            if pos is not None:
+                mask |= 1 << pos
+        return mask
+
+    def search(self, selection, restrict=None, with_counts=True):
+        """
+        selection: {"brand": [...], "gender": [...], ...}
+        restrict: 추가로 AND 할 비트셋 (검색어 결과 등)
+        반환: (결과 비트셋, 패싯별 옵션 개수 — with_counts=False면 빈 dict)
+        """
+        base = self.all_mask if restrict is None else restrict
+        masks = {facet: self.facet_mask(facet, selection.get(facet)) for facet in FACETS}
+
+        result = base
+        for mask in masks.values():
+            result &= mask
+
+        # 옵션별 개수: 자기 패싯을 제외한 나머지 조건만 적용 (선택 변경 시 결과 수)
+        counts = {}
+        if not with_counts:
+            return result, counts
+        for facet in FACETS:
+            others = base
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            counts[facet] = {
+                option: (bits & others).bit_count()
+                for option, bits in self.postings[facet].items()
+            }
+        return result, counts
+
+    def ids_for(self, mask):
+        """비트셋 → (brand, name, id) 순서의 id 리스트"""
+        ids = self.ids
+        return [ids[pos] for pos in iter_bits(mask)]
+
+    def ids_in(self, mask, ids):
+        """주어진 id 순서(예: 검색 관련도 순)를 유지한 채 비트셋에 포함된 것만"""
+        position = self.position
+        return [pid for pid in ids if pid in position and mask >> position[pid] & 1]
+
+    def ids_after(self, mask, after_key, limit):
+        """
+        keyset 페이지네이션: (brand, name, id) 커서 다음부터 limit개 id와 다음 페이지 유무
+        커서가 가리키는 향수는 보통 id로 바로 위치를 찾음. 삭제됐으면 정렬 키 bisect로 근사
+        (파이썬 비교가 DB 콜레이션과 다른 구간이면 그 경계에서 몇 개 겹치거나 건너뛸 수 있음)
+        """
+        if after_key is None:
+            start = 0
+        else:
+            brand, name, pid = after_key
+            pos = self.position.get(pid)
+            start = pos + 1 if pos is not None else bisect_right(self.sort_keys, (brand, name, pid))
+        ids = self.ids
+        found = list(itertools.islice(iter_bits(mask >> start), limit + 1))
+        return [ids[start + pos] for pos in found[:limit]], len(found) > limit
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _build(generation):
+    from scentpick.models import Perfume
+
+    rows = (
+        Perfume.objects.order_by("brand", "name", "id")
+        .values_list("id", "brand", "name", "gender", "concentration", "main_accords", "sizes")
+    )
+    return FacetIndex(rows.iterator(), generation=generation)
+
+
+def _is_fresh(index, generation, ttl):
+    if index is None or index.generation != generation:
+        return False
+    return not ttl or time.monotonic() - index.built_at < ttl
+
+
+def get_facet_index():
+    """프로세스 단위 패싯 인덱스 (카탈로그 세대가 바뀌었거나 TTL이 지나면 재빌드)"""
+    global _index
+    ttl = getattr(settings, "FACET_INDEX_TTL", 600)
+    generation = get_catalog_generation()
+    index = _index
+    if _is_fresh(index, generation, ttl):
+        return index
+    with _lock:
+        index = _index
+        if not _is_fresh(index, generation, ttl):
+            index = _index = _build(generation)
+    return index
+
+
+def invalidate_facet_index():
+    """Perfume 변경 시 호출 → 다음 get_facet_index()에서 재빌드"""
+    global _index
+    _index = None
@@ -0,0 +1,206 @@
+# scentpick/utils/idempotency.py
+"""
+채팅 전송 멱등성 (chat_submit_api / chat_stream_api) — 더블 클릭·재시도가 에이전트를 두 번 돌리지 않게
+
+- 키: 클라이언트 Idempotency-Key 헤더(또는 idempotency_key 필드)를 사용자 범위로 해시,
+  없으면 (사용자, 대화, 내용, 이미지)로 서버에서 유도 — 유도 키는 CHAT_IDEMPOTENCY_WINDOW초 안의 중복만 막음
+- 진행 중: DB 표식(chat_submission_claims, 키가 PK) INSERT → 워커가 달라도 한 요청만 실행,
+  같은 키의 다른 요청은 표식이 사라질 때까지 기다렸다가 같은 결과 반환
+  (chat_stream_api는 같은 워커에 진행 중인 스트림이 있으면 처음부터 붙어서 받음: stream_resume)
+- 완료: 사용자 메시지의 Message.idempotency_key에 키 기록 + 결과(conversation_id / final_answer / perfume_list)를
+  캐시에 보관 후 표식 삭제 → 다른 워커(캐시 미스)도 DB에서 저장된 답변과 추천으로 응답, FastAPI 재호출 없음
+- 실패: 표식 삭제 → 재시도는 새로 실행
+"""
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .catalog_cache import catalog_cache
+from .rec_history import load_message_recommendations
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+KEY_PREFIX = "scentpick:idem:"
+
+
+def submission_key(client_key, user_id, conversation_id, content, image=None):
+    """→ (64자 키, 클라이언트 키 여부)"""
+    if client_key:
+        raw = f"{user_id}:client:{client_key}"
+    else:
+        image_sig = f"{image.name}:{image.size}" if image else ""
+        raw = f"{user_id}:derived:{conversation_id or ''}:{content}:{image_sig}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest(), bool(client_key)
+
+
+def result_ttl(is_client_key):
+    if is_client_key:
+        return getattr(settings, "CHAT_IDEMPOTENCY_TTL", 24 * 60 * 60)
+    return getattr(settings, "CHAT_IDEMPOTENCY_WINDOW", 30)
+
+
+def _cache_key(key):
+    return KEY_PREFIX + key
+
+
+def cached_result(key):
+    """캐시에 있는 완료 결과 dict 또는 None"""
+    value = catalog_cache().get(_cache_key(key))
+    return value if isinstance(value, dict) else None
+
+
+def _pending_ttl():
+    return getattr(settings, "CHAT_IDEMPOTENCY_PENDING_TTL", 300)
+
+
+def _claims():
+    from scentpick.models import ChatSubmissionClaim
+
+    return ChatSubmissionClaim.objects
+
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=_pending_ttl())
+
+
+def begin(key):
+    """처리 시작 표식 — 이미 다른 요청(다른 워커 포함)이 시작했으면 False"""
+    _claims().filter(key=key, created_at__lt=_stale_before()).delete()
+    try:
+        with transaction.atomic():
+            _claims().create(key=key)
+    except IntegrityError:
+        return False
+    return True
+
+
+def is_pending(key):
+    return _claims().filter(key=key, created_at__gte=_stale_before()).exists()
+
+
+def complete(key, result, is_client_key):
+    catalog_cache().set(_cache_key(key), result, timeout=result_ttl(is_client_key))
+    _claims().filter(key=key).delete()
+
+
+def abandon(key):
+    _claims().filter(key=key).delete()
+
+
+acomplete = sync_to_async(complete)
+aabandon = sync_to_async(abandon)
+
+
+def _poll(key, user_id, is_client_key):
+    """→ (끝났는지, 결과 또는 None). 표식이 사라졌는데 결과가 없으면 앞선 요청이 실패한 것"""
+    result = cached_result(key)
+    if result is not None:
+        return True, result
+    if is_pending(key):
+        return False, None
+    return True, lookup(key, user_id, is_client_key)
+
+
+def wait_result(key, user_id, is_client_key, timeout=None, interval=0.2):
+    """진행 중인 같은 키의 결과를 기다림 → 결과 dict 또는 None (시간 초과 / 실패로 표식 삭제)"""
+    deadline = time.monotonic() + (timeout or getattr(settings, "CHAT_BACKEND_READ_TIMEOUT", 60))
+    while time.monotonic() < deadline:
+        done, result = _poll(key, user_id, is_client_key)
+        if done:
+            return result
+        time.sleep(interval)
+    return None
+
+
+async def await_result(key, user_id, is_client_key, timeout=None, interval=0.2):
+    deadline = time.monotonic() + (timeout or getattr(settings, "CHAT_STREAM_READ_TIMEOUT", 120))
+    while time.monotonic() < deadline:
+        done, result = await sync_to_async(_poll)(key, user_id, is_client_key)
+        if done:
+            return result
+        await asyncio.sleep(interval)
+    return None
+
+
+def lookup(key, user_id, is_client_key):
+    """이미 완료된 결과 (캐시 → DB 순) 또는 None"""
+    result = cached_result(key)
+    if result is None:
+        result = stored_result(user_id, key, is_client_key)
+        if result is not None:
+            catalog_cache().set(_cache_key(key), result, timeout=result_ttl(is_client_key))
+    return result
+
+
+def claim(key, user_id, is_client_key):
+    """
+    → (완료 결과 또는 None, 이 요청이 실행할지)
+    (None, False): 같은 키가 아직 처리 중 (대기 시간 초과)
+    """
+    result = lookup(key, user_id, is_client_key)
+    if result is not None:
+        return result, False
+    if begin(key):
+        return None, True
+    result = wait_result(key, user_id, is_client_key)
+    if result is not None:
+        return result, False
+    return None, begin(key)  # 앞선 요청이 실패했으면 이어서 실행
+
+
+async def aclaim(key, user_id, is_client_key):
+    result = await sync_to_async(lookup)(key, user_id, is_client_key)
+    if result is not None:
+        return result, False
+    if await sync_to_async(begin)(key):
+        return None, True
+    result = await await_result(key, user_id, is_client_key)
+    if result is not None:
+        return result, False
+    return None, await sync_to_async(begin)(key)
+
+
+def stored_result(user_id, key, is_client_key):
+    """Message.idempotency_key로 기록된 완료 결과 (사용자 메시지 다음 assistant 답변 + 추천) 또는 None"""
+    from scentpick.models import Message
+
+    sent = Message.objects.filter(idempotency_key=key, role="user", conversation__user_id=user_id)
+    if not is_client_key:
+        sent = sent.filter(created_at__gte=timezone.now() - timedelta(seconds=result_ttl(False)))
+    request_msg = sent.only("id", "conversation_id", "created_at").order_by("-created_at").first()
+    if request_msg is None:
+        return None
+    reply = (
+        Message.objects.filter(
+            conversation_id=request_msg.conversation_id, role="assistant", created_at__gte=request_msg.created_at,
+        )
+        .only("id", "role", "content", "created_at")
+        .order_by("created_at", "id")
+        .first()
+    )
+    if reply is None:
+        return None
+    recommendations = load_message_recommendations(request_msg.conversation_id, [reply])
+    return {
+        "conversation_id": request_msg.conversation_id,
+        "final_answer": reply.content,
+        "perfume_list": recommendations.get(reply.id, []),
+    }
+
+
+def mark_request_message(conversation_id, user_id, key, **fields):
+    """대화의 가장 최근 사용자 메시지에 키(와 추가 필드) 기록 — FastAPI가 저장한 메시지에 붙임"""
+    from scentpick.models import Message
+
+    latest_id = (
+        Message.objects.filter(conversation_id=conversation_id, conversation__user_id=user_id, role="user")
+        .order_by("-created_at", "-id").values_list("id", flat=True).first()
+    )
+    if latest_id is None:
+        return 0
+    return Message.objects.filter(id=latest_id).update(idempotency_key=key, **fields)
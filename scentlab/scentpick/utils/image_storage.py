@@ -0,0 +1,117 @@
+# scentpick/utils/image_storage.py
+"""
+이미지 저장소 추상화 (S3 / 로컬 파일시스템)
+
+- settings.PERFUME_IMAGE_STORAGE: "s3"(기본) | "local" | 클래스 dotted path
+- 공통 인터페이스: url(key) / exists(key) / read(key) / save(key, data, content_type)
+- S3ImageStorage(bucket=...)로 다른 버킷에 재사용 (채팅 첨부 이미지: utils/chat_images.py)
+- 로컬 저장소는 개발/테스트용 S3 대체 (MEDIA_ROOT 아래에 같은 키 구조로 저장)
+"""
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+CACHE_CONTROL = "public, max-age=31536000"
+
+
+class S3ImageStorage:
+    def __init__(self, bucket=None):
+        self.bucket = bucket or getattr(settings, "PERFUME_IMAGE_BUCKET", "scentpick-images")
+        self.region = getattr(settings, "AWS_REGION", "ap-northeast-2")
+        self.base_url = (
+            (None if bucket else getattr(settings, "PERFUME_IMAGE_BASE_URL", ""))
+            or f"https://{self.bucket}.s3.{self.region}.amazonaws.com"
+        ).rstrip("/")
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except Exception as e:
+                raise RuntimeError("boto3 패키지 필요: pip install boto3") from e
+            self._client = boto3.client(
+                "s3",
+                aws_access_key_id=getattr(settings, "AWS_ACCESS_KEY_ID", None),
+                aws_secret_access_key=getattr(settings, "AWS_SECRET_ACCESS_KEY", None),
+                region_name=self.region,
+            )
+        return self._client
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return False
+        return True
+
+    def read(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def save(self, key, data, content_type):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            ACL="public-read",
+            CacheControl=CACHE_CONTROL,
+        )
+        return self.url(key)
+
+
+class LocalImageStorage:
+    def __init__(self):
+        self.root = Path(
+            getattr(settings, "PERFUME_IMAGE_LOCAL_ROOT", "")
+            or Path(settings.MEDIA_ROOT) / "scentpick-images"
+        )
+        self.base_url = (
+            getattr(settings, "PERFUME_IMAGE_BASE_URL", "")
+            or f"{settings.MEDIA_URL}scentpick-images"
+        ).rstrip("/")
+
+    def _path(self, key):
+        return self.root / key
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+    def exists(self, key):
+        return self._path(key).is_file()
+
+    def read(self, key):
+        return self._path(key).read_bytes()
+
+    def save(self, key, data, content_type):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 임시 파일에 쓰고 교체 → 읽는 쪽에서 반쯤 쓰인 파일을 보지 않음
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return self.url(key)
+
+
+STORAGE_BACKENDS = {
+    "s3": S3ImageStorage,
+    "local": LocalImageStorage,
+}
+
+
+@lru_cache(maxsize=None)
+def get_image_storage(name=None):
+    name = name or getattr(settings, "PERFUME_IMAGE_STORAGE", "s3")
+    backend = STORAGE_BACKENDS.get(name) or import_string(name)
+    return backend()
@@ -0,0 +1,68 @@
+# scentpick/utils/message_history.py
+"""
+대화 메시지 기록 페이지 (chat 첫 화면, /api/conversations/<id>/messages?before=<message_id>&limit=N)
+
+- 최신 메시지부터 limit개씩 역순으로 잘라 오래된 → 최신 순으로 반환, before는 직전 페이지의 가장 오래된 메시지 id
+- keyset: (created_at, id) < before 메시지 — before의 created_at은 서브쿼리로 같은 쿼리 안에서 조회
+  → 대화 길이와 무관하게 (conversation, created_at) 인덱스 범위 조회 1회
+- LangGraph state / metadata 같은 무거운 JSON 컬럼은 읽지 않음(defer)
+- 추천 데이터는 rec_history로 페이지 단위 일괄 조회
+"""
+from django.db.models import Q, Subquery
+
+from .rec_history import load_message_recommendations
+
+HISTORY_PAGE_SIZE = 30
+HISTORY_MAX_LIMIT = 100
+HEAVY_MESSAGE_FIELDS = ("state", "metadata")
+
+
+def parse_history_params(params):
+    """(before, limit) — 잘못된 값이면 ValueError"""
+    before = params.get("before") or None
+    if before is not None:
+        before = int(before)
+    limit = int(params.get("limit") or HISTORY_PAGE_SIZE)
+    if limit < 1:
+        raise ValueError("limit")
+    return before, min(limit, HISTORY_MAX_LIMIT)
+
+
+def load_message_page(conversation, before=None, limit=HISTORY_PAGE_SIZE):
+    """→ (created_at 오름차순 Message 목록, 더 이전 메시지 존재 여부)"""
+    from scentpick.models import Message
+
+    qs = Message.objects.filter(conversation=conversation).defer(*HEAVY_MESSAGE_FIELDS)
+    if before is not None:
+        before_at = Subquery(
+            Message.objects.filter(pk=before, conversation=conversation).values("created_at")[:1]
+        )
+        qs = qs.filter(Q(created_at__lt=before_at) | Q(created_at=before_at, id__lt=before))
+    rows = list(qs.order_by("-created_at", "-id")[:limit + 1])
+    has_more = len(rows) > limit
+    return rows[:limit][::-1], has_more
+
+
+def message_history_page(conversation, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    → {"items": [{'role', 'content', 'created_at', 'chat_image', 'perfume_list'?}, ...],
+       "has_more": bool, "before": 다음 요청의 before(가장 오래된 메시지 id) 또는 None}
+    """
+    messages, has_more = load_message_page(conversation, before, limit)
+    recommendations = load_message_recommendations(conversation, messages)
+    items = []
+    for m in messages:
+        item = {
+            'role': m.role,
+            'content': m.content,
+            'created_at': m.created_at.isoformat(),
+            'chat_image': m.chat_image,
+        }
+        if m.id in recommendations:
+            item['perfume_list'] = recommendations[m.id]
+        items.append(item)
+    return {
+        "items": items,
+        "has_more": has_more,
+        "before": messages[0].id if messages and has_more else None,
+    }
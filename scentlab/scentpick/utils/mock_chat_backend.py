@@ -0,0 +1,156 @@
+# scentpick/utils/mock_chat_backend.py
+"""
+부하 테스트용 가짜 FastAPI 챗봇 (ASGI 앱, DB/LLM 없음) — loadtest_chat 명령에서 uvicorn으로 띄움
+
+- POST .../stream: SSE — 첫 토큰 전 latency(± jitter)초 대기 후 초당 token_rate개씩 {"content"} 프레임,
+  마지막에 {"done", "conversation_id", "perfume_list"}
+- POST 그 외 경로: chat_submit_api용 JSON 응답 (전체 생성 시간만큼 기다린 뒤 한 번에)
+- 장애 주입: error_rate 확률로 HTTP 500, drop_rate 확률로 스트림 중간에 done 없이 끊김
+- GET /stats: 시작/완료/오류/끊김/클라이언트 취소 수 (요청마다 주입 결과가 달라 실제 주입 횟수는 여기서 확인)
+"""
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+
+SAMPLE_ANSWER = (
+    "여름에는 시트러스와 아쿠아 노트가 중심인 가벼운 향수를 추천드려요. 베르가못과 레몬으로 시작해 "
+    "화이트 머스크로 부드럽게 마무리되는 오 드 뚜왈렛이면 출근길에도 부담 없이 뿌리기 좋습니다."
+).split()
+
+
+class MockChatBackend:
+    def __init__(self, tokens=40, token_rate=20.0, latency=0.5, jitter=0.1, error_rate=0.0, drop_rate=0.0, seed=None):
+        self.tokens = tokens
+        self.token_rate = token_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        self._conversation_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"started": 0, "finished": 0, "errors": 0, "dropped": 0, "cancelled": 0}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _plan(self):
+        """요청 1건의 (첫 토큰 지연, 장애 종류 None | "error" | "drop", 끊길 토큰 위치)"""
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            roll = self._random.random()
+            drop_at = self._random.randrange(max(self.tokens, 1))
+        if roll < self.error_rate:
+            return delay, "error", drop_at
+        if roll < self.error_rate + self.drop_rate:
+            return delay, "drop", drop_at
+        return delay, None, drop_at
+
+    def _interval(self):
+        return 1.0 / self.token_rate if self.token_rate > 0 else 0.0
+
+    def _token(self, i):
+        return SAMPLE_ANSWER[i % len(SAMPLE_ANSWER)] + " "
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["method"] == "GET" and scope["path"].rstrip("/").endswith("/stats"):
+            await _send_json(send, 200, self.snapshot())
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            await _send_json(send, 422, {"detail": "invalid json"})
+            return
+
+        self._count("started")
+        delay, failure, drop_at = self._plan()
+        try:
+            if scope["path"].rstrip("/").endswith("/stream"):
+                await self._stream(send, payload, delay, failure, drop_at)
+            else:
+                await asyncio.sleep(delay + self.tokens * self._interval())
+                if failure:
+                    self._count("errors")
+                    await _send_json(send, 500, {"detail": "injected failure"})
+                    return
+                await _send_json(send, 200, {
+                    "conversation_id": payload.get("conversation_id") or next(self._conversation_ids),
+                    "final_answer": "".join(self._token(i) for i in range(self.tokens)),
+                    "perfume_list": [],
+                })
+                self._count("finished")
+        except (asyncio.CancelledError, OSError):
+            self._count("cancelled")
+            raise
+
+    async def _stream(self, send, payload, delay, failure, drop_at):
+        await asyncio.sleep(delay)
+        if failure == "error":
+            self._count("errors")
+            await _send_json(send, 500, {"detail": "injected failure"})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+        ]})
+        interval = self._interval()
+        for i in range(self.tokens):
+            if failure == "drop" and i == drop_at:
+                self._count("dropped")
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            await send({"type": "http.response.body", "body": _frame({"content": self._token(i)}), "more_body": True})
+            await asyncio.sleep(interval)
+        done = {
+            "done": True,
+            "conversation_id": payload.get("conversation_id") or next(self._conversation_ids),
+            "perfume_list": [],
+        }
+        await send({"type": "http.response.body", "body": _frame(done), "more_body": False})
+        self._count("finished")
+
+
+def _frame(data):
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def _send_json(send, status, data):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps(data, ensure_ascii=False).encode("utf-8")})
+
+
+def serve_in_thread(app, host="127.0.0.1", port=8766):
+    """uvicorn으로 app을 데몬 스레드에서 실행 → (uvicorn.Server, Thread). 종료: server.should_exit = True"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        app, host=host, port=port, lifespan="off", log_level="warning", access_log=False,
+    ))
+    thread = threading.Thread(target=server.run, name="mock-chat-backend", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"mock chat backend failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server, thread
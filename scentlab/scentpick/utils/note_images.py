@@ -0,0 +1,117 @@
+# scentpick/utils/note_images.py
+"""
+노트명 → 노트 이미지 URL 인메모리 리졸버 (product_detail 노트 카드용)
+
+기존 get_note_image_url()의 매칭 순서를 그대로 따르되 DB 조회 없이 처리:
+  1. 영문명(KOREAN_TO_ENGLISH / NOTE_TRANSLATIONS 역방향) 정확 일치 (대소문자 무시)
+  2. 영문명을 포함하는 노트
+  3. 여러 단어면 3글자 이상 단어를 포함하는 노트
+  4. 원래 노트명(한국어)을 포함하는 노트
+같은 조건이면 id가 작은 행 우선 (기존 .first()와 동일)
+
+- note_images 전체를 프로세스당 1회 적재, 번역 사전의 노트는 적재 시점에 미리 계산
+- NoteImage 변경(signals) 또는 bump_catalog_generation --note-images 로 버전이 바뀌면 재적재
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .catalog_cache import get_note_images_version
+from .note_translations import KOREAN_TO_ENGLISH, NOTE_TRANSLATIONS
+
+# NOTE_TRANSLATIONS(영→한) 역방향: KOREAN_TO_ENGLISH에 없는 표기(띄어쓰기 차이 등) 보완
+_ENGLISH_BY_KOREAN = {ko: en for en, ko in NOTE_TRANSLATIONS.items()}
+
+
+def english_note_name(note_name):
+    return KOREAN_TO_ENGLISH.get(note_name) or _ENGLISH_BY_KOREAN.get(note_name) or note_name
+
+
+class NoteImageResolver:
+    def __init__(self, rows, version=None):
+        """rows: (id, note_name, image_url) 이터러블"""
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # (소문자 노트명, image_url) — id 오름차순
+        self._names = []
+        self._exact = {}
+        for _, name, url in sorted(rows, key=lambda r: r[0]):
+            if not name:
+                continue
+            key = name.lower()
+            self._names.append((key, url))
+            self._exact.setdefault(key, url)
+        self._contains_memo = {}
+        self._memo = {}
+        for note in (*KOREAN_TO_ENGLISH, *_ENGLISH_BY_KOREAN):
+            self.resolve(note)
+
+    def _contains(self, needle):
+        """needle을 포함하는 첫 노트의 image_url (없으면 None) — 결과 메모"""
+        needle = needle.lower()
+        if needle not in self._contains_memo:
+            self._contains_memo[needle] = next(
+                ((url,) for name, url in self._names if needle in name), None
+            )
+        return self._contains_memo[needle]
+
+    def _resolve(self, note_name):
+        english = english_note_name(note_name)
+        key = english.lower()
+        if key in self._exact:
+            return self._exact[key]
+        hit = self._contains(english)
+        if hit:
+            return hit[0]
+        if " " in english:
+            for word in english.split():
+                if len(word) > 2:
+                    hit = self._contains(word)
+                    if hit:
+                        return hit[0]
+        hit = self._contains(note_name)
+        return hit[0] if hit else None
+
+    def resolve(self, note_name):
+        if not note_name:
+            return None
+        if note_name not in self._memo:
+            self._memo[note_name] = self._resolve(note_name)
+        return self._memo[note_name]
+
+    def resolve_many(self, note_names):
+        """노트명 리스트 → {노트명: image_url 또는 None}"""
+        return {name: self.resolve(name) for name in note_names}
+
+
+_resolver = None
+_lock = threading.Lock()
+
+
+def _load(version):
+    from scentpick.models import NoteImage
+
+    rows = NoteImage.objects.values_list("id", "note_name", "image_url")
+    return NoteImageResolver(list(rows), version=version)
+
+
+def _is_fresh(resolver, version, ttl):
+    if resolver is None or resolver.version != version:
+        return False
+    return not ttl or time.monotonic() - resolver.loaded_at < ttl
+
+
+def get_note_image_resolver():
+    """프로세스 단위 리졸버 (note_images 버전이 바뀌었거나 NOTE_IMAGE_RESOLVER_TTL이 지나면 재적재)"""
+    global _resolver
+    ttl = getattr(settings, "NOTE_IMAGE_RESOLVER_TTL", 3600)
+    version = get_note_images_version()
+    resolver = _resolver
+    if _is_fresh(resolver, version, ttl):
+        return resolver
+    with _lock:
+        resolver = _resolver
+        if not _is_fresh(resolver, version, ttl):
+            resolver = _resolver = _load(version)
+    return resolver
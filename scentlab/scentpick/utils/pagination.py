@@ -0,0 +1,60 @@
+# scentpick/utils/pagination.py
+"""
+향수 목록 ajax(무한 스크롤)용 커서 페이지네이션 유틸
+
+- 커서: {"k": [brand, name, id]}(기본 정렬) 또는 {"o": offset}(검색 관련도 정렬)을 base64로 인코딩
+- 필터 시그니처: 순서/중복과 무관하게 정규화한 필터 문자열 (전체 개수/그리드 캐시 키에 사용)
+"""
+import base64
+import json
+
+CURSOR_PAGE_SIZE = 24
+
+# 결과 집합에 영향을 주는 파라미터만 시그니처에 포함 (page/cursor/ajax 제외)
+FILTER_KEYS = ("q", "brand", "size", "gender", "conc", "accord")
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """잘못된 커서는 None (첫 페이지로 처리)"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    key = payload.get("k")
+    if key is not None:
+        # 정렬 키와 비교되므로 타입까지 확인 (다르면 bisect에서 TypeError)
+        if not (
+            isinstance(key, list) and len(key) == 3
+            and isinstance(key[0], str) and isinstance(key[1], str)
+            and isinstance(key[2], int) and not isinstance(key[2], bool)
+        ):
+            return None
+        payload["k"] = tuple(key)
+    offset = payload.get("o")
+    if offset is not None and (not isinstance(offset, int) or offset < 0):
+        return None
+    return payload
+
+
+def filter_signature(params):
+    """QueryDict → 순서/중복과 무관한 필터 시그니처 문자열"""
+    parts = []
+    for key in FILTER_KEYS:
+        if key == "q":
+            values = [(params.get("q") or "").strip()]
+        else:
+            values = sorted({v.strip() for v in params.getlist(key) if v.strip()})
+        if any(values):
+            parts.append(f"{key}={'|'.join(values)}")
+    return "&".join(parts)
+
@@ -0,0 +1,68 @@
+# scentpick/utils/perfume_detail.py
+"""
+product_detail 데이터 로더: 향수 + 이전/다음 향수 id + 사용자 찜/피드백 상태를 쿼리 1회로 조회
+
+- 이웃/찜/피드백은 서브쿼리 annotate → DB가 원격이어도 왕복 1회
+- 요청 단위 메모: 조건부 GET(ETag) 계산과 뷰 렌더링이 같은 결과를 재사용
+"""
+from django.db.models import BooleanField, CharField, Exists, OuterRef, Subquery, Value
+
+
+def _detail_queryset(user):
+    from scentpick.models import Favorite, FeedbackEvent, Perfume
+
+    qs = Perfume.objects.annotate(
+        prev_id=Subquery(
+            Perfume.objects.filter(id__lt=OuterRef("pk")).order_by("-id").values("id")[:1]
+        ),
+        next_id=Subquery(
+            Perfume.objects.filter(id__gt=OuterRef("pk")).order_by("id").values("id")[:1]
+        ),
+    )
+    if user is not None and user.is_authenticated:
+        return qs.annotate(
+            is_favorite=Exists(Favorite.objects.filter(user=user, perfume=OuterRef("pk"))),
+            feedback_action=Subquery(
+                FeedbackEvent.objects.filter(
+                    user=user, perfume=OuterRef("pk"), action__in=["like", "dislike"]
+                ).order_by("id").values("action")[:1]
+            ),
+        )
+    return qs.annotate(
+        is_favorite=Value(False, output_field=BooleanField()),
+        feedback_action=Value(None, output_field=CharField()),
+    )
+
+
+def load_perfume_detail(request, perfume_id):
+    """
+    Perfume(annotate: prev_id, next_id, is_favorite, feedback_action) 또는 None
+    같은 요청 안에서는 한 번만 조회
+    """
+    memo = request.__dict__.setdefault("_perfume_detail", {})
+    if perfume_id not in memo:
+        user = getattr(request, "user", None)
+        memo[perfume_id] = _detail_queryset(user).filter(pk=perfume_id).first()
+    return memo[perfume_id]
+
+
+def load_similar_perfumes(perfume_id, limit=None):
+    """
+    build_similar_perfumes로 미리 계산한 유사 향수 (rank 순) — 쿼리 1회, 런타임 계산 없음
+    각 Perfume에 similarity(코사인) 속성 추가
+    """
+    from django.conf import settings
+    from scentpick.models import PerfumeSimilar
+
+    limit = limit or getattr(settings, "SIMILAR_PANEL_SIZE", 6)
+    rows = (
+        PerfumeSimilar.objects.filter(perfume_id=perfume_id)
+        .select_related("similar")
+        .only("score", "similar__id", "similar__brand", "similar__name", "similar__concentration")
+        .order_by("rank")[:limit]
+    )
+    similar = []
+    for row in rows:
+        row.similar.similarity = row.score
+        similar.append(row.similar)
+    return similar
@@ -0,0 +1,103 @@
+# scentpick/utils/perfume_images.py
+"""
+향수 이미지 URL / 반응형 변형(썸네일) 유틸
+
+- 원본: perfumes/{id}.jpg
+- 변형: perfumes/w{width}/{id}.{webp|jpg} (python manage.py generate_perfume_images 로 생성)
+- settings.PERFUME_IMAGE_VARIANTS가 꺼져 있으면(변형 미생성) 항상 원본 URL, srcset 없음
+"""
+import io
+
+from django.conf import settings
+
+from .image_storage import get_image_storage
+
+CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+# 화면별 기본 표시 폭(px) → src로 쓸 변형 폭 선택 기준
+CARD_WIDTH = 320
+DETAIL_WIDTH = 640
+
+
+def variants_enabled():
+    return getattr(settings, "PERFUME_IMAGE_VARIANTS", False)
+
+
+def variant_widths():
+    return tuple(getattr(settings, "PERFUME_IMAGE_WIDTHS", (160, 320, 640)))
+
+
+def variant_format():
+    return getattr(settings, "PERFUME_IMAGE_FORMAT", "webp")
+
+
+def perfume_image_key(perfume_id, width=None, fmt="jpg"):
+    if width is None:
+        return f"perfumes/{perfume_id}.jpg"
+    return f"perfumes/w{width}/{perfume_id}.{fmt}"
+
+
+def _nearest_width(width):
+    """요청 폭 이상인 가장 작은 변형 폭 (없으면 가장 큰 변형)"""
+    widths = sorted(variant_widths())
+    for w in widths:
+        if w >= width:
+            return w
+    return widths[-1]
+
+
+def perfume_image_url(perfume_id, width=None, fmt=None):
+    """표시 폭에 맞는 이미지 URL (변형 비활성/폭 미지정이면 원본)"""
+    storage = get_image_storage()
+    if width is None or not variants_enabled():
+        return storage.url(perfume_image_key(perfume_id))
+    return storage.url(perfume_image_key(perfume_id, _nearest_width(width), fmt or variant_format()))
+
+
+def perfume_srcset(perfume_id, fmt=None):
+    """'url 160w, url 320w, ...' (변형 비활성이면 빈 문자열)"""
+    if not variants_enabled():
+        return ""
+    storage = get_image_storage()
+    fmt = fmt or variant_format()
+    return ", ".join(
+        f"{storage.url(perfume_image_key(perfume_id, w, fmt))} {w}w"
+        for w in sorted(variant_widths())
+    )
+
+
+def render_variants(data, widths, formats):
+    """
+    원본 이미지 bytes → {(width, fmt): bytes}
+    원본보다 큰 폭은 업스케일하지 않고 원본 크기로 저장 (srcset이 가리키는 키는 항상 존재)
+    """
+    try:
+        from PIL import Image, ImageOps
+    except Exception as e:
+        raise RuntimeError("Pillow (PIL) is required for image processing.") from e
+
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[-1])
+        img = bg
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    out = {}
+    for width in widths:
+        if width < img.width:
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.LANCZOS)
+        else:
+            resized = img
+        for fmt in formats:
+            buf = io.BytesIO()
+            resized.save(buf, **SAVE_OPTIONS[fmt])
+            out[(width, fmt)] = buf.getvalue()
+    return out
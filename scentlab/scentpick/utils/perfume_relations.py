@@ -0,0 +1,81 @@
+# scentpick/utils/perfume_relations.py
+"""
+Perfume JSON 컬럼(main_accords / top·middle·base_notes) → PerfumeAccord / PerfumeNote 동기화
+
+- signals: Perfume 저장 시 sync_perfume_relations()
+- 관리 명령: python manage.py backfill_perfume_relations (SQL 직접 적재 후 전체 재생성)
+"""
+from django.db import transaction
+
+from .facets import parse_accords
+
+NOTE_LAYERS = (
+    ("top", "top_notes"),
+    ("middle", "middle_notes"),
+    ("base", "base_notes"),
+)
+
+
+def _unique(tokens, max_length):
+    """순서 유지 중복 제거 (예: ["오렌지", "허니", "오렌지"])"""
+    seen = set()
+    result = []
+    for token in tokens:
+        token = token[:max_length]
+        if token not in seen:
+            seen.add(token)
+            result.append(token)
+    return result
+
+
+def build_relation_rows(perfume, accord_model, note_model):
+    """Perfume 1건 → (PerfumeAccord 리스트, PerfumeNote 리스트) (저장 전 인스턴스)"""
+    accords = [
+        accord_model(perfume_id=perfume.pk, accord=accord, position=i)
+        for i, accord in enumerate(_unique(parse_accords(perfume.main_accords), 50))
+    ]
+    notes = []
+    for layer, field in NOTE_LAYERS:
+        for i, note in enumerate(_unique(parse_accords(getattr(perfume, field)), 100)):
+            notes.append(note_model(perfume_id=perfume.pk, layer=layer, note=note, position=i))
+    return accords, notes
+
+
+def sync_perfume_relations(perfume):
+    """Perfume 1건의 어코드/노트 행을 JSON 컬럼 기준으로 다시 작성"""
+    from scentpick.models import PerfumeAccord, PerfumeNote
+
+    accords, notes = build_relation_rows(perfume, PerfumeAccord, PerfumeNote)
+    with transaction.atomic():
+        PerfumeAccord.objects.filter(perfume_id=perfume.pk).delete()
+        PerfumeNote.objects.filter(perfume_id=perfume.pk).delete()
+        PerfumeAccord.objects.bulk_create(accords)
+        PerfumeNote.objects.bulk_create(notes)
+
+
+def backfill_perfume_relations(perfume_model, accord_model, note_model, batch_size=500):
+    """
+    전체 재생성. 마이그레이션(historical model)과 관리 명령에서 함께 사용하므로 모델을 인자로 받음
+    반환: (향수 수, 어코드 행 수, 노트 행 수)
+    """
+    n_perfumes = n_accords = n_notes = 0
+    with transaction.atomic():
+        accord_model.objects.all().delete()
+        note_model.objects.all().delete()
+
+        qs = perfume_model.objects.only(
+            "id", "main_accords", "top_notes", "middle_notes", "base_notes"
+        ).order_by("id")
+        accord_buf, note_buf = [], []
+        for perfume in qs.iterator(chunk_size=batch_size):
+            accords, notes = build_relation_rows(perfume, accord_model, note_model)
+            accord_buf.extend(accords)
+            note_buf.extend(notes)
+            n_perfumes += 1
+            if len(accord_buf) + len(note_buf) >= batch_size:
+                n_accords += len(accord_model.objects.bulk_create(accord_buf))
+                n_notes += len(note_model.objects.bulk_create(note_buf))
+                accord_buf, note_buf = [], []
+        n_accords += len(accord_model.objects.bulk_create(accord_buf))
+        n_notes += len(note_model.objects.bulk_create(note_buf))
+    return n_perfumes, n_accords, n_notes
@@ -0,0 +1,62 @@
+# scentpick/utils/rec_history.py
+"""
+대화 기록의 assistant 메시지 ↔ 추천 결과(RecRun / RecCandidate) 일괄 매핑 (chat, conversation_messages_api 공용)
+
+규칙(기존 메시지별 조회와 동일): assistant 메시지 시각 이전에 요청 메시지가 있는 run 중 가장 최근 run의 후보(rank 순)
+- 쿼리 2회: 대화의 run 목록(요청 메시지 시각 포함) + 선택된 run들의 후보(향수 포함)
+- 매핑은 Python에서 요청 메시지 시각 순으로 한 번 훑으며 처리
+"""
+from collections import defaultdict
+
+
+def _perfume_item(candidate):
+    return {
+        'id': candidate.perfume.id,
+        'brand': candidate.perfume.brand,
+        'name': candidate.perfume.name,
+        'rank': candidate.rank,
+        'score': candidate.score,
+    }
+
+
+def load_message_recommendations(conversation, messages):
+    """
+    messages: created_at 오름차순 Message 목록
+    → {assistant message id: [{'id', 'brand', 'name', 'rank', 'score'}, ...]} (후보가 있는 메시지만)
+    """
+    from scentpick.models import RecCandidate, RecRun
+
+    assistant = [m for m in messages if m.role == 'assistant']
+    if not assistant:
+        return {}
+
+    runs = sorted(
+        RecRun.objects.filter(conversation=conversation, request_msg__isnull=False)
+        .values_list('request_msg__created_at', 'created_at', 'id'),
+    )
+    run_for_message = {}
+    latest = None  # (created_at, id) — 지금까지 요청 시각이 지난 run 중 가장 최근
+    i = 0
+    for m in sorted(assistant, key=lambda m: m.created_at):
+        while i < len(runs) and runs[i][0] <= m.created_at:
+            latest = max(latest, runs[i][1:]) if latest else runs[i][1:]
+            i += 1
+        if latest:
+            run_for_message[m.id] = latest[1]
+    if not run_for_message:
+        return {}
+
+    by_run = defaultdict(list)
+    candidates = (
+        RecCandidate.objects.filter(run_rec_id__in=set(run_for_message.values()))
+        .select_related('perfume')
+        .only('run_rec_id', 'rank', 'score', 'perfume__id', 'perfume__brand', 'perfume__name')
+        .order_by('run_rec_id', 'rank')
+    )
+    for candidate in candidates:
+        by_run[candidate.run_rec_id].append(_perfume_item(candidate))
+    return {
+        message_id: by_run[run_id]
+        for message_id, run_id in run_for_message.items()
+        if by_run.get(run_id)
+    }
@@ -0,0 +1,52 @@
+# scentpick/utils/scores.py
+"""
+season_score / day_night_score JSON → 정렬 가능한 숫자 컬럼 값
+
+- dict({"day": 47.1, "night": 25.9}) 와 레거시 문자열('day(47.1) / night(25.9)') 모두 처리
+- Perfume.save() 와 backfill_perfume_scores 관리 명령에서 사용
+"""
+import re
+
+SEASON_KEYS = ("spring", "summer", "fall", "winter")
+DAY_NIGHT_KEYS = ("day", "night")
+
+# 점수 컬럼 이름: day_score, night_score, spring_score, ...
+SCORE_FIELDS = tuple(f"{key}_score" for key in DAY_NIGHT_KEYS + SEASON_KEYS)
+
+
+def parse_score_value(val, key):
+    """dict 또는 'key(12.3)' 형태 문자열에서 key 점수 추출 (없으면 0.0)"""
+    if val is None:
+        return 0.0
+    if isinstance(val, dict):
+        try:
+            return float(val.get(key, 0) or 0)
+        except Exception:
+            return 0.0
+    s = str(val)
+    m = re.search(rf"{key}\s*\(([\d.]+)\)", s, re.IGNORECASE)
+    return float(m.group(1)) if m else 0.0
+
+
+def score_columns(season_score, day_night_score):
+    """JSON 두 컬럼 → {"day_score": .., "night_score": .., "spring_score": .., ...}"""
+    columns = {f"{key}_score": parse_score_value(day_night_score, key) for key in DAY_NIGHT_KEYS}
+    columns.update({f"{key}_score": parse_score_value(season_score, key) for key in SEASON_KEYS})
+    return columns
+
+
+def backfill_perfume_scores(perfume_model, batch_size=500):
+    """전체 향수의 점수 컬럼 재계산 (updated_at은 건드리지 않음). 반환: 갱신 건수"""
+    updated = 0
+    batch = []
+    qs = perfume_model.objects.only("id", "season_score", "day_night_score", *SCORE_FIELDS).order_by("id")
+    for perfume in qs.iterator(chunk_size=batch_size):
+        for field, value in score_columns(perfume.season_score, perfume.day_night_score).items():
+            setattr(perfume, field, value)
+        batch.append(perfume)
+        if len(batch) >= batch_size:
+            updated += perfume_model.objects.bulk_update(batch, SCORE_FIELDS)
+            batch = []
+    if batch:
+        updated += perfume_model.objects.bulk_update(batch, SCORE_FIELDS)
+    return updated
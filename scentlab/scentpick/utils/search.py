@@ -0,0 +1,311 @@
+# scentpick/utils/search.py
+"""
+향수 목록 검색어(q)용 인메모리 BM25 역색인
+
+- 토큰화: 영문/숫자는 단어 단위, 한글은 붙여쓴 뒤 2-gram (띄어쓰기 차이 무시: "톰 포드" == "톰포드")
+- 노트는 한국어 원문 + KOREAN_TO_ENGLISH 영문명을 함께 색인 → "bergamot"으로도 검색 가능
+- 브랜드는 BRAND_ALIASES 별칭을 함께 색인 → "tom ford"로도 검색 가능
+- 필드 가중치(이름/브랜드 > 어코드 > 노트 > 설명)를 tf에 반영한 BM25 점수로 정렬
+- Perfume.updated_at 기준 증분 갱신, 삭제/대량 적재는 문서 수 비교로 감지 후 전체 재빌드
+"""
+import logging
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from .brand_aliases import distinct_brand_aliases
+from .catalog_cache import get_catalog_generation
+from .facets import parse_accords
+from .note_translations import get_english_note_name
+
+logger = logging.getLogger(__name__)
+
+# 필드별 가중치
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "brand": 3.0,
+    "accords": 2.0,
+    "notes": 1.5,
+    "description": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 질의 토큰 중 이 비율 이상이 매칭된 문서만 결과에 포함
+MIN_SHOULD_MATCH = 0.6
+# 접두어 확장(입력 중인 마지막 단어)으로 매칭된 term의 가중치
+PREFIX_WEIGHT = 0.5
+
+_HANGUL_JOIN_RE = re.compile(r"(?<=[가-힣])\s+(?=[가-힣])")
+_WORD_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+def _is_hangul(word):
+    return "가" <= word[0] <= "힣"
+
+
+def tokenize(text):
+    """검색용 토큰 리스트 (영문 단어 / 한글 2-gram)"""
+    if not text:
+        return []
+    text = _HANGUL_JOIN_RE.sub("", str(text).lower())
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        if _is_hangul(word) and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def perfume_fields(row):
+    """Perfume values() dict → 필드별 색인 텍스트"""
+    notes = []
+    for layer in ("top_notes", "middle_notes", "base_notes"):
+        for note in parse_accords(row.get(layer)):
+            notes.append(note)
+            english = get_english_note_name(note)
+            if english != note:
+                notes.append(english)
+    return {
+        "name": row.get("name") or "",
+        "brand": " ".join(distinct_brand_aliases(row.get("brand") or "")),
+        "accords": " ".join(parse_accords(row.get("main_accords"))),
+        "notes": " ".join(notes),
+        "description": row.get("description") or "",
+    }
+
+
+def keyword_q(q):
+    """기존 icontains Q-chain (폴백/벤치마크 비교용)"""
+    return (
+        Q(name__icontains=q)
+        | Q(brand__icontains=q)
+        | Q(description__icontains=q)
+        | Q(main_accords__icontains=q)
+        | Q(top_notes__icontains=q)
+        | Q(middle_notes__icontains=q)
+        | Q(base_notes__icontains=q)
+    )
+
+
+class SearchIndex:
+    """term → {perfume_id: 가중 tf} 역색인"""
+
+    SOURCE_FIELDS = (
+        "id", "brand", "name", "description",
+        "main_accords", "top_notes", "middle_notes", "base_notes", "updated_at",
+    )
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}
+        self.doc_len = {}
+        self.total_len = 0.0
+        self.last_updated_at = None
+        self._vocab = None
+        # clone() 이후 복사해 둔 posting list (None이면 전부 이 인덱스 소유)
+        self._owned = None
+
+    def clone(self):
+        """
+        검색 중인 요청이 보고 있는 인덱스를 건드리지 않도록 얕은 복사 후 수정 (copy-on-write)
+        """
+        other = SearchIndex()
+        other.postings = defaultdict(dict, self.postings)
+        other.doc_terms = dict(self.doc_terms)
+        other.doc_len = dict(self.doc_len)
+        other.total_len = self.total_len
+        other.last_updated_at = self.last_updated_at
+        other._owned = set()
+        return other
+
+    def _writable(self, term):
+        if self._owned is not None and term not in self._owned:
+            self.postings[term] = dict(self.postings.get(term, {}))
+            self._owned.add(term)
+        return self.postings[term]
+
+    # ---------- 색인 ----------
+    def add(self, pid, fields):
+        self.remove(pid)
+        tf = defaultdict(float)
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                tf[token] += weight
+        for term, freq in tf.items():
+            self._writable(term)[pid] = freq
+        self.doc_terms[pid] = tuple(tf)
+        length = sum(tf.values())
+        self.doc_len[pid] = length
+        self.total_len += length
+        self._vocab = None
+
+    def remove(self, pid):
+        terms = self.doc_terms.pop(pid, None)
+        if terms is None:
+            return
+        for term in terms:
+            if term in self.postings:
+                plist = self._writable(term)
+                plist.pop(pid, None)
+                if not plist:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(pid, 0.0)
+        self._vocab = None
+
+    def load_rows(self, rows):
+        for row in rows:
+            self.add(row["id"], perfume_fields(row))
+            updated_at = row.get("updated_at")
+            if updated_at and (self.last_updated_at is None or updated_at > self.last_updated_at):
+                self.last_updated_at = updated_at
+
+    # ---------- 질의 ----------
+    def _vocabulary(self):
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        return self._vocab
+
+    def _expand(self, token, is_last):
+        """질의 토큰 → [(term, weight)] (정확 매칭 + 접두어/한 글자 확장)"""
+        alts = []
+        if token in self.postings:
+            alts.append((token, 1.0))
+        vocab = self._vocabulary()
+        if _is_hangul(token) and len(token) == 1:
+            alts.extend((t, PREFIX_WEIGHT) for t in vocab if token in t and t != token)
+        elif is_last and len(token) >= 2:
+            i = bisect_left(vocab, token)
+            while i < len(vocab) and vocab[i].startswith(token):
+                if vocab[i] != token:
+                    alts.append((vocab[i], PREFIX_WEIGHT))
+                i += 1
+        return alts
+
+    def search(self, query, limit=None):
+        """BM25 점수 내림차순 [(perfume_id, score), ...]"""
+        tokens = tokenize(query)
+        n_docs = len(self.doc_len)
+        if not tokens or not n_docs:
+            return []
+        avgdl = self.total_len / n_docs
+
+        groups = [self._expand(tok, i == len(tokens) - 1) for i, tok in enumerate(tokens)]
+        need = max(1, math.ceil(len(groups) * MIN_SHOULD_MATCH))
+
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for alts in groups:
+            seen = set()
+            for term, qweight in alts:
+                plist = self.postings.get(term, {})
+                df = len(plist)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for pid, tf in plist.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[pid] / avgdl)
+                    scores[pid] += qweight * idf * tf * (BM25_K1 + 1) / norm
+                    seen.add(pid)
+            for pid in seen:
+                matched[pid] += 1
+
+        ranked = sorted(
+            ((pid, score) for pid, score in scores.items() if matched[pid] >= need),
+            key=lambda x: (-x[1], x[0]),
+        )
+        return ranked[:limit] if limit else ranked
+
+
+_index = None
+_checked_at = 0.0
+_dirty = False
+_generation = None
+_lock = threading.Lock()
+
+
+def _build():
+    from scentpick.models import Perfume
+
+    index = SearchIndex()
+    index.load_rows(Perfume.objects.values(*SearchIndex.SOURCE_FIELDS).iterator())
+    return index
+
+
+def _refresh(index):
+    """
+    updated_at 이후 변경분만 복사본에 재색인해서 반환.
+    삭제/대량 적재(updated_at 없이 들어온 행)가 감지되면 None 반환 → 전체 재빌드
+    """
+    from scentpick.models import Perfume
+
+    qs = Perfume.objects.values(*SearchIndex.SOURCE_FIELDS)
+    if index.last_updated_at is not None:
+        qs = qs.filter(updated_at__gt=index.last_updated_at)
+    rows = list(qs)
+    if rows:
+        index = index.clone()
+        index.load_rows(rows)
+    if Perfume.objects.count() != len(index.doc_len):
+        return None
+    return index
+
+
+def get_search_index():
+    """
+    프로세스 단위 검색 인덱스
+    SEARCH_INDEX_REFRESH초 간격 또는 카탈로그 세대가 바뀌었을 때 증분 갱신
+    """
+    global _index, _checked_at, _dirty, _generation
+    interval = getattr(settings, "SEARCH_INDEX_REFRESH", 30)
+    generation = get_catalog_generation()
+    now = time.monotonic()
+    stale = _dirty or generation != _generation or now - _checked_at >= interval
+    if _index is not None and not stale:
+        return _index
+    with _lock:
+        if _index is None:
+            _index = _build()
+        elif stale:
+            _index = _refresh(_index) or _build()
+        _checked_at = time.monotonic()
+        _dirty = False
+        _generation = generation
+    return _index
+
+
+def mark_search_index_dirty():
+    """Perfume 저장 시 호출 → 다음 조회에서 증분 갱신"""
+    global _dirty
+    _dirty = True
+
+
+def remove_from_search_index(pid):
+    """Perfume 삭제 시 호출"""
+    global _index
+    with _lock:
+        if _index is not None and pid in _index.doc_len:
+            index = _index.clone()
+            index.remove(pid)
+            _index = index
+
+
+def search_perfume_ids(q):
+    """
+    검색어 → (id 리스트, 관련도 정렬 여부)
+    CATALOG_SEARCH_BACKEND="bm25"(기본)면 BM25 순위, 실패하거나 "icontains"면 기존 Q-chain
+    """
+    from scentpick.models import Perfume
+
+    if getattr(settings, "CATALOG_SEARCH_BACKEND", "bm25") == "bm25":
+        try:
+            return [pid for pid, _ in get_search_index().search(q)], True
+        except Exception:
+            logger.exception("BM25 search failed, falling back to icontains")
+    return list(Perfume.objects.filter(keyword_q(q)).values_list("id", flat=True)), False
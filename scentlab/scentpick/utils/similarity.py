@@ -0,0 +1,110 @@
+# scentpick/utils/similarity.py
+"""
+유사 향수 Top-K (오프라인 계산, python manage.py build_similar_perfumes)
+
+- 벡터: notes_score(0~100) / main_accords multi-hot / season_score(4계절) 블록을 각각 L2 정규화 후
+  가중치(sqrt)를 곱해 이어 붙이고 다시 L2 정규화 → 내적 = 가중 코사인 유사도
+- 배치 행렬곱(batch × n)으로 전체 카탈로그 Top-K, argpartition으로 정렬 비용 최소화
+- 같은 브랜드의 거의 같은 벡터(세트/리필/벌크 상품)는 같은 향으로 보고 제외 / 한 번만
+"""
+from django.db import transaction
+
+from .scores import SEASON_KEYS
+
+BLOCK_WEIGHTS = {
+    "notes": 0.5,
+    "accords": 0.35,
+    "season": 0.15,
+}
+# 같은 브랜드에서 이 값 이상이면 같은 향(구성만 다른 상품)으로 간주
+DUPLICATE_COSINE = 0.995
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except Exception as e:
+        raise RuntimeError("numpy 패키지 필요: pip install numpy") from e
+    return np
+
+
+def _l2_normalize(np, block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return np.divide(block, norms, out=np.zeros_like(block), where=norms > 0)
+
+
+def perfume_vectors(arrays, score_fields, weights=None):
+    """build_snapshot_arrays() / CatalogSnapshot 배열 → float32 [n, d] 단위 벡터"""
+    np = _numpy()
+    weights = weights or BLOCK_WEIGHTS
+    season_cols = [score_fields.index(f"{key}_score") for key in SEASON_KEYS]
+    blocks = {
+        "notes": np.asarray(arrays["note_scores"], dtype=np.float32) / 100.0,
+        "accords": np.asarray(arrays["accords"], dtype=np.float32),
+        "season": np.asarray(arrays["scores"], dtype=np.float32)[:, season_cols] / 100.0,
+    }
+    parts = [
+        _l2_normalize(np, block) * np.float32(weights[name] ** 0.5)
+        for name, block in blocks.items()
+    ]
+    return _l2_normalize(np, np.hstack(parts).astype(np.float32))
+
+
+def top_k_neighbours(vectors, ids, brand_codes, k=12, batch_size=256):
+    """
+    → [(perfume_id, [(similar_id, score), ...]), ...]  (score 내림차순, 자기 자신/같은 향 제외)
+    """
+    np = _numpy()
+    n = len(ids)
+    ids = np.asarray(ids)
+    brand_codes = np.asarray(brand_codes)
+    # 같은 향 제외분 여유
+    pool = min(n - 1, k * 3) if n > 1 else 0
+    result = []
+    for start in range(0, n, batch_size):
+        sims = vectors[start:start + batch_size] @ vectors.T
+        rows = np.arange(sims.shape[0])
+        sims[rows, start + rows] = -np.inf
+        if pool <= 0:
+            result.extend((int(ids[start + r]), []) for r in rows)
+            continue
+        cand = np.argpartition(-sims, pool - 1, axis=1)[:, :pool]
+        cand_scores = np.take_along_axis(sims, cand, axis=1)
+        order = np.argsort(-cand_scores, axis=1, kind="stable")
+        cand = np.take_along_axis(cand, order, axis=1)
+        cand_scores = np.take_along_axis(cand_scores, order, axis=1)
+        for r in rows:
+            i = start + r
+            picked, picked_rows = [], []
+            for j, score in zip(cand[r], cand_scores[r]):
+                if not np.isfinite(score) or score <= 0:
+                    break
+                if brand_codes[j] == brand_codes[i] and score >= DUPLICATE_COSINE:
+                    continue
+                # 이미 고른 향수와 같은 향(벌크/세트 상품)이면 한 번만
+                if any(
+                    brand_codes[p] == brand_codes[j] and float(vectors[p] @ vectors[j]) >= DUPLICATE_COSINE
+                    for p in picked_rows
+                ):
+                    continue
+                picked.append((int(ids[j]), float(score)))
+                picked_rows.append(j)
+                if len(picked) == k:
+                    break
+            result.append((int(ids[i]), picked))
+    return result
+
+
+def store_similar_perfumes(neighbours, batch_size=1000):
+    """perfume_similar 전체 교체. 반환: 저장 행 수"""
+    from scentpick.models import PerfumeSimilar
+
+    objs = [
+        PerfumeSimilar(perfume_id=pid, similar_id=sid, rank=rank, score=score)
+        for pid, picked in neighbours
+        for rank, (sid, score) in enumerate(picked, start=1)
+    ]
+    with transaction.atomic():
+        PerfumeSimilar.objects.all().delete()
+        PerfumeSimilar.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
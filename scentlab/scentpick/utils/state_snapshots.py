@@ -0,0 +1,184 @@
+# scentpick/utils/state_snapshots.py
+"""
+LangGraph state 스냅샷 압축 보관: messages.state(JSON) → message_states 사이드 테이블
+
+- FastAPI(chatbot.py)는 지금처럼 messages.state에 전체 JSON을 INSERT → 압축 작업이 사이드 테이블로 옮기고 state를 NULL로
+  (chat_stream_api 완료 직후 해당 대화, 나머지는 compact_message_states 명령 / 0011 마이그레이션)
+- 형식: 압축 JSON(zlib) — 대화 안 직전 스냅샷 대비 delta, MESSAGE_STATE_KEYFRAME_INTERVAL개마다 전체(keyframe)
+  delta: 바뀐 dict 키만 / 리스트가 앞부분을 그대로 두고 늘어나면 추가분만 (messages 누적 리스트) / 그 외는 값 통째로
+  delta가 전체 압축보다 크면 전체로 저장
+- 복원: base_seq(keyframe) ~ seq 행을 한 번에 읽어 순서대로 적용 → 읽기 쿼리 1회, 적용 횟수 ≤ keyframe 간격
+- messages 목록 쿼리는 state가 NULL이라 defer하지 않아도 행이 작음, 필요할 때만 Message.get_state()
+"""
+import json
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+FULL = "full"
+DELTA = "delta"
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def pack(obj):
+    return zlib.compress(_dumps(obj), getattr(settings, "MESSAGE_STATE_COMPRESS_LEVEL", 6))
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def diff(prev, cur):
+    """prev → cur 변경 연산 (같으면 None)
+    {"v": 값} 통째로 교체 / {"+": [...]} 리스트 뒤에 추가 / {"k": {키: 연산}, "x": [삭제 키]} dict 부분 변경
+    """
+    if prev == cur:
+        return None
+    if isinstance(prev, dict) and isinstance(cur, dict):
+        changed = {}
+        for key, value in cur.items():
+            if key not in prev:
+                changed[key] = {"v": value}
+            else:
+                op = diff(prev[key], value)
+                if op is not None:
+                    changed[key] = op
+        op = {"k": changed}
+        removed = [key for key in prev if key not in cur]
+        if removed:
+            op["x"] = removed
+        return op
+    if isinstance(prev, list) and isinstance(cur, list) and prev and cur[:len(prev)] == prev:
+        return {"+": cur[len(prev):]}
+    return {"v": cur}
+
+
+def patch(prev, op):
+    if op is None:
+        return prev
+    if "v" in op:
+        return op["v"]
+    if "+" in op:
+        return prev + op["+"]
+    cur = dict(prev)
+    for key, sub in op["k"].items():
+        cur[key] = patch(cur.get(key), sub)
+    for key in op.get("x", ()):
+        cur.pop(key, None)
+    return cur
+
+
+def encode_snapshot(prev, state, since_keyframe):
+    """→ (codec, 압축 바이트). prev: 직전 스냅샷(없으면 None), since_keyframe: 직전 스냅샷의 keyframe 이후 개수"""
+    full = pack(state)
+    if prev is None or since_keyframe + 1 >= getattr(settings, "MESSAGE_STATE_KEYFRAME_INTERVAL", 20):
+        return FULL, full
+    delta = pack(diff(prev, state))
+    return (DELTA, delta) if len(delta) < len(full) else (FULL, full)
+
+
+def decode_chain(rows):
+    """[(codec, data), ...] (keyframe부터 seq 순) → 마지막 스냅샷"""
+    state = None
+    for codec, data in rows:
+        state = unpack(data) if codec == FULL else patch(state, unpack(data))
+    return state
+
+
+def _chain_rows(state_model, conversation_id, base_seq, seq):
+    return (
+        state_model.objects.filter(conversation_id=conversation_id, seq__gte=base_seq, seq__lte=seq)
+        .order_by("seq").values_list("codec", "data")
+    )
+
+
+def compact_conversation(message_model, state_model, conversation_id):
+    """대화의 messages.state를 사이드 테이블로 옮김 (created_at, id 순으로 이어서 delta). 반환: 옮긴 메시지 수"""
+    pending = list(
+        message_model.objects.filter(conversation_id=conversation_id, state__isnull=False, compact_state__isnull=True)
+        .order_by("created_at", "id").values_list("id", "state")
+    )
+    if not pending:
+        return 0
+    try:
+        with transaction.atomic():
+            last = state_model.objects.filter(conversation_id=conversation_id).order_by("-seq").first()
+            if last is None:
+                prev, seq, base_seq = None, -1, 0
+            else:
+                prev = decode_chain(_chain_rows(state_model, conversation_id, last.base_seq, last.seq))
+                seq, base_seq = last.seq, last.base_seq
+            rows = []
+            for message_id, state in pending:
+                seq += 1
+                codec, data = encode_snapshot(prev, state, seq - 1 - base_seq)
+                if codec == FULL:
+                    base_seq = seq
+                rows.append(state_model(
+                    message_id=message_id, conversation_id=conversation_id, seq=seq, base_seq=base_seq,
+                    codec=codec, data=data, raw_size=len(_dumps(state)),
+                ))
+                prev = state
+            state_model.objects.bulk_create(rows)
+            message_model.objects.filter(id__in=[message_id for message_id, _ in pending]).update(state=None)
+    except IntegrityError:
+        return 0  # 다른 작업이 같은 대화를 먼저 옮김 — 다음 실행에서 이어서
+    return len(pending)
+
+
+def compact(conversation_id):
+    """chat_stream_api 완료 후 해당 대화만"""
+    from scentpick.models import Message, MessageState
+
+    return compact_conversation(Message, MessageState, conversation_id)
+
+
+def compact_all(message_model, state_model):
+    """state가 남아 있는 모든 대화 압축. 반환: (대화 수, 메시지 수)"""
+    conversation_ids = list(
+        message_model.objects.filter(state__isnull=False).values_list("conversation_id", flat=True)
+        .distinct().order_by("conversation_id")
+    )
+    conversations = moved = 0
+    for conversation_id in conversation_ids:
+        moved += compact_conversation(message_model, state_model, conversation_id)
+        conversations += 1
+    return conversations, moved
+
+
+def restore_all(message_model, state_model):
+    """사이드 테이블 → messages.state 되돌리기 (마이그레이션 역방향). 반환: 복원한 메시지 수"""
+    restored = 0
+    conversation_ids = state_model.objects.values_list("conversation_id", flat=True).distinct()
+    for conversation_id in list(conversation_ids):
+        for message_id, state in load_conversation_states(state_model, conversation_id).items():
+            restored += message_model.objects.filter(id=message_id, state__isnull=True).update(state=state)
+        state_model.objects.filter(conversation_id=conversation_id).delete()
+    return restored
+
+
+def load_state(message_id):
+    """메시지의 LangGraph state (messages.state → message_states 순) 또는 None"""
+    from scentpick.models import Message, MessageState
+
+    state = Message.objects.filter(pk=message_id).values_list("state", flat=True).first()
+    if state is not None:
+        return state
+    row = MessageState.objects.filter(message_id=message_id).values("conversation_id", "base_seq", "seq").first()
+    if row is None:
+        return None
+    return decode_chain(_chain_rows(MessageState, row["conversation_id"], row["base_seq"], row["seq"]))
+
+
+def load_conversation_states(state_model, conversation_id):
+    """대화의 압축 스냅샷 전부 → {message_id: state} (행을 한 번 읽어 순서대로 복원)"""
+    states, prev = {}, None
+    rows = state_model.objects.filter(conversation_id=conversation_id).order_by("seq").values_list("message_id", "codec", "data")
+    for message_id, codec, data in rows:
+        prev = unpack(data) if codec == FULL else patch(prev, unpack(data))
+        states[message_id] = prev
+    return states
@@ -0,0 +1,132 @@
+# scentpick/utils/stream_resume.py
+"""
+chat_stream_api 이어받기 — 이벤트 id + 스트림별 링 버퍼 (워커 프로세스 메모리)
+
+- 새 스트림마다 stream_id 발급, FastAPI 중계(producer)는 클라이언트 연결과 분리된 태스크에서 실행
+  → 프레임을 링 버퍼(CHAT_STREAM_BUFFER_SIZE)에 쌓고, 클라이언트는 버퍼를 따라 읽음
+- 각 프레임에 "id: <stream_id>:<seq>" 부여 (seq는 0부터 1씩 증가)
+- 재연결: Last-Event-ID 헤더(또는 last_event_id 폼 필드) → 같은 스트림의 seq 이후 프레임만 재전송하고
+  이어서 실시간 수신, FastAPI/LLM 재호출 없음
+- 읽는 쪽이 모두 끊긴 채 CHAT_STREAM_ORPHAN_TIMEOUT초가 지나면 producer 취소 → 업스트림 요청 종료
+- 끝난 스트림은 CHAT_STREAM_RESUME_TTL초 동안 보관 후 정리
+- 버퍼가 프로세스 메모리에 있으므로 재연결이 다른 워커로 가면 이어받기 불가 → {"resumable": false} 프레임
+"""
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+
+from .chat_stream import sse_frame
+
+logger = logging.getLogger(__name__)
+
+_streams = {}
+
+
+class ChatStream:
+    def __init__(self, user_id, key=None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.key = key  # 멱등성 키 (utils/idempotency.py)
+        self.frames = deque(maxlen=getattr(settings, "CHAT_STREAM_BUFFER_SIZE", 4096))  # (seq, frame)
+        self.next_seq = 0
+        self.done = False
+        self.expires_at = None
+        self.readers = 0
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def append(self, frame):
+        self.frames.append((self.next_seq, frame))
+        self.next_seq += 1
+        self._notify()
+
+    def finish(self):
+        self.done = True
+        self.expires_at = time.monotonic() + getattr(settings, "CHAT_STREAM_RESUME_TTL", 120)
+        self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def produce(self, frames):
+        try:
+            async for frame in frames:
+                self.append(frame)
+        except asyncio.CancelledError:
+            logger.info("chat stream %s has no readers, cancelling upstream", self.id)
+            raise
+        except Exception:
+            logger.exception("chat stream %s producer failed", self.id)
+            self.append(sse_frame({"error": "서버 오류: 스트림이 중단되었습니다."}))
+        finally:
+            self.finish()
+
+    async def follow(self, after=-1):
+        """seq > after 프레임을 "id:" 줄을 붙여 순서대로 생성, 스트림이 끝나면 종료"""
+        self.readers += 1
+        try:
+            while True:
+                changed = self._changed
+                first = self.frames[0][0] if self.frames else self.next_seq
+                if after + 1 < first:
+                    # 링 버퍼에서 이미 밀려난 구간
+                    yield sse_frame({"error": "이어받을 수 없는 응답입니다. 다시 질문해 주세요.", "resumable": False})
+                    return
+                pending = list(itertools.islice(self.frames, after + 1 - first, None))
+                for seq, frame in pending:
+                    yield f"id: {self.id}:{seq}\n{frame}"
+                    after = seq
+                if self.done and after + 1 >= self.next_seq:
+                    return
+                if not pending:
+                    await changed.wait()
+        finally:
+            self.readers -= 1
+            if not self.readers and not self.done and self.task:
+                asyncio.get_running_loop().call_later(
+                    getattr(settings, "CHAT_STREAM_ORPHAN_TIMEOUT", 15), self._cancel_if_orphaned,
+                )
+
+    def _cancel_if_orphaned(self):
+        if not self.readers and not self.done:
+            self.task.cancel()
+
+
+def _purge_expired():
+    now = time.monotonic()
+    for stream_id in [sid for sid, s in _streams.items() if s.expires_at and s.expires_at < now]:
+        del _streams[stream_id]
+
+
+def start_stream(user_id, frames, key=None):
+    """frames(SSE 프레임 async iterator)를 백그라운드에서 버퍼에 쌓기 시작 → ChatStream"""
+    _purge_expired()
+    stream = ChatStream(user_id, key)
+    _streams[stream.id] = stream
+    stream.task = asyncio.ensure_future(stream.produce(frames))
+    return stream
+
+
+def find_stream(last_event_id, user_id):
+    """Last-Event-ID("<stream_id>:<seq>") → (ChatStream, seq) 또는 (None, None) — 다른 사용자의 스트림은 무시"""
+    stream_id, _, seq = (last_event_id or "").strip().partition(":")
+    stream = _streams.get(stream_id)
+    if stream is None or stream.user_id != user_id or not seq.isdigit():
+        return None, None
+    if stream.expires_at and stream.expires_at < time.monotonic():
+        return None, None
+    return stream, int(seq)
+
+
+def find_stream_by_key(key, user_id):
+    """같은 멱등성 키로 이 워커에서 아직 진행 중인 스트림 → ChatStream 또는 None (끝난 결과는 idempotency 캐시/DB에서)"""
+    for stream in _streams.values():
+        if stream.key == key and stream.user_id == user_id and not stream.done:
+            return stream
+    return None
@@ -0,0 +1,173 @@
+# scentpick/utils/suggest.py
+"""
+향수 검색창 자동완성(/api/perfumes/suggest)용 인메모리 접두어 인덱스
+
+- 키: 정규화(소문자/공백·기호 제거)한 브랜드 별칭, 향수 이름(단어 시작 위치별), 브랜드 별칭 + 이름
+  → "tom ford", "톰포드", "톰 포드", "포드 오드" 모두 같은 키 공간에서 접두어 매칭
+- 짧은 접두어(PREFIX_CACHE_LEN 글자 이하)는 상위 결과를 미리 계산한 dict 조회 (O(1))
+  그보다 긴 접두어는 정렬된 키 배열에서 bisect 범위 탐색
+- 정렬: 브랜드 → 향수, 각각 인기도(찜/좋아요/조회 카운터 + 추천 노출) 내림차순
+- 카탈로그 세대가 바뀌거나 SUGGEST_INDEX_TTL이 지나면 재빌드 (인기도는 TTL 주기로 반영)
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from .brand_aliases import distinct_brand_aliases, normalize_name
+from .catalog_cache import get_catalog_generation
+from .counters import perfume_counts_table
+
+SUGGEST_MAX_LIMIT = 20
+PREFIX_CACHE_LEN = 4
+# 이름이 길면 앞쪽 몇 단어부터 시작하는 키만 생성
+MAX_NAME_WORDS = 8
+
+POPULARITY_WEIGHTS = {
+    "favorite": 3.0,
+    "like": 2.0,
+    "dislike": -1.0,
+    "view": 0.05,
+    "recommended": 0.5,
+}
+
+
+def perfume_popularity():
+    """perfume_id → 인기도 점수 (인기도 카운터 + 추천 후보 노출 집계)"""
+    from scentpick.models import RecCandidate
+
+    scores = defaultdict(float)
+    for perfume_id, counts in perfume_counts_table().items():
+        scores[perfume_id] += sum(POPULARITY_WEIGHTS[field] * n for field, n in counts.items())
+    for row in RecCandidate.objects.values("perfume_id").annotate(n=Count("id")):
+        scores[row["perfume_id"]] += POPULARITY_WEIGHTS["recommended"] * row["n"]
+    return scores
+
+
+def _name_keys(name):
+    """이름의 각 단어 시작 위치부터의 정규화 키 ("오 드 우드" → "오드우드", "드우드", "우드")"""
+    words = str(name or "").split()[:MAX_NAME_WORDS]
+    keys = []
+    for i in range(len(words)):
+        key = normalize_name(" ".join(words[i:]))
+        if key:
+            keys.append(key)
+    return keys
+
+
+class SuggestIndex:
+    """정규화 키 → 항목(브랜드/향수) 접두어 인덱스"""
+
+    def __init__(self, rows, popularity=None, generation=None):
+        """
+        rows: (id, brand, name) 이터러블
+        popularity: perfume_id → 점수 (브랜드 점수는 소속 향수 합)
+        """
+        popularity = popularity or {}
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+        self.entries = []
+        brand_entry = {}
+        brand_count = defaultdict(int)
+        brand_score = defaultdict(float)
+        perfumes = []
+        for pid, brand, name in rows:
+            brand = brand or ""
+            perfumes.append((pid, brand, name or ""))
+            brand_count[brand] += 1
+            brand_score[brand] += popularity.get(pid, 0.0)
+
+        # 항목별 정렬 키: (브랜드 0 / 향수 1, -인기도, 표시 이름)
+        rank = []
+        key_refs = set()
+        for brand in sorted(brand_count):
+            if not brand:
+                continue
+            idx = len(self.entries)
+            brand_entry[brand] = idx
+            self.entries.append({"type": "brand", "brand": brand, "count": brand_count[brand]})
+            rank.append((0, -brand_score[brand], brand))
+            for alias in distinct_brand_aliases(brand):
+                key_refs.add((normalize_name(alias), idx))
+
+        for pid, brand, name in perfumes:
+            idx = len(self.entries)
+            self.entries.append({"type": "perfume", "id": pid, "brand": brand, "name": name})
+            rank.append((1, -popularity.get(pid, 0.0), brand, name, pid))
+            name_keys = _name_keys(name)
+            for key in name_keys:
+                key_refs.add((key, idx))
+            if name_keys:
+                for alias in distinct_brand_aliases(brand):
+                    key_refs.add((normalize_name(alias) + name_keys[0], idx))
+
+        # 항목 번호를 인기도 순으로 재배치 → 번호 오름차순 = 결과 순서
+        order = sorted(range(len(self.entries)), key=rank.__getitem__)
+        renumber = {old: new for new, old in enumerate(order)}
+        self.entries = [self.entries[old] for old in order]
+
+        pairs = sorted((key, renumber[idx]) for key, idx in key_refs if key)
+        self.keys = [key for key, _ in pairs]
+        self.refs = [idx for _, idx in pairs]
+
+        buckets = defaultdict(set)
+        for key, idx in pairs:
+            for n in range(1, min(len(key), PREFIX_CACHE_LEN) + 1):
+                buckets[key[:n]].add(idx)
+        self.top = {
+            prefix: tuple(sorted(idxs)[:SUGGEST_MAX_LIMIT])
+            for prefix, idxs in buckets.items()
+        }
+
+    def suggest(self, query, limit=8):
+        """검색어 → 항목 dict 리스트 (브랜드 먼저, 인기도 순)"""
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+        if len(prefix) <= PREFIX_CACHE_LEN:
+            idxs = self.top.get(prefix, ())
+        else:
+            found = set()
+            i = bisect_left(self.keys, prefix)
+            while i < len(self.keys) and self.keys[i].startswith(prefix):
+                found.add(self.refs[i])
+                i += 1
+            idxs = sorted(found)
+        return [self.entries[idx] for idx in idxs[:limit]]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _build(generation):
+    from scentpick.models import Perfume
+
+    rows = Perfume.objects.values_list("id", "brand", "name")
+    return SuggestIndex(rows.iterator(), perfume_popularity(), generation=generation)
+
+
+def _is_fresh(index, generation, ttl):
+    if index is None or index.generation != generation:
+        return False
+    return not ttl or time.monotonic() - index.built_at < ttl
+
+
+def get_suggest_index():
+    """프로세스 단위 자동완성 인덱스 (카탈로그 세대가 바뀌었거나 TTL이 지나면 재빌드)"""
+    global _index
+    ttl = getattr(settings, "SUGGEST_INDEX_TTL", 600)
+    generation = get_catalog_generation()
+    index = _index
+    if _is_fresh(index, generation, ttl):
+        return index
+    with _lock:
+        index = _index
+        if not _is_fresh(index, generation, ttl):
+            index = _index = _build(generation)
+    return index
@@ -1,58 +1,76 @@
 # --- Python 표준 라이브러리 ---
+import asyncio
 import os
 import uuid
 import json
 import re
 import random
+import time
 import imghdr
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 # --- 외부 라이브러리 ---
 import requests
-import boto3
+import httpx
 
 # --- Django 기본 ---
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
 from django.db.models import Q, Count, Max  # yyh : Count, Max 추가
-from django.http import JsonResponse, StreamingHttpResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_POST, require_GET
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.cache import never_cache
+from django.views.decorators.cache import cache_control, never_cache
 
 
 # --- 프로젝트 내부 (app) ---
 from .models import (
     Perfume,
+    PerfumeAccord,
     Favorite,
     FeedbackEvent,
-    NoteImage,
     Conversation,
     Message,
-    RecRun,
     RecCandidate,
 )
 from uauth.models import UserDetail
 from uauth.utils import process_profile_image, upload_to_s3_and_get_url
 
 from .utils.note_translations import get_korean_note_name, get_english_note_name
-
-# S3 클라이언트 전역 설정
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION,
+from .utils.note_images import get_note_image_resolver
+from .utils.perfume_detail import load_perfume_detail, load_similar_perfumes
+from .utils.message_history import message_history_page, parse_history_params
+from .utils.conversation_summary import sidebar_page, sidebar_title
+from .utils.chat_backend import backend_stats, post_json
+from .utils.chat_images import submit_chat_image
+from .utils.chat_stream import iterate_in_background, relay_sse, sse_frame
+from .utils.stream_resume import find_stream, find_stream_by_key, start_stream
+from .utils import answer_cache, idempotency, state_snapshots
+from .utils.facets import get_facet_index
+from .utils.search import search_perfume_ids
+from .utils.suggest import get_suggest_index
+from .utils.counters import get_user_counts, record_perfume_view
+from .utils.perfume_images import CARD_WIDTH, DETAIL_WIDTH, perfume_image_url, perfume_srcset
+from .utils.pagination import CURSOR_PAGE_SIZE, decode_cursor, encode_cursor
+from .utils.conditional import perfumes_etag, product_detail_etag, product_detail_last_modified, shared_condition
+from .utils.catalog_cache import (
+    get_cached_grid,
+    grid_cache_key,
+    set_cached_grid,
 )
 
+
 def home(request):
     return render(request, "scentpick/home.html")
 
@@ -67,15 +85,15 @@ def chat(request):
     """
     Chat 페이지: conversations DB에서 대화 목록과 메시지들을 읽어서 표시
     """
-    # 전체 대화 목록 (프론트에서 스크롤로 제한)
-    recent_conversations = Conversation.objects.filter(
-        user=request.user
-    ).order_by('-updated_at')
+    # 사이드바 첫 페이지 (이후는 conversations_api 커서로 스크롤 로드)
+    recent_conversations, conversations_cursor = sidebar_page(request.user)
     
     # 현재 선택된 대화 ID (세션 또는 GET 파라미터에서)
     current_conversation_id = request.GET.get('conversation_id') or request.session.get('conversation_id')
     current_conversation = None
     messages = []
+    history_has_more = False
+    history_before = None
     
     if current_conversation_id:
         try:
@@ -83,44 +101,11 @@ def chat(request):
                 id=current_conversation_id, 
                 user=request.user
             )
-            # 해당 대화의 메시지들 가져오기 (추천 데이터 포함)
-            messages_raw = current_conversation.messages.order_by('created_at')
-            messages = []
-            
-            for m in messages_raw:
-                message_data = {
-                    'role': m.role,
-                    'content': m.content,
-                    'created_at': m.created_at,
-                    'chat_image': getattr(m, 'chat_image', None),  # 안전한 이미지 URL 접근
-                    'perfume_list': []
-                }
-                
-                # assistant 메시지인 경우 관련된 추천 데이터 찾기
-                if m.role == 'assistant':
-                    rec_runs = RecRun.objects.filter(
-                        conversation=current_conversation,
-                        request_msg__created_at__lte=m.created_at
-                    ).order_by('-created_at')
-                    
-                    if rec_runs.exists():
-                        latest_run = rec_runs.first()
-                        candidates = latest_run.candidates.select_related('perfume').order_by('rank')
-                        
-                        perfume_list = []
-                        for candidate in candidates:
-                            perfume_list.append({
-                                'id': candidate.perfume.id,
-                                'brand': candidate.perfume.brand,
-                                'name': candidate.perfume.name,
-                                'rank': candidate.rank,
-                                'score': candidate.score
-                            })
-                        
-                        if perfume_list:
-                            message_data['perfume_list'] = perfume_list
-                
-                messages.append(message_data)
+            # 최근 메시지 한 페이지만 (이전 메시지는 chat.html에서 before 커서로 추가 로드)
+            history = message_history_page(current_conversation)
+            messages = history["items"]
+            history_has_more = history["has_more"]
+            history_before = history["before"]
             
             # 세션에 저장
             request.session['conversation_id'] = current_conversation.id
@@ -130,13 +115,18 @@ def chat(request):
     
     return render(request, "scentpick/chat.html", {
         "recent_conversations": recent_conversations,
+        "conversations_cursor": conversations_cursor,
         "current_conversation": current_conversation,
         "current_conversation_id": current_conversation_id,
         "chat_messages": json.dumps(messages, default=str, ensure_ascii=False),  # JSON으로 직렬화
+        "history_has_more": history_has_more,
+        "history_before": history_before,
         "SERVICE_TOKEN": SERVICE_TOKEN,
     })
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@shared_condition(etag_func=perfumes_etag)
 def perfumes(request):
     q = (request.GET.get("q") or "").strip()
     brand_sel = request.GET.getlist("brand")
@@ -145,59 +135,50 @@ def perfumes(request):
     conc_sel = request.GET.getlist("conc")
     accord_sel = request.GET.getlist("accord")
 
-    qs = Perfume.objects.all()
+    # 사이드바 옵션/필터/개수는 인메모리 패싯 인덱스에서 처리 (DB 조회 없음)
+    index = get_facet_index()
 
+    # ajax 그리드 조각은 (정규화된 필터 + page/cursor, 카탈로그 세대) 키로 캐시
+    grid_key = None
+    if request.GET.get("ajax") == "1":
+        grid_key = grid_cache_key(request.GET, index.generation)
+        html = get_cached_grid(grid_key)
+        if html is not None:
+            return HttpResponse(html)
+    selection = {
+        "brand": brand_sel,
+        "gender": gender_sel,
+        "conc": conc_sel,
+        "accord": accord_sel,
+        "size": size_sel,
+    }
+
+    restrict = None
+    ranked_ids = None
     if q:
-        qs = qs.filter(
-            Q(name__icontains=q)
-            | Q(brand__icontains=q)
-            | Q(description__icontains=q)
-            | Q(main_accords__icontains=q)
-            | Q(top_notes__icontains=q)
-            | Q(middle_notes__icontains=q)
-            | Q(base_notes__icontains=q)
-        )
+        q_ids, is_ranked = search_perfume_ids(q)
+        restrict = index.mask_for_ids(q_ids)
+        if is_ranked:
+            ranked_ids = q_ids
+
+    # ajax 무한 스크롤: cursor 파라미터가 있으면 keyset 페이지네이션 (사이드바/페이지 번호 계산 생략)
+    if request.GET.get("ajax") == "1" and "cursor" in request.GET:
+        result_mask, _ = index.search(selection, restrict=restrict, with_counts=False)
+        response = _perfumes_cursor_page(request, index, result_mask, ranked_ids)
+        set_cached_grid(grid_key, response.content)
+        return response
 
-    if brand_sel:
-        qs = qs.filter(brand__in=brand_sel)
+    result_mask, facet_counts = index.search(selection, restrict=restrict)
 
-    if size_sel:
-        size_q = Q()
-        for s in size_sel:
-            try:
-                s_int = int(s)
-                size_q |= Q(sizes__contains=s_int)
-            except ValueError:
-                pass
-        if size_q:
-            qs = qs.filter(size_q)
-
-    if gender_sel:
-        gq = Q()
-        for g in gender_sel:
-            gq |= Q(gender__iexact=g)
-        if gq:
-            qs = qs.filter(gq)
-
-    if conc_sel:
-        cq = Q()
-        for c in conc_sel:
-            cq |= Q(concentration__icontains=c)
-        if cq:
-            qs = qs.filter(cq)
-
-    if accord_sel:
-        aq = Q()
-        for a in accord_sel:
-            aq |= Q(main_accords__icontains=a)
-        if aq:
-            qs = qs.filter(aq)
-
-    qs = qs.order_by("brand", "name")
-
-    paginator = Paginator(qs, 24)
+    # 검색어가 있으면 관련도 순, 없으면 인덱스의 brand, name 순서 그대로 페이지네이션
+    if ranked_ids is not None:
+        ordered_ids = index.ids_in(result_mask, ranked_ids)
+    else:
+        ordered_ids = index.ids_for(result_mask)
+    paginator = Paginator(ordered_ids, 24)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = _load_perfume_cards(page_obj.object_list)
 
     current = page_obj.number
     total = paginator.num_pages
@@ -213,48 +194,10 @@ def perfumes(request):
         else:
             page_range_custom = [1, "..."] + list(range(current - 2, current + 3)) + ["...", total]
 
-    for p in page_obj.object_list:
-        raw = p.main_accords or ""
-        if isinstance(raw, list):
-            toks = [str(t).strip() for t in raw]
-        elif isinstance(raw, str):
-            if "," in raw:
-                toks = [t.strip() for t in raw.split(",")]
-            else:
-                toks = [t.strip() for t in raw.split()]
-        else:
-            toks = []
-        p.accord_list = [t for t in toks if t][:6]
-        p.image_url = f"https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/{p.id}.jpg"
-
-    brands = Perfume.objects.values_list("brand", flat=True).distinct().order_by("brand")
-    concentrations = (
-        Perfume.objects.exclude(concentration="")
-        .values_list("concentration", flat=True)
-        .distinct()
-        .order_by("concentration")
-    )
-    genders = (
-        Perfume.objects.exclude(gender="")
-        .values_list("gender", flat=True)
-        .distinct()
-        .order_by("gender")
-    )
-
-    raw_accords = Perfume.objects.exclude(main_accords="").values_list("main_accords", flat=True)
-    accord_set = set()
-    for raw in raw_accords:
-        if not raw:
-            continue
-        if isinstance(raw, list):
-            parts = [str(p).strip() for p in raw if p]
-        else:
-            cleaned = str(raw).strip("[]").replace("'", "").replace('"', "")
-            parts = [p.strip() for p in cleaned.split(",") if p.strip()]
-        for p in parts:
-            if p and p not in ["/", "-", "_"]:
-                accord_set.add(p)
-    accords = sorted(accord_set)
+    brands = index.options_with_counts("brand", facet_counts)
+    concentrations = index.options_with_counts("conc", facet_counts)
+    genders = index.options_with_counts("gender", facet_counts)
+    accords = index.options("accord")
 
     base_qd = request.GET.copy()
     base_qd.pop("page", True)
@@ -267,6 +210,7 @@ def perfumes(request):
         "concentrations": concentrations,
         "genders": genders,
         "accords": accords,
+        "facet_counts": facet_counts,
         "selected": {
             "q": q,
             "brand": brand_sel,
@@ -277,11 +221,95 @@ def perfumes(request):
         "base_qs": base_qs,
     }
 
-    if request.GET.get("ajax") == "1":
-        return render(request, "scentpick/perfumes_grid.html", ctx)
-    
+    if grid_key is not None:
+        response = render(request, "scentpick/perfumes_grid.html", ctx)
+        set_cached_grid(grid_key, response.content)
+        return response
+
     return render(request, "scentpick/perfumes.html", ctx)
 
+
+def _load_perfume_cards(ids):
+    """id 순서대로 Perfume을 읽어 카드 표시용 accord_list / image_url 부여"""
+    perfume_map = Perfume.objects.in_bulk(ids)
+    cards = [perfume_map[pid] for pid in ids if pid in perfume_map]
+    for p in cards:
+        raw = p.main_accords or ""
+        if isinstance(raw, list):
+            toks = [str(t).strip() for t in raw]
+        elif isinstance(raw, str):
+            if "," in raw:
+                toks = [t.strip() for t in raw.split(",")]
+            else:
+                toks = [t.strip() for t in raw.split()]
+        else:
+            toks = []
+        p.accord_list = [t for t in toks if t][:6]
+        p.image_url = perfume_image_url(p.id, CARD_WIDTH)
+    return cards
+
+
+def _perfumes_cursor_page(request, index, result_mask, ranked_ids):
+    """
+    perfumes_grid.html 커서 모드
+    - 기본 정렬: (brand, name, id) keyset → 몇 번째 페이지든 첫 페이지와 같은 비용
+    - 검색 관련도 정렬: 순위 리스트 offset
+    - 전체 개수는 결과 비트셋의 bit_count() (캐시 왕복보다 쌈)
+    """
+    after = decode_cursor(request.GET.get("cursor"))
+    size = CURSOR_PAGE_SIZE
+
+    if ranked_ids is not None:
+        ordered_ids = index.ids_in(result_mask, ranked_ids)
+        offset = (after or {}).get("o") or 0
+        page_ids = ordered_ids[offset:offset + size]
+        has_more = offset + size < len(ordered_ids)
+        next_cursor = encode_cursor({"o": offset + size}) if has_more else ""
+    else:
+        page_ids, has_more = index.ids_after(result_mask, (after or {}).get("k"), size)
+        next_cursor = ""
+        if has_more and page_ids:
+            next_cursor = encode_cursor({"k": list(index.sort_keys[index.position[page_ids[-1]]])})
+
+    total_count = result_mask.bit_count()
+
+    base_qd = request.GET.copy()
+    for key in ("page", "cursor", "ajax"):
+        base_qd.pop(key, None)
+
+    ctx = {
+        "page_obj": _load_perfume_cards(page_ids),
+        "cursor_mode": True,
+        "is_first_page": after is None,
+        "next_cursor": next_cursor,
+        "total_count": total_count,
+        "base_qs": base_qd.urlencode(),
+    }
+    return render(request, "scentpick/perfumes_grid.html", ctx)
+
+
+@login_required
+@require_GET
+def perfume_suggest_api(request):
+    """
+    검색창 자동완성 API: ?q=톰포드&limit=8
+    브랜드(한/영 별칭 포함) → 향수 순, 각각 인기도 순
+    """
+    q = (request.GET.get("q") or "").strip()
+    try:
+        limit = int(request.GET.get("limit", 8))
+    except ValueError:
+        limit = 8
+
+    items = []
+    for entry in get_suggest_index().suggest(q, limit):
+        item = dict(entry)
+        if item["type"] == "perfume":
+            item["url"] = reverse("scentpick:product_detail", args=[item["id"]])
+            item["image_url"] = perfume_image_url(item["id"], CARD_WIDTH)
+        items.append(item)
+    return JsonResponse({"q": q, "items": items})
+
 @login_required
 def offlines(request):
     return render(request, "scentpick/offlines.html", {"KAKAO_JS_KEY": settings.KAKAO_JS_KEY})
@@ -367,10 +395,6 @@ def password_change_view(request):
     return render(request, 'scentpick/password_change.html', { 'form': form })
 
 
-# --- S3 퍼블릭 이미지 베이스 ---
-S3_BASE = "https://scentpick-images.s3.ap-northeast-2.amazonaws.com"
-
-
 # =======================
 # 날씨/추천 유틸
 # =======================
@@ -475,49 +499,26 @@ def fetch_weather_simple(city="Seoul", lat=None, lon=None):
 # DB 조회 / 이미지 URL 부여
 # =======================
 def query_perfumes_by_accords(accords, limit=8, gender=None):
-    from django.db.models import Q
-    
-    # 어코드 조건 구성
-    accord_q = Q()
-    for a in accords:
-        accord_q |= Q(main_accords__contains=[a])
-    
+    # 어코드 조건: perfume_accords(accord, perfume) 인덱스 조인
+    qs = Perfume.objects.filter(
+        id__in=PerfumeAccord.objects.filter(accord__in=accords).values("perfume_id")
+    )
+
     # 성별 조건 추가
-    def apply_gender_filter(base_query):
-        if gender and gender in ['Male', 'Female']:
-            # Male이나 Female이 요청되면 해당 성별 + Unisex 포함
-            return base_query.filter(Q(gender=gender) | Q(gender='Unisex'))
-        elif gender == 'Unisex':
-            # Unisex만 요청되면 Unisex만
-            return base_query.filter(gender='Unisex')
-        else:
-            # gender가 None이면 성별 필터링 없음
-            return base_query
-    
-    try:
-        # JSONField 방식으로 시도
-        base_qs = Perfume.objects.filter(accord_q)
-        qs = apply_gender_filter(base_qs)[:limit]
-        
-        if qs.exists():
-            return list(qs)
-    except Exception:
-        pass  # TextField(JSON 문자열) fallback
-    
-    # TextField fallback
-    accord_q = Q()
-    for a in accords:
-        accord_q |= Q(main_accords__icontains=f'"{a}"')
-    
-    base_qs = Perfume.objects.filter(accord_q)
-    qs = apply_gender_filter(base_qs)[:limit]
-    
-    return list(qs)
+    if gender and gender in ['Male', 'Female']:
+        # Male이나 Female이 요청되면 해당 성별 + Unisex 포함
+        qs = qs.filter(Q(gender=gender) | Q(gender='Unisex'))
+    elif gender == 'Unisex':
+        # Unisex만 요청되면 Unisex만
+        qs = qs.filter(gender='Unisex')
+    # gender가 None이면 성별 필터링 없음
+
+    return list(qs[:limit])
 
 def attach_image_urls(perfumes_iter):
-    """scentpick-images/perfumes/{id}.jpg 규칙으로 image_url 속성 부여"""
+    """카드 표시 폭에 맞는 image_url 속성 부여 (썸네일 변형 비활성이면 원본 perfumes/{id}.jpg)"""
     for p in perfumes_iter:
-        p.image_url = f"{S3_BASE}/perfumes/{p.id}.jpg"
+        p.image_url = perfume_image_url(p.id, CARD_WIDTH)
 
 
 # =======================
@@ -558,25 +559,12 @@ GENDER_MAP_KO2EN = {
     "남녀공용": "Unisex",
 }
 
-def parse_day_night_value(val, key):  # key: "day" or "night"
-    """day_night_score가 dict 또는 'day(47.1) / night(25.9)' 문자열 둘 다 처리"""
-    if val is None:
-        return 0.0
-    if isinstance(val, dict):
-        try:
-            return float(val.get(key, 0) or 0)
-        except Exception:
-            return 0.0
-    s = str(val)
-    m = re.search(rf"{key}\s*\(([\d.]+)\)", s, re.IGNORECASE)
-    return float(m.group(1)) if m else 0.0
-
 def filter_worldcup_candidates(gender_ko: str, accord_ko: str, time_pref: str, need=8):
     """
     성별/메인어코드/낮밤 선택으로 Perfume 후보 8개 뽑기
     - 성별: 남성→Male+Unisex, 여성→Female+Unisex, 남녀공용→Unisex
-    - 메인어코드: JSONField or TEXT(JSON문자열) 모두 대응
-    - 낮/밤: 점수 높은 순으로 정렬 후 상위 need개
+    - 메인어코드: perfume_accords 조인 테이블
+    - 낮/밤: day_score / night_score 인덱스 컬럼으로 ORDER BY ... LIMIT
     """
     # 성별 매핑
     g_en = GENDER_MAP_KO2EN.get(gender_ko, None) or "Unisex"
@@ -587,22 +575,14 @@ def filter_worldcup_candidates(gender_ko: str, accord_ko: str, time_pref: str, n
     else:
         g_filter = ["Unisex"]
 
-    # 메인어코드 조건
-    q = Q(gender__in=g_filter)
-    try:
-        q &= Q(main_accords__contains=[accord_ko])
-        base = Perfume.objects.filter(q)[:200]
-        if not base:
-            raise ValueError
-    except Exception:
-        # TEXT 저장 fallback (JSON 문자열)
-        q &= (Q(main_accords__icontains=f'"{accord_ko}"') | Q(main_accords__icontains=accord_ko))
-        base = Perfume.objects.filter(q)[:200]
-
-    # 낮/밤 점수로 정렬
-    key = "day" if time_pref == "day" else "night"
-    lst = list(base)
-    lst.sort(key=lambda p: parse_day_night_value(getattr(p, "day_night_score", None), key), reverse=True)
+    # 메인어코드 조건 (perfume_accords 인덱스 조인) + 낮/밤 점수 순 상위 후보만 조회
+    order = "-day_score" if time_pref == "day" else "-night_score"
+    lst = list(
+        Perfume.objects.filter(
+            gender__in=g_filter,
+            id__in=PerfumeAccord.objects.filter(accord=accord_ko).values("perfume_id"),
+        ).order_by(order, "id")[:max(need, 12)]
+    )
 
     # 상위 need개 (여유분에서 랜덤 샘플)
     top = lst[:max(need, 12)]
@@ -749,6 +729,25 @@ FASTAPI_CHAT_URL = os.environ.get("FASTAPI_CHAT_URL")
 SERVICE_TOKEN = os.environ.get("SERVICE_TOKEN")
 
 
+async def _answer_frames(result, **flags):
+    """저장된 답변을 스트림 형식으로 (content 1개 + done)"""
+    yield sse_frame({'content': result['final_answer']})
+    yield sse_frame({'done': True, 'conversation_id': result['conversation_id'],
+                     'perfume_list': result['perfume_list'], **flags})
+
+
+def _sse_response(request, frames):
+    # WSGI는 async iterator를 끝까지 모은 뒤 보내므로, 공용 이벤트 루프 스레드에서 돌려 프레임 단위로 (utils/chat_stream.py)
+    if not isinstance(request, ASGIRequest):
+        frames = iterate_in_background(frames)
+    response = StreamingHttpResponse(frames, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['Access-Control-Allow-Origin'] = '*'
+    response['Access-Control-Allow-Headers'] = 'Cache-Control, Last-Event-ID'
+    response['X-Accel-Buffering'] = 'no'   # Nginx 버퍼링 비활성화
+    return response
+
+
 @login_required 
 @require_POST
 def chat_submit_api(request):
@@ -764,49 +763,91 @@ def chat_submit_api(request):
             conversation_id = body.get("conversation_id")
         else:
             # Form 데이터 처리 (기존 호환성)
+            body = request.POST
             content = request.POST.get("content", "").strip()
             conversation_id = request.POST.get("conversation_id") or request.session.get("conversation_id")
             
         if not content:
             return JsonResponse({"error": "내용이 비었습니다."}, status=400)
 
-        # FastAPI로 user_id와 query만 전송
-        payload = {
-            "user_id": request.user.id,
-            "query": content
-        }
-        
-        if conversation_id:
-            try:
-                payload["conversation_id"] = int(conversation_id)
-            except ValueError:
-                pass  # 잘못된 conversation_id는 무시
+        # 멱등성: 같은 키가 끝났으면 저장된 답변, 처리 중이면 완료를 기다렸다가 같은 답변 (utils/idempotency.py)
+        idem_key, is_client_key = idempotency.submission_key(
+            request.headers.get(idempotency.IDEMPOTENCY_HEADER) or body.get("idempotency_key"),
+            request.user.id, conversation_id, content,
+        )
+        replay, owner = idempotency.claim(idem_key, request.user.id, is_client_key)
+        if replay is not None:
+            return JsonResponse({**replay, "success": True, "replayed": True})
+        if not owner:
+            return JsonResponse({"error": "같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해 주세요."}, status=409)
 
-        headers = {
-            "X-Service-Token": SERVICE_TOKEN,
-            "Content-Type": "application/json",
-        }
+        completed = False
+        try:
+            # 답변 캐시 (옵트인): 새 대화의 일반 질문은 저장된 답변으로 (utils/answer_cache.py)
+            cacheable = answer_cache.eligible(content, conversation_id)
+            if cacheable:
+                entry, _ = answer_cache.lookup(content)
+                if entry:
+                    result = {
+                        "conversation_id": answer_cache.materialize(request.user.id, content, entry, idem_key),
+                        "final_answer": entry["final_answer"],
+                        "perfume_list": entry["perfume_list"],
+                    }
+                    idempotency.complete(idem_key, result, is_client_key)
+                    completed = True
+                    request.session["conversation_id"] = result["conversation_id"]
+                    return JsonResponse({**result, "success": True, "cached": True})
+
+            # FastAPI로 user_id와 query만 전송
+            payload = {
+                "user_id": request.user.id,
+                "query": content,
+                "idempotency_key": idem_key,
+            }
         
-        # FastAPI 호출
-        r = requests.post(FASTAPI_CHAT_URL, json=payload, headers=headers, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-
-        # 세션에 conversation_id 업데이트 (다음 메시지에서 사용)
-        if data.get("conversation_id"):
-            request.session["conversation_id"] = data["conversation_id"]
-
-        # FastAPI가 conversations DB를 작성했으므로 응답만 반환 + 추천 향수 리스트 포함
-        response_data = {
-            "conversation_id": data.get("conversation_id"),
-            "final_answer": data.get("final_answer", "응답을 받지 못했습니다."),
-            "perfume_list": data.get("perfume_list", []),
-            "success": True
-        }
-        print("💾 Django API Response:", response_data)  # 서버 콘솔에 출력
-        return JsonResponse(response_data)
+            # 답변 캐시로 만든 대화는 FastAPI에 스레드가 없음 → 앞선 턴을 붙여 새 대화로
+            cached_turns = answer_cache.cached_turns(request.user.id, conversation_id) if conversation_id else None
+            if cached_turns:
+                payload["query"] = answer_cache.follow_up_query(cached_turns, content)
+            elif conversation_id:
+                try:
+                    payload["conversation_id"] = int(conversation_id)
+                except ValueError:
+                    pass  # 잘못된 conversation_id는 무시
+
+            # FastAPI 호출 (공용 keep-alive 풀)
+            started = time.perf_counter()
+            data = post_json(FASTAPI_CHAT_URL, payload)
+
+            # 세션에 conversation_id 업데이트 (다음 메시지에서 사용)
+            if data.get("conversation_id"):
+                request.session["conversation_id"] = data["conversation_id"]
+
+            # FastAPI가 conversations DB를 작성했으므로 응답만 반환 + 추천 향수 리스트 포함
+            response_data = {
+                "conversation_id": data.get("conversation_id"),
+                "final_answer": data.get("final_answer", "응답을 받지 못했습니다."),
+                "perfume_list": data.get("perfume_list", []),
+                "success": True
+            }
+            if data.get("conversation_id"):
+                if cached_turns:
+                    # FastAPI가 저장한 질문은 앞선 턴이 붙은 문자열 → 원래 질문으로, 캐시 대화는 합침
+                    idempotency.mark_request_message(data["conversation_id"], request.user.id, idem_key, content=content)
+                    answer_cache.adopt(request.user.id, conversation_id, data["conversation_id"])
+                else:
+                    idempotency.mark_request_message(data["conversation_id"], request.user.id, idem_key)
+                idempotency.complete(idem_key, {k: response_data[k] for k in ("conversation_id", "final_answer", "perfume_list")}, is_client_key)
+                completed = True
+                if cacheable and "final_answer" in data:
+                    answer_cache.store(content, data["final_answer"], response_data["perfume_list"], time.perf_counter() - started)
+            print("💾 Django API Response:", response_data)  # 서버 콘솔에 출력
+            return JsonResponse(response_data)
+        finally:
+            if not completed:  # 실패 / conversation_id 없음 / 완료 전 예외 → 재시도는 새로 실행
+                idempotency.abandon(idem_key)
         
-    except requests.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         return JsonResponse({"error": f"FastAPI 오류: {e.response.text}"}, status=502)
     except Exception as e:
         return JsonResponse({"error": f"서버 오류: {str(e)}"}, status=500)
@@ -814,9 +855,12 @@ def chat_submit_api(request):
 
 @login_required
 @require_POST
-def chat_stream_api(request):
+async def chat_stream_api(request):
     """
     스트리밍 채팅 API - Server-Sent Events 방식으로 실시간 응답 (멀티모달 지원)
+    비동기 뷰: ASGI(uvicorn)에서 스트림마다 워커를 잡지 않고 FastAPI SSE를 중계 (utils/chat_stream.py)
+    WSGI(gunicorn)에서도 프레임 단위로 전송되지만 스트림 동안 워커 스레드 1개를 점유
+    ASGI에서는 프레임마다 이벤트 id를 붙이고, 끊긴 뒤 Last-Event-ID로 다시 요청하면 놓친 부분만 이어서 전송 (utils/stream_resume.py)
     """
     try:
         # JSON 요청 처리
@@ -827,207 +871,240 @@ def chat_stream_api(request):
             image_file = None
         else:
             # FormData 요청 처리 (이미지 + 텍스트)
+            body = request.POST
             content = request.POST.get("content", "").strip()
-            conversation_id = request.POST.get("conversation_id") or request.session.get("conversation_id")
+            conversation_id = request.POST.get("conversation_id") or await request.session.aget("conversation_id")
             image_file = request.FILES.get("image")
 
+        # 끊긴 스트림 이어받기: FastAPI 재호출 없이 버퍼에서 놓친 프레임부터
+        last_event_id = request.headers.get("Last-Event-ID") or request.POST.get("last_event_id")
+        if last_event_id:
+            stream, seq = find_stream(last_event_id, (await request.auser()).id)
+            if stream is None:
+                async def expired_generator():
+                    yield sse_frame({'error': '이어받을 수 없는 응답입니다. 다시 질문해 주세요.', 'resumable': False})
+                return _sse_response(request, expired_generator())
+            return _sse_response(request, stream.follow(seq))
+
          # 텍스트도 없고 이미지도 없으면 에러
         if not content and not image_file:
-            def error_generator():
-                yield f"data: {json.dumps({'error': '내용이 비었습니다.'})}\n\n"
-            return StreamingHttpResponse(error_generator(), content_type='text/event-stream')
+            async def error_generator():
+                yield sse_frame({'error': '내용이 비었습니다.'})
+            return _sse_response(request, error_generator())
 
         # 이미지만 있을 경우 기본 query 채워주기
         if not content and image_file:
             content = "이미지 기반 추천 요청"
 
-        # FastAPI로 스트리밍 요청 준비
-        payload = {
-            "user_id": request.user.id,
-            "query": content,
-            "stream": True  # 스트리밍 요청임을 표시
-        }
-
-        # 이미지 첨부 시 S3 업로드 (체계적인 경로 구조)
-        uploaded_image_url = None
-        if image_file:
-            # 체계적인 경로: chat_images/user_id/conversation_id/message_id_timestamp_filename
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            # conversation_id가 있으면 사용, 없으면 'new'로 임시 처리
-            conv_path = str(conversation_id) if conversation_id else 'new'
-            filename = f"chat_images/{request.user.id}/{conv_path}/{timestamp}_{image_file.name}"
-
-            s3_client.upload_fileobj(
-                image_file,
-                settings.AWS_STORAGE_BUCKET_NAME,
-                filename,
-                ExtraArgs={"ContentType": image_file.content_type},
-            )
-            uploaded_image_url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
-            payload["image_url"] = uploaded_image_url
-
-        if conversation_id:
-            try:
-                payload["conversation_id"] = int(conversation_id)
-            except ValueError:
-                pass
+        user = await request.auser()
 
-        headers = {
-            "X-Service-Token": SERVICE_TOKEN,
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream"  # SSE 요청
-        }
+        # 멱등성: 이 워커에서 같은 키로 진행 중이면 그 스트림에 처음부터 붙고,
+        # 끝난 요청이면 저장된 답변을 그대로 전송 (FastAPI 재호출 없음)
+        idem_key, is_client_key = idempotency.submission_key(
+            request.headers.get(idempotency.IDEMPOTENCY_HEADER) or body.get("idempotency_key"),
+            user.id, conversation_id, content, image_file,
+        )
+        running = find_stream_by_key(idem_key, user.id)
+        if running is not None:
+            return _sse_response(request, running.follow())
+        replay, owner = await idempotency.aclaim(idem_key, user.id, is_client_key)
+        if replay is not None:
+            return _sse_response(request, _answer_frames(replay, replayed=True))
+        if not owner:
+            async def busy_generator():
+                yield sse_frame({'error': '같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해 주세요.'})
+            return _sse_response(request, busy_generator())
+
+        handed_off = False  # True: 표식 정리를 완료 결과 / stream_generator가 맡음
+        try:
+            # 답변 캐시 (옵트인): 새 대화의 일반 질문은 저장된 답변으로 (utils/answer_cache.py)
+            cacheable = answer_cache.eligible(content, conversation_id, has_image=bool(image_file))
+            if cacheable:
+                entry, _ = await sync_to_async(answer_cache.lookup)(content)
+                if entry:
+                    result = {
+                        "conversation_id": await sync_to_async(answer_cache.materialize)(user.id, content, entry, idem_key),
+                        "final_answer": entry["final_answer"],
+                        "perfume_list": entry["perfume_list"],
+                    }
+                    await idempotency.acomplete(idem_key, result, is_client_key)
+                    handed_off = True
+                    await request.session.aset("conversation_id", result["conversation_id"])
+                    return _sse_response(request, _answer_frames(result, cached=True))
+
+            # FastAPI로 스트리밍 요청 준비
+            payload = {
+                "user_id": user.id,
+                "query": content,
+                "stream": True,  # 스트리밍 요청임을 표시
+                "idempotency_key": idem_key,
+            }
+
+            # 이미지 첨부: 축소/재인코딩 + 업로드는 백그라운드에서 (utils/chat_images.py), 응답은 바로 시작
+            image_upload = submit_chat_image(user.id, image_file) if image_file else None
+
+            # 답변 캐시로 만든 대화는 FastAPI에 스레드가 없음 → 앞선 턴을 붙여 새 대화로
+            cached_turns = await sync_to_async(answer_cache.cached_turns)(user.id, conversation_id) if conversation_id else None
+            if cached_turns:
+                payload["query"] = answer_cache.follow_up_query(cached_turns, content)
+            elif conversation_id:
+                try:
+                    payload["conversation_id"] = int(conversation_id)
+                except ValueError:
+                    pass
 
-        def stream_generator():
-            final_conversation_id = None
-            try:
-                # FastAPI 서버가 없을 때 임시 mock 응답
-                if not FASTAPI_CHAT_URL:
-                    mock_response = f"안녕하세요! '{content}'에 대한 응답입니다. 현재 FastAPI 서버가 연결되지 않아 임시 응답을 제공합니다."
-                    import time
-                    for chunk in mock_response.split():
-                        yield f"data: {json.dumps({'content': chunk + ' '})}\n\n"
-                        time.sleep(0.1)  # 스트리밍 효과
-                    yield f"data: {json.dumps({'done': True, 'conversation_id': conversation_id or 1, 'perfume_list': []})}\n\n"
-                    return
-
-                # FastAPI로 스트리밍 요청
-                response = requests.post(
-                    FASTAPI_CHAT_URL + "/stream" if not FASTAPI_CHAT_URL.endswith("/stream") else FASTAPI_CHAT_URL,
-                    json=payload,
-                    headers=headers,
-                    stream=True,
-                    timeout=120
-                )
-                response.raise_for_status()
-
-                # 스트리밍 응답 처리
-                for line in response.iter_lines(decode_unicode=True):
-                    if line:
-                        # FastAPI에서 오는 SSE 데이터를 그대로 전달
-                        if line.startswith("data: "):
-                            try:
-                                # conversation_id 추출 시도
-                                data = json.loads(line[6:])
-                                if data.get('conversation_id'):
-                                    # conversation_id가 있으면 세션과 변수에 저장
-                                    request.session["conversation_id"] = data["conversation_id"]
-                                    final_conversation_id = data['conversation_id']
-                            except:
-                                pass
-                            yield f"{line}\n\n"
-                        else:
-                            # 일반 텍스트라면 SSE 형식으로 감싸기
-                            yield f"data: {json.dumps({'content': line})}\n\n"
-
-                # 스트림 종료 신호
-                yield f"data: {json.dumps({'done': True})}\n\n"
-
-                # 스트리밍 완료 후 이미지 URL 업데이트
-                if uploaded_image_url and final_conversation_id:
-                    try:
-                        # 해당 conversation의 가장 최근 user 메시지 찾기
-                        conv = Conversation.objects.get(id=final_conversation_id, user=request.user)
-                        user_message = conv.messages.filter(role='user').order_by('-created_at').first()
-                        if user_message:
-                            user_message.chat_image = uploaded_image_url
-                            user_message.save()
-                            print(f"✅ Image URL saved to message {user_message.id}: {uploaded_image_url}")
-                    except Exception as e:
-                        print(f"❌ Failed to save image URL: {e}")
-
-            except requests.RequestException as e:
-                # FastAPI 서버가 없을 때 mock 응답
-                print(f"FastAPI 연결 실패, mock 응답 사용: {e}")
-                mock_response = f"안녕하세요! '{content}'에 대한 응답입니다. FastAPI 서버 연결에 실패하여 임시 응답을 제공합니다."
-                import time
+            async def mock_stream(mock_response):
                 for chunk in mock_response.split():
-                    yield f"data: {json.dumps({'content': chunk + ' '})}\n\n"
-                    time.sleep(0.1)
-                yield f"data: {json.dumps({'done': True, 'conversation_id': conversation_id or 1, 'perfume_list': []})}\n\n"
+                    yield sse_frame({'content': chunk + ' '})
+                    await asyncio.sleep(0.1)  # 스트리밍 효과
+                yield sse_frame({'done': True, 'conversation_id': conversation_id or 1, 'perfume_list': []})
+
+            async def stream_generator():
+                final_conversation_id = None
+                uploaded_image_url = None
+                answer_parts, final_answer, perfume_list = [], None, []
+                completed = False
+                started = time.perf_counter()
+                try:
+                    if image_upload:
+                        # 첫 바이트를 먼저 보내고(SSE 주석, 화면에는 무시됨) 업로드 완료를 기다림
+                        yield ": image-upload\n\n"
+                        try:
+                            uploaded_image_url = await asyncio.wrap_future(image_upload)
+                        except ValueError as e:
+                            yield sse_frame({'error': str(e)})
+                            return
+                        payload["image_url"] = uploaded_image_url
+
+                    # FastAPI 서버가 없을 때 임시 mock 응답
+                    if not FASTAPI_CHAT_URL:
+                        async for frame in mock_stream(f"안녕하세요! '{content}'에 대한 응답입니다. 현재 FastAPI 서버가 연결되지 않아 임시 응답을 제공합니다."):
+                            yield frame
+                        return
+
+                    # FastAPI SSE를 그대로 중계 (conversation_id만 추출)
+                    url = FASTAPI_CHAT_URL + "/stream" if not FASTAPI_CHAT_URL.endswith("/stream") else FASTAPI_CHAT_URL
+                    async for data, frame in relay_sse(url, payload):
+                        if data:
+                            final_conversation_id = data.get('conversation_id') or final_conversation_id
+                            if isinstance(data.get('content'), str):
+                                answer_parts.append(data['content'])
+                            final_answer = data.get('final_answer') or final_answer
+                            perfume_list = data.get('perfume_list') or perfume_list
+                        yield frame
+
+                    # 스트림 종료 신호
+                    yield sse_frame({'done': True})
+
+                    # 응답이 이미 시작됐으므로 세션은 직접 저장 (다음 메시지에서 사용)
+                    if final_conversation_id:
+                        await request.session.aset("conversation_id", final_conversation_id)
+                        await request.session.asave()
+
+                    # 스트리밍 완료 후 FastAPI가 저장한 사용자 메시지에 멱등성 키 / 이미지 URL 기록
+                    if final_conversation_id:
+                        extra = {'chat_image': uploaded_image_url} if uploaded_image_url else {}
+                        if cached_turns:
+                            extra['content'] = content  # 앞선 턴이 붙은 질문 → 원래 질문으로
+                        try:
+                            await sync_to_async(idempotency.mark_request_message)(final_conversation_id, user.id, idem_key, **extra)
+                        except Exception as e:
+                            print(f"❌ Failed to mark request message: {e}")
+                        if cached_turns:
+                            try:
+                                await sync_to_async(answer_cache.adopt)(user.id, conversation_id, final_conversation_id)
+                            except Exception as e:
+                                print(f"❌ Failed to merge cached conversation: {e}")
+                        await idempotency.acomplete(idem_key, {
+                            'conversation_id': final_conversation_id,
+                            'final_answer': final_answer or "".join(answer_parts),
+                            'perfume_list': perfume_list,
+                        }, is_client_key)
+                        completed = True
+                        # FastAPI가 messages.state에 쓴 LangGraph 스냅샷을 압축 보관으로 이동 (utils/state_snapshots.py)
+                        try:
+                            await sync_to_async(state_snapshots.compact)(final_conversation_id)
+                        except Exception as e:
+                            print(f"❌ Failed to compact state snapshots: {e}")
+                        if cacheable:
+                            await sync_to_async(answer_cache.store)(
+                                content, final_answer or "".join(answer_parts), perfume_list, time.perf_counter() - started,
+                            )
+
+                except httpx.HTTPError as e:
+                    # FastAPI 서버가 없을 때 mock 응답
+                    print(f"FastAPI 연결 실패, mock 응답 사용: {e}")
+                    async for frame in mock_stream(f"안녕하세요! '{content}'에 대한 응답입니다. FastAPI 서버 연결에 실패하여 임시 응답을 제공합니다."):
+                        yield frame
+
+                except Exception as e:
+                    yield sse_frame({'error': f'서버 오류: {str(e)}'})
+
+                finally:
+                    if not completed:  # 실패 / mock 응답 / 취소 → 재시도는 새로 실행
+                        await idempotency.aabandon(idem_key)
+
+            if not isinstance(request, ASGIRequest):
+                # WSGI: 이어받기용 producer 없이 응답 iterator가 직접 읽음 — 클라이언트가 끊기면 업스트림도 바로 닫힘
+                response = _sse_response(request, stream_generator())
+            else:
+                response = _sse_response(request, start_stream(user.id, stream_generator(), key=idem_key).follow())
+            handed_off = True
+            return response
+        finally:
+            if not handed_off:  # 응답(스트림)으로 넘기기 전 예외 → 표식을 남기지 않음 (재시도가 PENDING_TTL을 기다리지 않게)
+                await idempotency.aabandon(idem_key)
 
-            except Exception as e:
-                yield f"data: {json.dumps({'error': f'서버 오류: {str(e)}'})}\n\n"
+    except Exception as e:
+        error = f'서버 오류: {str(e)}'  # except 블록이 끝나면 e가 지워짐 → 생성기가 돌기 전에 문자열로
 
-        response = StreamingHttpResponse(stream_generator(), content_type='text/event-stream')
-        response['Cache-Control'] = 'no-cache'
-        response['Access-Control-Allow-Origin'] = '*'
-        response['Access-Control-Allow-Headers'] = 'Cache-Control'
-        response['X-Accel-Buffering'] = 'no'   # Nginx 버퍼링 비활성화
-        return response
+        async def error_generator():
+            yield sse_frame({'error': error})
+        return _sse_response(request, error_generator())
 
-    except Exception as e:
-        # Fast API 실패 시 업로드 취소
-        s3_client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=filename)
+@login_required
+@require_GET
+def chat_metrics_api(request):
+    """채팅 백엔드 풀 / 답변 캐시 계측 (이 워커 프로세스 기준, 스태프 전용)"""
+    if not request.user.is_staff:
+        return JsonResponse({"error": "권한이 없습니다."}, status=403)
+    return JsonResponse({"backend": backend_stats(), "answer_cache": answer_cache.answer_cache_stats()})
 
-        def error_generator():
-            yield f"data: {json.dumps({'error': f'서버 오류: {str(e)}'})}\n\n"
-        return StreamingHttpResponse(error_generator(), content_type='text/event-stream')
 
 def get_note_image_url(note_name):
-    """노트명으로 이미지 URL 가져오기 - 개선된 버전"""
+    """노트명으로 이미지 URL 가져오기 (인메모리 리졸버, DB 조회 없음)"""
     try:
-        # 한국어면 영어로 변환
-        english_name = get_english_note_name(note_name)
-        
-        # 1. 정확한 이름으로 검색
-        note_image = NoteImage.objects.filter(note_name__iexact=english_name).first()
-        if note_image:
-            return note_image.image_url
-        
-        # 2. 부분 매칭으로 검색 (대소문자 무시)
-        note_image = NoteImage.objects.filter(note_name__icontains=english_name).first()
-        if note_image:
-            return note_image.image_url
-        
-        # 3. 공백으로 분리해서 각 단어로 검색
-        if ' ' in english_name:
-            for word in english_name.split():
-                if len(word) > 2:  # 2글자 이상인 단어만
-                    note_image = NoteImage.objects.filter(note_name__icontains=word).first()
-                    if note_image:
-                        return note_image.image_url
-        
-        # 4. 역방향 검색 - DB의 노트명이 한국어 노트명을 포함하는지
-        notes_containing = NoteImage.objects.filter(note_name__icontains=note_name).first()
-        if notes_containing:
-            return notes_containing.image_url
-        return None
-        
-    except Exception as e:
+        return get_note_image_resolver().resolve(note_name)
+    except Exception:
         return None
 
 
+@cache_control(private=True, no_cache=True)
 def product_detail(request, perfume_id):
+    # 조회 수는 조건부 GET(304) 판단 전에 기록 → 캐시된 페이지 재방문도 조회로 집계
+    # (상세 로더는 요청 단위 메모 → ETag 계산/렌더링과 같은 쿼리 1회)
+    perfume = load_perfume_detail(request, perfume_id)
+    if perfume is not None:
+        record_perfume_view(perfume.id)
+    return _product_detail_page(request, perfume_id)
+
+
+@shared_condition(etag_func=product_detail_etag, last_modified_func=product_detail_last_modified)
+def _product_detail_page(request, perfume_id):
     # DB 테스트 (개발용 - 나중에 제거)
     #test_note_images()
     
-    perfume = get_object_or_404(Perfume, id=perfume_id)
-    image_url = f"https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/{perfume.id}.jpg"
-    
-    # 사용자의 즐겨찾기/피드백 상태 확인
-    is_favorite = False
-    feedback_status = None
-    
-    if request.user.is_authenticated:
-        # 즐겨찾기 상태 확인
-        is_favorite = Favorite.objects.filter(
-            user=request.user,
-            perfume=perfume
-        ).exists()
-        
-        # 피드백 상태 확인
-        feedback = FeedbackEvent.objects.filter(
-            user=request.user,
-            perfume=perfume,
-            action__in=['like', 'dislike']
-        ).first()
-        
-        if feedback:
-            feedback_status = feedback.action
-    
+    # 향수 + 이전/다음 id + 즐겨찾기/피드백 상태를 쿼리 1회로 (ETag 계산 때 조회한 결과 재사용)
+    perfume = load_perfume_detail(request, perfume_id)
+    if perfume is None:
+        raise Http404("No Perfume matches the given query.")
+    image_url = perfume_image_url(perfume.id, DETAIL_WIDTH)
+    image_srcset = perfume_srcset(perfume.id)
+
+    # 사용자의 즐겨찾기/피드백 상태 ('like', 'dislike', None)
+    is_favorite = perfume.is_favorite
+    feedback_status = perfume.feedback_action
+
     def safe_process_json_field(field_data):
         if not field_data:
             return []
@@ -1058,6 +1135,11 @@ def product_detail(request, perfume_id):
     middle_notes = safe_process_json_field(perfume.middle_notes)
     base_notes = safe_process_json_field(perfume.base_notes)
     
+    # 노트 이미지 URL 일괄 조회 (인메모리 리졸버, 한국어→영어 변환 후 매칭)
+    note_image_urls = get_note_image_resolver().resolve_many(
+        [*top_notes, *middle_notes, *base_notes]
+    )
+
     # 노트에 이미지 URL과 한국어 이름 추가
     def enhance_notes(notes_list):
         enhanced_notes = []
@@ -1065,35 +1147,38 @@ def product_detail(request, perfume_id):
             enhanced_notes.append({
                 'name': note,
                 'korean_name': note,  # 이미 한국어이므로 그대로 사용
-                'image_url': get_note_image_url(note)  # 한국어→영어 변환 후 이미지 검색
+                'image_url': note_image_urls.get(note),
             })
         return enhanced_notes
     
     enhanced_top_notes = enhance_notes(top_notes)
     enhanced_middle_notes = enhance_notes(middle_notes)
     enhanced_base_notes = enhance_notes(base_notes)
-    
-    # 이전/다음 향수 가져오기
-    prev_perfume = Perfume.objects.filter(id__lt=perfume_id).order_by('-id').first()
-    next_perfume = Perfume.objects.filter(id__gt=perfume_id).order_by('id').first()
 
+    # 유사 향수 (build_similar_perfumes로 미리 계산한 Top-K 조회만)
+    similar_perfumes = load_similar_perfumes(perfume.id)
+    for p in similar_perfumes:
+        p.image_url = perfume_image_url(p.id, CARD_WIDTH)
+    
     context = {
         'perfume': perfume,
         'image_url': image_url,
+        'image_srcset': image_srcset,
         'main_accords': main_accords,
         'top_notes': enhanced_top_notes,
         'middle_notes': enhanced_middle_notes,
         'base_notes': enhanced_base_notes,
         'sizes': perfume.sizes,
         'gender': perfume.gender,
-        'prev_perfume': prev_perfume,
-        'next_perfume': next_perfume,
+        'prev_perfume_id': perfume.prev_id,
+        'next_perfume_id': perfume.next_id,
         'detail_url': perfume.detail_url,  # bysuco 링크 추가
         'notes_score': perfume.notes_score,  # 노트 점수 추가
         'season_score': perfume.season_score,  # 계절 점수 추가
         'day_night_score': perfume.day_night_score,  # 낮/밤 점수 추가
         'is_favorite': is_favorite,  # 즐겨찾기 상태
         'feedback_status': feedback_status,  # 피드백 상태 ('like', 'dislike', None)
+        'similar_perfumes': similar_perfumes,
     }
     return render(request, 'scentpick/product_detail.html', context)
 
@@ -1135,8 +1220,8 @@ def toggle_favorite(request):
             is_favorite = True
             message = f'{perfume.name}이(가) 즐겨찾기에 추가되었습니다.'
         
-        # 현재 즐겨찾기 개수 확인
-        total_favorites = Favorite.objects.filter(user=request.user).count()
+        # 현재 즐겨찾기 개수 (카운터 조회, COUNT 집계 없음)
+        total_favorites = get_user_counts(request.user.id)["favorite"]
         
         return JsonResponse({
             'status': 'success',
@@ -1213,9 +1298,10 @@ def toggle_like_dislike(request):
             else:
                 message = f'{perfume.name}에 싫어요를 눌렀습니다.'
         
-        # 현재 피드백 상태 확인
-        total_likes = FeedbackEvent.objects.filter(user=request.user, action='like').count()
-        total_dislikes = FeedbackEvent.objects.filter(user=request.user, action='dislike').count()
+        # 현재 피드백 상태 확인 (카운터 조회, COUNT 집계 없음)
+        user_counts = get_user_counts(request.user.id)
+        total_likes = user_counts["like"]
+        total_dislikes = user_counts["dislike"]
         
         return JsonResponse({
             'status': 'success',
@@ -1307,13 +1393,6 @@ def mypage(request):
             user=request.user, action='dislike'
         ).select_related('perfume').order_by('-created_at')
 
-        for perfume in favorite_perfumes:
-            perfume.image_url = f"https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/{perfume.id}.jpg"
-        for feedback in liked_feedback:
-            feedback.perfume.image_url = f"https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/{feedback.perfume.id}.jpg"
-        for feedback in disliked_feedback:
-            feedback.perfume.image_url = f"https://scentpick-images.s3.ap-northeast-2.amazonaws.com/perfumes/{feedback.perfume.id}.jpg"
-
         context = {
             'rec_page': rec_page,
             'f_brand': brand, 'f_name': name, 'f_date_from': date_from, 'f_date_to': date_to,
@@ -1341,34 +1420,6 @@ def mypage(request):
 
     return render(request, "scentpick/mypage.html", context)
 
-@login_required
-@require_GET
-def conversations_api(request):
-    """
-    대화 목록 API - AJAX로 대화 목록 로드
-    """
-    items = []
-    qs = Conversation.objects.filter(user=request.user).order_by('-updated_at')[:100]
-    for c in qs:
-        title = c.title
-        if not title:
-            # Fallback: derive from first user message
-            try:
-                first_user = c.messages.filter(role='user').order_by('created_at').first()
-                if first_user and first_user.content:
-                    title = first_user.content[:15]
-            except Exception:
-                pass
-        if not title:
-            title = f"대화 {c.id}"
-        items.append({
-            'id': c.id,
-            'title': title,
-            'updated_at': c.updated_at.isoformat(),
-        })
-    return JsonResponse({'items': items})
-
-
 @login_required
 @require_POST
 def chat_new_api(request):
@@ -1445,75 +1496,40 @@ def update_feedback_api(request):
 def conversations_api(request):
     """
     대화 목록 API - AJAX로 대화 목록 로드
+    ?cursor=<next_cursor> : 다음 페이지 (요약 컬럼만 읽는 인덱스 조회 1회)
     """
-    items = []
-    qs = Conversation.objects.filter(user=request.user).order_by('-updated_at')[:100]
-    for c in qs:
-        title = c.title
-        if not title:
-            # Fallback: derive from first user message
-            try:
-                first_user = c.messages.filter(role='user').order_by('created_at').first()
-                if first_user and first_user.content:
-                    title = first_user.content[:15]
-            except Exception:
-                pass
-        if not title:
-            title = f"대화 {c.id}"
-        items.append({
-            'id': c.id,
-            'title': title,
-            'updated_at': c.updated_at.isoformat(),
-        })
-    return JsonResponse({'items': items})
+    conversations, next_cursor = sidebar_page(request.user, request.GET.get('cursor'))
+    items = [{
+        'id': c.id,
+        'title': sidebar_title(c),
+        'updated_at': c.updated_at.isoformat(),
+        'last_message_preview': c.last_message_preview or '',
+        'message_count': c.message_count,
+        'last_message_at': c.last_message_at.isoformat() if c.last_message_at else None,
+    } for c in conversations]
+    return JsonResponse({'items': items, 'next_cursor': next_cursor})
 
 @login_required
 @require_GET
 def conversation_messages_api(request, conv_id: int):
     """
     특정 대화의 메시지 목록 API - AJAX로 메시지 로드 (추천 데이터 포함)
+    ?before=<message_id>&limit=N : 최신부터 N개씩, before 이전 메시지 (has_more / before로 다음 요청)
     """
     conv = get_object_or_404(Conversation, id=conv_id, user=request.user)
-    msgs = conv.messages.order_by('created_at')
-    data = []
-    
-    for m in msgs:
-        message_data = {
-            'role': m.role,
-            'content': m.content,
-            'created_at': m.created_at.isoformat(),
-            'chat_image': getattr(m, 'chat_image', None),  # 안전한 이미지 URL 접근
-        }
-        
-        # assistant 메시지인 경우 관련된 추천 데이터 찾기
-        if m.role == 'assistant':
-            # 이 메시지와 연관된 RecRun 찾기
-            rec_runs = RecRun.objects.filter(
-                conversation=conv,
-                request_msg__created_at__lte=m.created_at
-            ).order_by('-created_at')
-            
-            if rec_runs.exists():
-                latest_run = rec_runs.first()
-                # 추천 후보들 가져오기
-                candidates = latest_run.candidates.select_related('perfume').order_by('rank')
-                
-                perfume_list = []
-                for candidate in candidates:
-                    perfume_list.append({
-                        'id': candidate.perfume.id,
-                        'brand': candidate.perfume.brand,
-                        'name': candidate.perfume.name,
-                        'rank': candidate.rank,
-                        'score': candidate.score
-                    })
-                
-                if perfume_list:
-                    message_data['perfume_list'] = perfume_list
-        
-        data.append(message_data)
+    try:
+        before, limit = parse_history_params(request.GET)
+    except ValueError:
+        return JsonResponse({'error': 'before/limit 값이 올바르지 않습니다.'}, status=400)
+    history = message_history_page(conv, before, limit)
     
-    return JsonResponse({'conversation_id': conv.id, 'title': conv.title, 'items': data})
+    return JsonResponse({
+        'conversation_id': conv.id,
+        'title': conv.title,
+        'items': history['items'],
+        'has_more': history['has_more'],
+        'before': history['before'],
+    })
 
 @login_required
 @require_POST